@@ -1,14 +1,21 @@
 #!/usr/bin/env python3
 """
 Generate individual INSERT statements for news articles
+
+To load straight into the database (batched, parameterized, safe to
+rerun) use load-news.py instead.
 """
 
-import json
+import os
+import sys
 from datetime import datetime
 
-# Read news.json
-with open('src/data/news.json', 'r') as f:
-    data = json.load(f)
+# Share the scraping pipeline's streaming JSON reader (scraping/scripts/)
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', '..', 'scraping', 'scripts'))
+from json_stream import iter_records  # noqa: E402
+
+# Read news.json (array or JSONL) one article at a time
+data = iter_records('src/data/news.json')
 
 topic_to_category = {
     'faculty': 'faculty_news',
@@ -1,14 +1,22 @@
 #!/usr/bin/env python3
 """
 Import news articles from news.json to Supabase
+
+To load straight into the database (batched, parameterized, safe to
+rerun) use load-news.py instead.
 """
 
-import json
+import os
+import sys
 from datetime import datetime
+from itertools import islice
+
+# Share the scraping pipeline's streaming JSON reader (scraping/scripts/)
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', '..', 'scraping', 'scripts'))
+from json_stream import iter_records  # noqa: E402
 
-# Read news.json
-with open('src/data/news.json', 'r') as f:
-    data = json.load(f)
+# Read news.json (array or JSONL) one article at a time
+data = iter_records('src/data/news.json')
 
 # Map topic to news_category enum values
 topic_to_category = {
@@ -62,8 +70,12 @@ def generate_insert(articles, start_idx=0):
 
 # Generate SQL for batches of 10
 batch_size = 10
-for i in range(0, len(data), batch_size):
-    batch = data[i:i+batch_size]
+i = 0
+while True:
+    batch = list(islice(data, batch_size))
+    if not batch:
+        break
     batch_num = i // batch_size + 1
-    print(f"\n-- Batch {batch_num} (articles {i+1}-{min(i+batch_size, len(data))})")
+    print(f"\n-- Batch {batch_num} (articles {i+1}-{i+len(batch)})")
     print(generate_insert(batch, i))
+    i += len(batch)
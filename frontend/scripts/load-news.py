@@ -0,0 +1,249 @@
+#!/usr/bin/env python3
+"""
+Load news articles from news.json into Postgres (Supabase)
+
+Replaces pasting the SQL printed by generate-news-inserts.py and
+import-news-to-supabase.py. Articles become rows that are sent as
+multi-row parameterized INSERTs (BATCH_SIZE rows per statement, values
+passed as parameters, never spliced into the SQL) and upserted on slug,
+all in one transaction. Articles are read one at a time (json_stream.py)
+and kept as one row per slug; when an article appears twice, the last copy
+is loaded. Running it again inserts new articles, updates changed ones and
+leaves the rest untouched, so it is safe to repeat.
+
+On update only the scraped fields change; featured, pinned, author and
+subtitle are left as edited in the admin.
+
+    DATABASE_URL=postgresql://... python scripts/load-news.py
+    python scripts/load-news.py --sqlite /tmp/news.db   # local stand-in, no Postgres needed
+    python scripts/load-news.py --dry-run               # count new/changed articles only
+
+Postgres needs psycopg2 (pip install psycopg2-binary).
+"""
+
+import argparse
+import json
+import os
+import sqlite3
+import sys
+import time
+from datetime import datetime
+from itertools import islice
+
+# Share the scraping pipeline's streaming JSON reader (scraping/scripts/)
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', '..', 'scraping', 'scripts'))
+from json_stream import iter_records  # noqa: E402
+
+try:
+    import psycopg2
+    import psycopg2.extras
+except ImportError:  # --sqlite works without it
+    psycopg2 = None
+
+DEFAULT_NEWS_PATH = 'src/data/news.json'
+
+# Rows per INSERT statement
+BATCH_SIZE = 500
+
+# Map topic to news_category enum values
+topic_to_category = {
+    'faculty': 'faculty_news',
+    'marine': 'research',
+    'climate': 'research',
+    'ecology': 'research',
+    'evolution': 'research',
+    'conservation': 'research'
+}
+
+COLUMNS = ['title', 'slug', 'subtitle', 'excerpt', 'content', 'category', 'author', 'publish_date',
+           'featured', 'pinned', 'image_url', 'tags', 'original_url']
+
+# Overwritten when an article is loaded again; the other columns are editorial
+SCRAPED_COLUMNS = ['title', 'excerpt', 'content', 'category', 'publish_date', 'image_url', 'tags', 'original_url']
+
+SQLITE_SCHEMA = """
+CREATE TABLE IF NOT EXISTS news_articles (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    title TEXT NOT NULL,
+    slug TEXT UNIQUE,
+    subtitle TEXT,
+    excerpt TEXT,
+    content TEXT,
+    category TEXT,
+    author TEXT,
+    publish_date TEXT,
+    featured BOOLEAN,
+    pinned BOOLEAN,
+    published BOOLEAN DEFAULT 1,
+    image_url TEXT,
+    tags TEXT,                    -- JSON array
+    original_url TEXT,
+    created_at TEXT DEFAULT CURRENT_TIMESTAMP,
+    updated_at TEXT DEFAULT CURRENT_TIMESTAMP
+);
+"""
+
+
+def article_row(item):
+    """news_articles row for one news.json article"""
+    try:
+        publish_date = datetime.strptime(item['date'], '%B %d, %Y').strftime('%Y-%m-%d')
+    except (KeyError, TypeError, ValueError):
+        publish_date = '2024-01-01'
+    topic = item.get('topic', 'ecology')
+    return {
+        'title': item.get('title', ''),
+        'slug': item.get('slug', ''),
+        'subtitle': None,
+        'excerpt': item.get('excerpt', ''),
+        'content': item.get('content', ''),
+        'category': topic_to_category.get(topic, 'research'),
+        'author': None,
+        'publish_date': publish_date,
+        'featured': item['id'] <= 5,  # First 5 articles
+        'pinned': False,
+        'image_url': item.get('imageUrl', '/images/news/placeholder.jpg'),
+        'tags': [topic],
+        'original_url': item.get('originalUrl'),
+    }
+
+
+def batches(rows, size=BATCH_SIZE):
+    rows = iter(rows)
+    while True:
+        batch = list(islice(rows, size))
+        if not batch:
+            return
+        yield batch
+
+
+def upsert_sql(placeholders, now):
+    """INSERT ... ON CONFLICT (slug) DO UPDATE that skips rows whose scraped columns are unchanged"""
+    changed = ', '.join(f'news_articles.{c}' for c in SCRAPED_COLUMNS)
+    incoming = ', '.join(f'excluded.{c}' for c in SCRAPED_COLUMNS)
+    assignments = ', '.join(f'{c} = excluded.{c}' for c in SCRAPED_COLUMNS)
+    return (f"INSERT INTO news_articles ({', '.join(COLUMNS)}) VALUES {placeholders} "
+            f"ON CONFLICT (slug) DO UPDATE SET {assignments}, updated_at = {now} "
+            f"WHERE ({changed}) IS DISTINCT FROM ({incoming}) "
+            f"RETURNING slug")
+
+
+class PostgresTarget:
+    def __init__(self, dsn):
+        if psycopg2 is None:
+            raise ValueError("Loading into Postgres needs psycopg2 (pip install psycopg2-binary)")
+        self.conn = psycopg2.connect(dsn)
+        with self.conn.cursor() as cur:
+            cur.execute("SELECT data_type FROM information_schema.columns "
+                        "WHERE table_name = 'news_articles' AND column_name = 'tags'")
+            row = cur.fetchone()
+        # tags is text[] in the original schema, json(b) in later ones
+        self.tags_as_json = row is not None and row[0] in ('json', 'jsonb')
+
+    def existing_slugs(self):
+        with self.conn.cursor() as cur:
+            cur.execute("SELECT slug FROM news_articles")
+            return {row[0] for row in cur}
+
+    def upsert(self, rows):
+        values = []
+        for row in rows:
+            if self.tags_as_json:
+                row = dict(row, tags=psycopg2.extras.Json(row['tags']))
+            values.append([row[c] for c in COLUMNS])
+        with self.conn.cursor() as cur:
+            returned = psycopg2.extras.execute_values(cur, upsert_sql('%s', 'now()'), values,
+                                                      page_size=len(values), fetch=True)
+        return [r[0] for r in returned]
+
+    def commit(self):
+        self.conn.commit()
+
+    def close(self):
+        self.conn.close()
+
+
+class SQLiteTarget:
+    """Same table and upsert in a SQLite file, for testing without Postgres"""
+
+    def __init__(self, path):
+        self.conn = sqlite3.connect(path)
+        self.conn.executescript(SQLITE_SCHEMA)
+
+    def existing_slugs(self):
+        return {row[0] for row in self.conn.execute("SELECT slug FROM news_articles")}
+
+    def upsert(self, rows):
+        row_placeholder = '(' + ', '.join('?' * len(COLUMNS)) + ')'
+        params = [json.dumps(row[c]) if c == 'tags' else row[c] for row in rows for c in COLUMNS]
+        sql = upsert_sql(', '.join([row_placeholder] * len(rows)), 'CURRENT_TIMESTAMP')
+        # IS DISTINCT FROM is spelled IS NOT in SQLite
+        sql = sql.replace('IS DISTINCT FROM', 'IS NOT')
+        return [r[0] for r in self.conn.execute(sql, params).fetchall()]
+
+    def commit(self):
+        self.conn.commit()
+
+    def close(self):
+        self.conn.close()
+
+
+def load_news(target, articles, dry_run=False):
+    """Upsert articles; returns {'articles', 'inserted', 'updated', 'unchanged'}"""
+    existing = target.existing_slugs()
+    # One statement cannot touch a slug twice, and a slug in two batches would be written twice:
+    # keep one row per slug before batching, and the last copy of an article wins
+    rows = {}
+    for item in articles:
+        row = article_row(item)
+        rows[row['slug']] = row
+    counts = {'articles': len(rows), 'inserted': 0, 'updated': 0, 'unchanged': 0}
+    for batch in batches(rows.values()):
+        if dry_run:
+            counts['inserted'] += sum(1 for row in batch if row['slug'] not in existing)
+            continue
+        written = set(target.upsert(batch))
+        counts['inserted'] += len(written - existing)
+        counts['updated'] += len(written & existing)
+    if dry_run:
+        counts['unchanged'] = None  # Not known without comparing
+    else:
+        target.commit()
+        counts['unchanged'] = counts['articles'] - counts['inserted'] - counts['updated']
+    return counts
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Upsert news.json articles into the news_articles table')
+    parser.add_argument('--news', default=DEFAULT_NEWS_PATH, help='news.json (or JSONL) to load')
+    parser.add_argument('--dsn', default=os.environ.get('DATABASE_URL'),
+                        help='Postgres connection string (default: $DATABASE_URL)')
+    parser.add_argument('--sqlite', metavar='PATH', help='Load into a SQLite file instead of Postgres')
+    parser.add_argument('--dry-run', action='store_true', help='Count new articles without writing')
+    args = parser.parse_args()
+
+    if not args.sqlite and not args.dsn:
+        parser.error('Set DATABASE_URL, pass --dsn, or use --sqlite for a local stand-in')
+
+    try:
+        target = SQLiteTarget(args.sqlite) if args.sqlite else PostgresTarget(args.dsn)
+    except ValueError as e:
+        print(f"❌ {e}")
+        sys.exit(1)
+
+    start = time.time()
+    try:
+        counts = load_news(target, iter_records(args.news), dry_run=args.dry_run)
+    finally:
+        target.close()
+
+    print(f"📰 {counts['articles']} articles from {args.news}")
+    if args.dry_run:
+        print(f"🔍 Dry run: {counts['inserted']} new, the rest already loaded")
+    else:
+        print(f"✅ {counts['inserted']} inserted, {counts['updated']} updated, {counts['unchanged']} unchanged "
+              f"in {time.time() - start:.2f}s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,65 @@
+#!/usr/bin/env python3
+"""
+EEMB Crawl Throughput Benchmark
+Compares the serial crawler with the async crawl mode against the local mock site.
+
+    python bench_crawl.py --pages 3000 --max-pages 500 --latency 0.05
+"""
+
+import argparse
+import contextlib
+import io
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'scripts'))
+
+from crawl_site import EEMBSiteCrawler  # noqa: E402
+from mock_site import serve_mock_site  # noqa: E402
+
+
+def run(label, crawl):
+    """Time a crawl with its per-page output silenced"""
+    start = time.perf_counter()
+    with contextlib.redirect_stdout(io.StringIO()), contextlib.redirect_stderr(io.StringIO()):
+        crawler = crawl()
+    elapsed = time.perf_counter() - start
+    pages = len(crawler.site_map)
+    print(f"  {label:32} {pages:5} pages in {elapsed:7.2f}s  ({pages / elapsed:7.1f} pages/s)")
+    return crawler
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark serial vs async crawling')
+    parser.add_argument('--pages', type=int, default=3000, help='Size of the synthetic site')
+    parser.add_argument('--max-pages', type=int, default=500, help='Pages to crawl per run')
+    parser.add_argument('--latency', type=float, default=0.05, help='Injected server latency (seconds)')
+    parser.add_argument('--concurrency', type=int, default=16)
+    args = parser.parse_args()
+
+    print(f"📊 Crawl benchmark: {args.max_pages} of {args.pages} pages, {args.latency * 1000:.0f}ms latency\n")
+
+    with serve_mock_site(args.pages, args.latency) as base_url:
+        def serial():
+            crawler = EEMBSiteCrawler(base_url, args.max_pages, delay=0, page_store_path=None, archive_dir=None,
+                                      crawl_state_path=None, records_path=None)
+            crawler.crawl()
+            return crawler
+
+        def concurrent():
+            crawler = EEMBSiteCrawler(base_url, args.max_pages, page_store_path=None, archive_dir=None,
+                                      crawl_state_path=None, records_path=None)
+            crawler.crawl_async(concurrency=args.concurrency, per_host=args.concurrency, rps=None)
+            return crawler
+
+        a = run('serial (no sleep)', serial)
+        b = run(f'async (concurrency={args.concurrency})', concurrent)
+
+    fields = set(a.site_map[0]) if a.site_map else set()
+    same_schema = all(set(p) == fields for p in b.site_map if 'error' not in p)
+    print(f"\n  Same site_map record schema: {'✅' if same_schema else '❌'}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,109 @@
+#!/usr/bin/env python3
+"""
+EEMB Faculty Import Benchmark
+Compares the serial Strapi import (one GET + POST + 0.3s sleep per person)
+with the bulk upsert, against the local mock Strapi server.
+
+The bulk run starts with part of the faculty already in Strapi, some of
+them out of date, and injected 503s, so it has to create, update and
+retry. It fails unless Strapi ends up holding exactly the processed
+records, and unless a second run finds nothing left to change.
+
+    python bench_faculty_import.py --people 300 --latency 0.02
+"""
+
+import argparse
+import contextlib
+import io
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', '..', 'scripts', 'data-import'))
+
+from clean_and_import_faculty import FacultyProcessor  # noqa: E402
+from mock_strapi import serve_mock_strapi  # noqa: E402
+
+FIRST = ['Ana', 'Ben', 'Chloe', 'David', 'Elena', 'Felix', 'Grace', 'Hugo', 'Iris', 'Jonas', 'Kai', 'Lena']
+LAST = ['Alvarez', 'Brooks', 'Chen', 'Dawson', 'Evans', 'Fischer', 'Garcia', 'Hansen', 'Ito', 'Jensen']
+RANKS = ['Professor', 'Associate Professor', 'Assistant Professor', 'Distinguished Professor', 'Lecturer']
+
+
+def scraped_records(count, seed=0):
+    """Synthetic faculty-scraped.json records with unique names"""
+    rng = random.Random(seed)
+    records = []
+    for n in range(count):
+        first, last = rng.choice(FIRST), f"{rng.choice(LAST)}{n}"
+        slug = f"{first}-{last}".lower()
+        records.append({
+            'profile_url': f"https://eemb.ucsb.edu/people/faculty/{slug}",
+            'title': f"{first} {last.capitalize()} | EEMB",
+            'email': f"{slug}@ucsb.edu",
+            'phone': f"805.893.{1000 + n:04d}",
+            'office': f"{1000 + n} Noble Hall",
+            'bio': f"{rng.choice(RANKS)} of ecology. " + 'Studies kelp forests and coral reefs. ' * 5,
+            'research_areas': rng.sample(['Ecology', 'Evolution', 'Marine Biology', 'Disease', 'Genomics'], 2),
+        })
+    return records
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark serial vs bulk Strapi faculty import')
+    parser.add_argument('--people', type=int, default=300, help='Faculty records to import')
+    parser.add_argument('--latency', type=float, default=0.02, help='Injected API latency (seconds)')
+    parser.add_argument('--fail-rate', type=float, default=0.05, help='Share of requests answered with 503')
+    parser.add_argument('--serial-sample', type=int, default=10,
+                        help='People imported serially to measure the old rate (0 to skip)')
+    parser.add_argument('--workers', type=int, default=8)
+    args = parser.parse_args()
+
+    processor = FacultyProcessor(None, 'http://unused')
+    faculty = [processor.extract_faculty_info(r) for r in scraped_records(args.people)]
+    print(f"📊 Faculty import benchmark: {len(faculty)} people, {args.latency * 1000:.0f}ms latency\n")
+
+    if args.serial_sample:
+        sample = faculty[:args.serial_sample]
+        with serve_mock_strapi(latency=args.latency) as (base_url, _):
+            serial = FacultyProcessor(None, base_url)
+            start = time.perf_counter()
+            with contextlib.redirect_stdout(io.StringIO()):
+                for person in sample:
+                    serial.create_faculty(person)
+                    time.sleep(0.3)  # The serial import's rate limiting
+            per_person = (time.perf_counter() - start) / len(sample)
+        print(f"  {'serial (GET + POST + sleep)':30} {per_person * 1000:7.0f}ms/person  "
+              f"(~{per_person * len(faculty):.0f}s for {len(faculty)})")
+
+    # A third already imported, half of those with an outdated title
+    rng = random.Random(1)
+    existing = [dict(p, title='Professor' if p['title'] != 'Professor' and rng.random() < 0.5 else p['title'])
+                for p in faculty[::3]]
+    with serve_mock_strapi({'faculties': existing}, latency=args.latency,
+                           fail_rate=args.fail_rate) as (base_url, store):
+        bulk = FacultyProcessor(None, base_url, workers=args.workers)
+        start = time.perf_counter()
+        with contextlib.redirect_stdout(io.StringIO()):
+            summary = bulk.bulk_import(faculty)
+        elapsed = time.perf_counter() - start
+        print(f"  {'bulk upsert':30} {elapsed:7.2f}s total       ({summary['create']} created, "
+              f"{summary['update']} updated, {summary['unchanged']} unchanged, "
+              f"{bulk.client.stats['retries']} retries)")
+
+        stored = {e['slug']: e for e in store.entries('faculties').values()}
+        same = len(stored) == len(faculty) and all(
+            all(stored[p['slug']].get(k) == v for k, v in p.items()) for p in faculty)
+
+        again = FacultyProcessor(None, base_url, workers=args.workers)
+        with contextlib.redirect_stdout(io.StringIO()):
+            second = again.bulk_import(faculty)
+        idempotent = second['create'] == second['update'] == 0 and not second['failed']
+
+    print(f"\n  Strapi holds exactly the processed records: {'✅' if same and not summary['failed'] else '❌'}")
+    print(f"  Second run changes nothing: {'✅' if idempotent else '❌'}")
+    return 0 if same and idempotent and not summary['failed'] else 1
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,94 @@
+#!/usr/bin/env python3
+"""
+EEMB Crawl Frontier Microbenchmark
+Pushes synthetic URLs through CrawlFrontier and through the old list-based queue.
+
+    python bench_frontier.py --urls 100000
+"""
+
+import argparse
+import os
+import random
+import sys
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'scripts'))
+
+from frontier import CrawlFrontier  # noqa: E402
+
+
+def synthetic_urls(count, links_per_page=10, seed=0):
+    """Yield (page, links) pairs the way a crawl discovers them, with many repeats"""
+    rng = random.Random(seed)
+    sections = ['people', 'news', 'research', 'academics', 'about']
+    pages = [f"https://eemb.ucsb.edu/{sections[i % 5]}/page-{i}" for i in range(count)]
+    for i in range(count):
+        yield [pages[rng.randrange(count)] for _ in range(links_per_page)]
+
+
+def bench_list(count):
+    """The original to_visit list with pop(0) and linear membership checks"""
+    visited = set()
+    to_visit = ['https://eemb.ucsb.edu']
+    for links in synthetic_urls(count):
+        if to_visit:
+            visited.add(to_visit.pop(0))
+        for link in links:
+            if link not in visited and link not in to_visit:
+                to_visit.append(link)
+    while to_visit:
+        visited.add(to_visit.pop(0))
+    return len(visited)
+
+
+def bench_frontier(count, **kwargs):
+    frontier = CrawlFrontier(['https://eemb.ucsb.edu'], **kwargs)
+    popped = 0
+    for links in synthetic_urls(count):
+        if frontier:
+            url, depth = frontier.pop()
+            popped += 1
+        else:
+            depth = 0
+        for link in links:
+            frontier.push(link, depth + 1)
+    while frontier:
+        frontier.pop()
+        popped += 1
+    return popped
+
+
+def timed(label, func, *args, **kwargs):
+    start = time.perf_counter()
+    pages = func(*args, **kwargs)
+    elapsed = time.perf_counter() - start
+
+    # Second pass for memory, tracemalloc slows everything down
+    tracemalloc.start()
+    func(*args, **kwargs)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    print(f"  {label:40} {pages:7} urls  {elapsed:7.3f}s  peak {peak / 1024 / 1024:6.1f} MB")
+    return elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark the crawl frontier')
+    parser.add_argument('--urls', type=int, default=100000, help='Synthetic pages to push through the frontier')
+    parser.add_argument('--list-urls', type=int, default=10000,
+                        help='Pages for the list-based baseline (it is quadratic, keep this small)')
+    args = parser.parse_args()
+
+    print(f"📊 Frontier benchmark ({args.urls} synthetic URLs, 10 links per page)\n")
+
+    timed('list queue (baseline)', bench_list, args.list_urls)
+    timed('CrawlFrontier (same size as baseline)', bench_frontier, args.list_urls)
+    timed('CrawlFrontier FIFO', bench_frontier, args.urls)
+    timed('CrawlFrontier /people/ first + depth', bench_frontier, args.urls,
+          priority_patterns=['/people/'], by_depth=True)
+    timed('CrawlFrontier max_queued=1000', bench_frontier, args.urls, max_queued=1000)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,92 @@
+#!/usr/bin/env python3
+"""
+EEMB Link Validation Benchmark
+Compares the threaded and async link validator engines against local mock sites.
+
+Each mock site runs on its own port and stands in for one external host,
+with injected latency. Both engines must report the same status for every
+URL, and the benchmark fails if they do not.
+
+    python bench_link_validation.py --hosts 8 --urls 2000 --latency 0.05
+"""
+
+import argparse
+import contextlib
+import io
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'scripts'))
+
+from mock_site import page_path, serve_mock_site  # noqa: E402
+from validate_links import LinkValidator  # noqa: E402
+import async_validator  # noqa: E402
+
+
+def link_targets(base_urls, count, pages, seed=0):
+    """count unique URLs spread over the hosts, about 5% of them broken"""
+    rng = random.Random(seed)
+    urls = set()
+    while len(urls) < count:
+        base = rng.choice(base_urls)
+        n = rng.randrange(pages) if rng.random() > 0.05 else pages + rng.randrange(pages)
+        urls.add(base + page_path(n))
+    return sorted(urls)
+
+
+def run(label, validator, urls):
+    """Time one engine over the URLs; returns {url: status}"""
+    statuses = {}
+
+    def handle(result):
+        statuses[result['url']] = result['status']
+
+    start = time.perf_counter()
+    with contextlib.redirect_stderr(io.StringIO()):
+        validator.check_urls(validator.interleave_hosts(urls), handle)
+    elapsed = time.perf_counter() - start
+    print(f"  {label:34} {len(statuses):5} URLs in {elapsed:7.2f}s  ({len(statuses) / elapsed:7.1f} URLs/s)")
+    return statuses
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark the threaded and async link validators')
+    parser.add_argument('--hosts', type=int, default=8, help='Mock sites, each standing in for one host')
+    parser.add_argument('--urls', type=int, default=2000, help='Unique URLs to validate')
+    parser.add_argument('--pages', type=int, default=3000, help='Size of each synthetic site')
+    parser.add_argument('--latency', type=float, default=0.05, help='Injected server latency (seconds)')
+    parser.add_argument('--per-host', type=int, default=8, help='Requests in flight per host')
+    parser.add_argument('--workers', type=int, default=64, help='Requests in flight overall')
+    args = parser.parse_args()
+
+    print(f"📊 Link validation benchmark: {args.urls} URLs on {args.hosts} hosts, "
+          f"{args.latency * 1000:.0f}ms latency\n")
+
+    with contextlib.ExitStack() as stack:
+        base_urls = [stack.enter_context(serve_mock_site(args.pages, args.latency)) for _ in range(args.hosts)]
+        urls = link_targets(base_urls, args.urls, args.pages)
+
+        def engine(validator_class, workers):
+            return validator_class(max_workers=workers, per_host=args.per_host, rps=None, status_cache_path=None,
+                                   records_path=None)
+
+        results = [
+            run('threads (10 workers, old default)', engine(LinkValidator, 10), urls),
+            run(f'threads ({args.workers} workers)', engine(LinkValidator, args.workers), urls),
+        ]
+        if async_validator.aiohttp is None:
+            print("  ⚠️  Skipping async engine: aiohttp is not installed")
+        else:
+            async_engine = engine(async_validator.AsyncLinkValidator, args.workers)
+            results.append(run(f'async ({args.workers} in flight)', async_engine, urls))
+
+    same = all(r == results[0] for r in results[1:])
+    broken = sum(1 for status in results[0].values() if status != 'ok')
+    print(f"\n  Same status for every URL: {'✅' if same else '❌'} ({broken} broken)")
+    return 0 if same else 1
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
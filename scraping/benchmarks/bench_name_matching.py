@@ -0,0 +1,156 @@
+#!/usr/bin/env python3
+"""
+EEMB Name Matching Benchmark
+Compares the linear substring scan the photo scripts used to match names
+with the indexed NameIndex (scripts/data-import/name_matching.py), on a
+synthetic directory.
+
+Queries are directory names written another way: accents dropped, a
+middle initial or title added, "Last, First", a short first name, a
+hyphenated surname split, plus people who are not in the directory at
+all (who should match nothing). It fails unless the index gets at least
+as many right and no more wrong than the scan, and is faster.
+
+    python bench_name_matching.py --people 10000 --queries 2000
+"""
+
+import argparse
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', '..', 'scripts', 'data-import'))
+
+from name_matching import NameIndex, name_tokens  # noqa: E402
+
+FIRST = ['Ana', 'Benjamin', 'Chloé', 'Douglas', 'Débora', 'Elena', 'Felix', 'Grace', 'Hugo', 'Inés', 'Jesús',
+         'Jonas', 'Katherine', 'Leander', 'María', 'Nikolai', 'Óscar', 'Priya', 'Raúl', 'Susan', 'Thomas',
+         'Ulrike', 'Valentina', 'William', 'Xiomara', 'Yusuf', 'Zoë', 'Alexander', 'Cherie', 'Hillary']
+SYLLABLES = ['al', 'bern', 'car', 'dal', 'ez', 'fer', 'gon', 'hal', 'ig', 'jen', 'kas', 'lo', 'mar', 'nu',
+             'or', 'pe', 'quin', 'ro', 'sal', 'tor', 'ur', 'vel', 'wen', 'yo', 'zan', 'bri', 'stie', 'moel']
+ENDINGS = ['', 'son', 'ez', 'ler', 'ini', 'ova', 'berg', 'ton', 'ard', 'ski']
+ACCENTS = {'a': 'á', 'e': 'é', 'i': 'í', 'o': 'ó', 'u': 'ú'}
+
+
+def surname(rng):
+    name = ''.join(rng.choice(SYLLABLES) for _ in range(rng.randint(2, 3))) + rng.choice(ENDINGS)
+    if rng.random() < 0.15:
+        vowel = rng.choice([c for c in name if c in ACCENTS] or ['a'])
+        name = name.replace(vowel, ACCENTS[vowel], 1)
+    return name.capitalize()
+
+
+def synthetic_directory(count, seed=0):
+    """Unique names: accented, hyphenated and with middle initials, like the faculty list"""
+    rng = random.Random(seed)
+    names, keys = [], set()
+    while len(names) < count:
+        last = surname(rng)
+        if rng.random() < 0.1:
+            last = f"{last}-{surname(rng)}"
+        middle = f" {rng.choice('ABCDEFGHJKLMRST')}." if rng.random() < 0.15 else ''
+        name = f"{rng.choice(FIRST)}{middle} {last}"
+        key = ' '.join(name_tokens(name))
+        if key not in keys:
+            keys.add(key)
+            names.append(name)
+    return names
+
+
+def plain(text):
+    return ''.join({'á': 'a', 'é': 'e', 'í': 'i', 'ó': 'o', 'ú': 'u', 'ë': 'e'}.get(c, c) for c in text)
+
+
+def variant(name, rng):
+    """The same person written the way another source might"""
+    words = name.split()
+    first, last = words[0], words[-1]
+    kind = rng.choice(['same', 'unaccented', 'initial', 'title', 'last-first', 'short-first', 'split-surname'])
+    if kind == 'unaccented':
+        return kind, plain(name)
+    if kind == 'initial':
+        return kind, f"{first} Q. {last}"
+    if kind == 'title':
+        return kind, f"Dr. {first} {last}"
+    if kind == 'last-first':
+        return kind, f"{last}, {first}"
+    if kind == 'short-first' and len(first) > 4:
+        return kind, f"{first[:4]} {last}"
+    if kind == 'split-surname' and '-' in last:
+        return kind, f"{first} {last.replace('-', ' ')}"
+    return 'same', name
+
+
+def linear_match(db_name, url_names):
+    """The former scrape_faculty_photos_v2.fuzzy_match_name: exact, then substring scans"""
+    if db_name in url_names:
+        return url_names[db_name]
+    last_name = db_name.split()[-1]
+    for url_name, url in url_names.items():
+        if last_name in url_name or url_name in last_name:
+            return url
+    parts = db_name.split()
+    if len(parts) >= 2:
+        first_last = f"{parts[0]} {parts[-1]}"
+        for url_name, url in url_names.items():
+            if first_last in url_name or url_name in first_last:
+                return url
+    return None
+
+
+def run(label, lookup, queries):
+    right = wrong = missed = 0
+    start = time.perf_counter()
+    results = [lookup(query) for query, _ in queries]
+    elapsed = time.perf_counter() - start
+    for (_, expected), found in zip(queries, results):
+        if found == expected:
+            right += 1
+        elif found is None:
+            missed += 1
+        else:
+            wrong += 1
+    print(f"  {label:22} {elapsed / len(queries) * 1e6:9.0f}µs/lookup   "
+          f"{right:5} right  {wrong:5} wrong  {missed:5} missed")
+    return elapsed, right, wrong
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark linear vs indexed name matching')
+    parser.add_argument('--people', type=int, default=10000, help='Size of the synthetic directory')
+    parser.add_argument('--queries', type=int, default=2000, help='Lookups of people in the directory')
+    parser.add_argument('--strangers', type=int, default=200, help='Lookups of people not in the directory')
+    args = parser.parse_args()
+
+    rng = random.Random(1)
+    names = synthetic_directory(args.people + args.strangers)
+    directory, strangers = names[:args.people], names[args.people:]
+    url_names = {name: f"https://eemb.ucsb.edu/people/faculty/{i}" for i, name in enumerate(directory)}
+
+    queries = []
+    for name in rng.sample(directory, min(args.queries, len(directory))):
+        queries.append((variant(name, rng)[1], url_names[name]))
+    queries += [(name, None) for name in strangers]
+    rng.shuffle(queries)
+
+    print(f"📊 Name matching benchmark: {len(directory)} people, {len(queries)} lookups "
+          f"({len(strangers)} not in the directory)\n")
+
+    start = time.perf_counter()
+    index = NameIndex(url_names)
+    print(f"  {'index build':22} {(time.perf_counter() - start) * 1000:9.0f}ms")
+    block = sum(len(index.candidates(name_tokens(q)[-1])) for q, _ in queries) / len(queries)
+    print(f"  {'fuzzy block size':22} {block:9.1f} people on average (of {len(index)})\n")
+
+    linear_time, linear_right, linear_wrong = run('linear scan', lambda q: linear_match(q, url_names), queries)
+    index_time, index_right, index_wrong = run('NameIndex', index.lookup, queries)
+
+    ok = index_right >= linear_right and index_wrong <= linear_wrong and index_time < linear_time
+    print(f"\n  Speedup: {linear_time / index_time:.0f}x")
+    print(f"  Index at least as accurate and faster: {'✅' if ok else '❌'}")
+    return 0 if ok else 1
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,185 @@
+#!/usr/bin/env python3
+"""
+EEMB HTML Parser Backend Benchmark
+Checks that every parser backend in scripts/parsing.py extracts the same
+data as BeautifulSoup's html.parser, then compares their throughput.
+
+For each page it compares the crawler's page-level fields (title, meta
+description, text, links, images), the faculty profile fields and the
+people-directory selectors (div.views-row, field-name-body).
+
+    python bench_parsers.py                         # synthetic site, profile and directory pages
+    python bench_parsers.py --corpus saved_pages/
+    python bench_parsers.py --archive ../data/archive
+    python bench_parsers.py --parity-only           # no timing runs
+
+Exits non-zero if any backend extracts something different.
+"""
+
+import argparse
+import glob
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'scripts'))
+
+from parsing import BACKENDS, parse_html, parse_page, resolve_backend  # noqa: E402
+from profile_extractor import extract_profile  # noqa: E402
+from mock_site import render_page  # noqa: E402
+from bench_profile_extraction import synthetic_profile  # noqa: E402
+
+
+def page_fields(markup, backend):
+    """What the crawler, link validator and downloader read from a page"""
+    page = parse_page(markup, backend)
+    return {
+        'title': page.title(),
+        'description': page.meta_content('description'),
+        'text': page.text(separator=' ', strip=True),
+        'links': page.links(),
+        'images': page.images(),
+    }
+
+
+def drupal_fields(markup, url, backend):
+    """The selectors of the faculty and people scrapers"""
+    soup = parse_html(markup, backend)
+    rows = soup.find_all('div', class_='views-row')
+    bio = soup.find('div', class_='field-name-body') or soup.find('div', class_='field-type-text-with-summary')
+    return {
+        'profile': extract_profile(soup, url),
+        'rows': [(row.find('a').get_text() if row.find('a') else None,
+                  [d.get_text(strip=True) for d in row.find_all('div')]) for row in rows],
+        'bio': ' '.join(bio.get_text().split()) if bio else '',
+    }
+
+
+def directory_page(n, rng):
+    """A Drupal views listing of people, like /people/faculty"""
+    rows = []
+    for i in range(n):
+        rows.append(
+            f'<div class="views-row views-row-{i + 1}">'
+            f'<div class="views-field-field-person-photo"><img src="/files/p{i}.jpg" typeof="foaf:Image"></div>'
+            f'<a href="/people/faculty/person-{i}">Person {i}</a>'
+            f'<div class="views-field-field-person-title"> {rng.choice(["Professor", "Lecturer"])} </div>'
+            f'<div class="views-field-field-person-office">Noble Hall {1000 + i}</div>'
+            f'<a href="mailto:person{i}@ucsb.edu">person{i}@ucsb.edu</a></div>'
+        )
+    return (f'<!DOCTYPE html><html><head><title>Faculty | EEMB</title></head><body>'
+            f'<div class="view-content">{"".join(rows)}</div></body></html>')
+
+
+def synthetic_corpus(count, seed=0):
+    rng = random.Random(seed)
+    corpus = []
+    for n in range(count):
+        kind = n % 3
+        if kind == 0:
+            corpus.append((f'https://eemb.ucsb.edu/page-{n}', render_page(n, count).encode('utf-8')))
+        elif kind == 1:
+            paragraphs = 40 if n % 10 == 1 else rng.randint(2, 6)
+            corpus.append((f'https://eemb.ucsb.edu/people/faculty/example{n}',
+                           synthetic_profile(n, rng, paragraphs).encode('utf-8')))
+        else:
+            corpus.append((f'https://eemb.ucsb.edu/people/list-{n}',
+                           directory_page(rng.randint(20, 150), rng).encode('utf-8')))
+    return corpus
+
+
+def directory_corpus(directory):
+    corpus = []
+    for path in sorted(glob.glob(os.path.join(directory, '**', '*.htm*'), recursive=True)):
+        with open(path, 'rb') as f:
+            corpus.append(('https://eemb.ucsb.edu/' + os.path.basename(path), f.read()))
+    return corpus
+
+
+def archive_corpus(archive_dir):
+    from page_archive import PageArchive
+
+    archive = PageArchive(archive_dir)
+    try:
+        return list(archive.iter_latest('html'))
+    finally:
+        archive.close()
+
+
+def throughput(corpus, backend, repeat):
+    """Seconds to parse every page and read its page-level fields"""
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for url, markup in corpus:
+            page_fields(markup, backend)
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Check parity and benchmark the HTML parser backends')
+    source = parser.add_mutually_exclusive_group()
+    source.add_argument('--corpus', help='Directory of saved .html pages')
+    source.add_argument('--archive', help='Page archive directory; uses every archived HTML page')
+    parser.add_argument('--pages', type=int, default=300, help='Synthetic pages when no corpus is given')
+    parser.add_argument('--repeat', type=int, default=3, help='Timing runs per backend (best is reported)')
+    parser.add_argument('--parity-only', action='store_true', help='Check parity and skip the timing runs')
+    args = parser.parse_args()
+
+    if args.corpus:
+        corpus = directory_corpus(args.corpus)
+    elif args.archive:
+        corpus = archive_corpus(args.archive)
+    else:
+        corpus = synthetic_corpus(args.pages)
+    if not corpus:
+        print("❌ No pages to benchmark")
+        return 1
+
+    backends = []
+    for backend in BACKENDS:
+        try:
+            backends.append(resolve_backend(backend))
+        except ValueError as e:
+            print(f"  ⚠️  Skipping {backend}: {e}")
+
+    total_bytes = sum(len(markup) for _, markup in corpus)
+    print(f"📊 Parser benchmark: {len(corpus)} pages, {total_bytes / 1024 / 1024:.1f} MB\n")
+
+    # Parity against the original html.parser extraction
+    print("  Parity with html.parser:")
+    mismatches = 0
+    for backend in backends[1:]:
+        differing = []
+        for url, markup in corpus:
+            for name, extract in (('page', lambda m, b: page_fields(m, b)),
+                                  ('scraper', lambda m, b: drupal_fields(m, url, b))):
+                expected = extract(markup, 'html.parser')
+                actual = extract(markup, backend)
+                if actual != expected:
+                    differing.append((url, name, [k for k in expected if expected[k] != actual[k]]))
+        mismatches += len(differing)
+        print(f"    {backend:12} {'✅ identical' if not differing else f'❌ {len(differing)} differences'}")
+        for url, name, keys in differing[:5]:
+            print(f"      {url} ({name}): {', '.join(keys)}")
+
+    if args.parity_only:
+        return 1 if mismatches else 0
+
+    # Throughput of parsing plus page-level extraction
+    print("\n  Throughput (parse + page fields):")
+    baseline = None
+    for backend in backends:
+        elapsed = throughput(corpus, backend, args.repeat)
+        baseline = baseline or elapsed
+        print(f"    {backend:12} {elapsed:7.3f}s  {len(corpus) / elapsed:8.1f} pages/s  "
+              f"{total_bytes / elapsed / 1024 / 1024:6.1f} MB/s  {baseline / elapsed:5.1f}x")
+
+    return 1 if mismatches else 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,171 @@
+#!/usr/bin/env python3
+"""
+EEMB Photo Harvest Benchmark
+Compares the serial photo scraper (one person at a time, a commit and a
+1s pause each) with the staged pipeline of
+scripts/data-import/scrape_faculty_photos_v2.py, against a local stand-in
+for the faculty directory, profile pages and photos.
+
+Some profiles 404, some show a placeholder, and some faculty already have
+a photo or are not in the directory, so both runs go through every path.
+It fails unless the two runs leave the same photo_url in every row and
+the same bytes in every saved photo.
+
+    python bench_photo_harvest.py --people 200 --latency 0.05
+"""
+
+import argparse
+import contextlib
+import filecmp
+import io
+import os
+import sqlite3
+import sys
+import tempfile
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', '..', 'scripts', 'data-import'))
+
+from scrape_faculty_photos_v2 import update_faculty_photos  # noqa: E402
+
+FIRST = ['Ana', 'Ben', 'Chloe', 'David', 'Elena', 'Felix', 'Grace', 'Hugo', 'Iris', 'Jonas', 'Kai', 'Lena']
+LAST = ['Alvarez', 'Brooks', 'Chen', 'Dawson', 'Evans', 'Fischer', 'Garcia', 'Hansen', 'Ito', 'Jensen']
+
+# Bytes of each synthetic photo
+PHOTO_SIZE = 200 * 1024
+
+
+def people(count):
+    """(name, slug, kind) of each synthetic faculty member"""
+    kinds = ['photo'] * 7 + ['missing', 'placeholder', 'photo']
+    result = []
+    for n in range(count):
+        name = f"{FIRST[n % len(FIRST)]} {LAST[n // len(FIRST) % len(LAST)]}son{n}"
+        result.append((name, name.lower().replace(' ', '-'), kinds[n % len(kinds)]))
+    return result
+
+
+def photo_bytes(slug):
+    seed = slug.encode()
+    return (seed * (PHOTO_SIZE // len(seed) + 1))[:PHOTO_SIZE]
+
+
+def make_handler(faculty, latency):
+    kinds = {slug: kind for _, slug, kind in faculty}
+    directory = ''.join(f'<div class="person"><h3><a href="/people/faculty/{slug}">{name}</a></h3>'
+                        f'<p>Professor</p></div>' for name, slug, _ in faculty).encode()
+
+    class PhotoSiteHandler(BaseHTTPRequestHandler):
+        protocol_version = 'HTTP/1.1'
+        disable_nagle_algorithm = True
+
+        def log_message(self, format, *args):
+            pass  # Keep benchmark output clean
+
+        def _send(self, status, body, content_type):
+            time.sleep(latency)
+            self.send_response(status)
+            self.send_header('Content-Type', content_type)
+            self.send_header('Content-Length', str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def do_GET(self):
+            path = self.path.split('?')[0].rstrip('/')
+            if path == '/people/faculty':
+                return self._send(200, f'<html><body>{directory.decode()}</body></html>'.encode(), 'text/html')
+            slug = path.rsplit('/', 1)[-1].rsplit('.', 1)[0]
+            kind = kinds.get(slug)
+            if kind is None or kind == 'missing':
+                return self._send(404, b'<html><title>Not Found</title></html>', 'text/html')
+            if path.startswith('/sites/default/files/'):
+                return self._send(200, photo_bytes(slug), 'image/jpeg')
+            src = '/themes/eemb/placeholder.png' if kind == 'placeholder' else f'/sites/default/files/{slug}.jpg'
+            html = (f'<html><body><article class="node-person"><h1>{slug}</h1>'
+                    f'<img typeof="foaf:Image" src="{src}"></article></body></html>')
+            self._send(200, html.encode(), 'text/html')
+
+    return PhotoSiteHandler
+
+
+@contextlib.contextmanager
+def serve_photo_site(faculty, latency):
+    server = ThreadingHTTPServer(('127.0.0.1', 0), make_handler(faculty, latency))
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    try:
+        yield f'http://127.0.0.1:{server.server_address[1]}'
+    finally:
+        server.shutdown()
+        server.server_close()
+
+
+def make_db(path, faculty):
+    """A faculties table like Strapi's: every tenth person already has a photo, plus a few not in the directory"""
+    conn = sqlite3.connect(path)
+    conn.execute("CREATE TABLE faculties (id INTEGER PRIMARY KEY, full_name TEXT, photo_url TEXT, updated_at TEXT)")
+    rows = [(name, '/uploads/faculty/existing.jpg' if n % 10 == 3 else None) for n, (name, _, _) in enumerate(faculty)]
+    rows += [(f"Visiting Scholar{n}", None) for n in range(3)]
+    conn.executemany("INSERT INTO faculties (full_name, photo_url) VALUES (?, ?)", rows)
+    conn.commit()
+    conn.close()
+
+
+def harvest(label, base_url, faculty, workdir, **options):
+    db_path = os.path.join(workdir, f"{label}.db")
+    photo_dir = os.path.join(workdir, label)
+    make_db(db_path, faculty)
+    output = io.StringIO()
+    start = time.perf_counter()
+    with contextlib.redirect_stdout(output):
+        summary = update_faculty_photos(db_path, photo_dir, f"{base_url}/people/faculty", **options)
+    elapsed = time.perf_counter() - start
+    conn = sqlite3.connect(db_path)
+    photos = conn.execute("SELECT id, photo_url FROM faculties ORDER BY id").fetchall()
+    conn.close()
+    return elapsed, summary, photos, photo_dir, output.getvalue()
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark serial vs pipelined faculty photo harvest')
+    parser.add_argument('--people', type=int, default=200, help='Faculty in the synthetic directory')
+    parser.add_argument('--latency', type=float, default=0.05, help='Injected response latency (seconds)')
+    parser.add_argument('--pause', type=float, default=1.0, help="The serial scraper's pause per person")
+    parser.add_argument('--fetch-workers', type=int, default=4)
+    parser.add_argument('--image-workers', type=int, default=2)
+    parser.add_argument('--rps', type=float, default=4, help='Requests per second per host for the pipeline')
+    args = parser.parse_args()
+
+    faculty = people(args.people)
+    # Fetch every page for real; the HTTP cache would flatter the second run
+    os.environ['EEMB_HTTP_CACHE_MODE'] = 'off'
+    print(f"📊 Photo harvest benchmark: {len(faculty)} people, {args.latency * 1000:.0f}ms latency, "
+          f"{PHOTO_SIZE // 1024}KB photos\n")
+
+    with tempfile.TemporaryDirectory() as workdir, serve_photo_site(faculty, args.latency) as base_url:
+        os.environ['EEMB_HTTP_CACHE_DIR'] = os.path.join(workdir, 'http-cache')
+        serial = harvest('serial', base_url, faculty, workdir, serial=True, pause=args.pause)
+        piped = harvest('pipeline', base_url, faculty, workdir, fetch_workers=args.fetch_workers,
+                        image_workers=args.image_workers, rps=args.rps, per_host=args.fetch_workers)
+
+        for label, (elapsed, summary, _, _, _) in (('serial', serial), ('pipeline', piped)):
+            print(f"  {label:10} {elapsed:7.1f}s   {summary['updated']} photos, {summary['failed']} failed, "
+                  f"{summary['commits']} commits")
+        print(f"\n  Speedup: {serial[0] / piped[0]:.1f}x")
+        print(piped[4][piped[4].index('⏱️'):].rstrip())
+
+        same_rows = serial[2] == piped[2]
+        serial_files, piped_files = sorted(os.listdir(serial[3])), sorted(os.listdir(piped[3]))
+        same_files = serial_files == piped_files and not filecmp.cmpfiles(
+            serial[3], piped[3], serial_files, shallow=False)[1] and not any(
+            name.endswith('.part') for name in piped_files)
+
+    print(f"\n  Same photo_url in every row: {'✅' if same_rows else '❌'}")
+    print(f"  Same photos on disk: {'✅' if same_files else '❌'}")
+    return 0 if same_rows and same_files else 1
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
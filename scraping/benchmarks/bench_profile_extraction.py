@@ -0,0 +1,272 @@
+#!/usr/bin/env python3
+"""
+EEMB Profile Extraction Benchmark
+Compares the single-pass profile extractor with the old per-field searches
+and checks that both return identical fields for every page.
+
+    python bench_profile_extraction.py                      # synthetic profile pages
+    python bench_profile_extraction.py --corpus saved_pages/
+    python bench_profile_extraction.py --archive ../data/archive
+"""
+
+import argparse
+import glob
+import os
+import random
+import re
+import sys
+import time
+from urllib.parse import urljoin
+
+from bs4 import BeautifulSoup
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'scripts'))
+
+from profile_extractor import extract_profile  # noqa: E402
+
+
+def legacy_extract(soup, profile_url):
+    """FacultyScraper.scrape_faculty_profile before the single-pass extractor"""
+    faculty = {}
+
+    title_tag = soup.find('title')
+    faculty['page_title'] = title_tag.text.strip() if title_tag else ''
+
+    name_tag = soup.find('h1') or soup.find('h2', class_=lambda x: x and 'name' in x.lower())
+    faculty['name'] = name_tag.text.strip() if name_tag else ''
+
+    email_link = soup.find('a', href=lambda x: x and 'mailto:' in x)
+    if email_link:
+        faculty['email'] = email_link['href'].replace('mailto:', '').strip()
+    else:
+        faculty['email'] = ''
+
+    phone_link = soup.find('a', href=lambda x: x and 'tel:' in x)
+    if phone_link:
+        faculty['phone'] = phone_link.text.strip()
+    else:
+        phone_pattern = re.compile(r'\(?\d{3}\)?[-.\s]?\d{3}[-.\s]?\d{4}')
+        phone_match = phone_pattern.search(soup.get_text())
+        faculty['phone'] = phone_match.group(0) if phone_match else ''
+
+    office_patterns = ['office', 'location', 'room', 'building']
+    faculty['office'] = ''
+    for tag in soup.find_all(['p', 'div', 'span']):
+        text = tag.text.lower()
+        if any(pattern in text for pattern in office_patterns):
+            faculty['office'] = tag.text.strip()
+            break
+
+    title_patterns = ['professor', 'lecturer', 'instructor', 'researcher']
+    faculty['title'] = ''
+    for tag in soup.find_all(['p', 'div', 'span', 'h2', 'h3']):
+        text = tag.text.lower()
+        if any(pattern in text for pattern in title_patterns):
+            faculty['title'] = tag.text.strip()
+            break
+
+    bio_headings = ['bio', 'about', 'biography', 'background', 'overview']
+    faculty['bio'] = ''
+    for heading in soup.find_all(['h2', 'h3', 'h4']):
+        if any(bio_word in heading.text.lower() for bio_word in bio_headings):
+            bio_parts = []
+            for sibling in heading.find_next_siblings():
+                if sibling.name in ['h2', 'h3', 'h4']:
+                    break
+                bio_parts.append(sibling.get_text(strip=True))
+            faculty['bio'] = ' '.join(bio_parts)
+            break
+
+    if not faculty['bio']:
+        main_content = (soup.find('main') or soup.find('article')
+                        or soup.find('div', class_=lambda x: x and 'content' in x.lower()))
+        if main_content:
+            faculty['bio'] = main_content.get_text(separator=' ', strip=True)[:1000]
+
+    research_headings = ['research', 'research interests', 'research areas']
+    faculty['research'] = ''
+    for heading in soup.find_all(['h2', 'h3', 'h4']):
+        if any(research_word in heading.text.lower() for research_word in research_headings):
+            research_parts = []
+            for sibling in heading.find_next_siblings():
+                if sibling.name in ['h2', 'h3', 'h4']:
+                    break
+                research_parts.append(sibling.get_text(strip=True))
+            faculty['research'] = ' '.join(research_parts)
+            break
+
+    lab_patterns = ['lab', 'website', 'personal', 'homepage']
+    faculty['lab_url'] = ''
+    for link in soup.find_all('a', href=True):
+        link_text = link.text.lower()
+        if any(pattern in link_text for pattern in lab_patterns):
+            faculty['lab_url'] = urljoin(profile_url, link['href'])
+            break
+
+    faculty['photo_url'] = ''
+    img_classes = ['profile', 'headshot', 'photo', 'avatar', 'faculty']
+    for img in soup.find_all('img'):
+        img_class = ' '.join(img.get('class', [])).lower()
+        img_alt = img.get('alt', '').lower()
+        if any(pattern in img_class or pattern in img_alt for pattern in img_classes):
+            faculty['photo_url'] = urljoin(profile_url, img['src'])
+            break
+
+    if not faculty['photo_url']:
+        for img in soup.find_all('img'):
+            src = img.get('src', '')
+            if src and not any(skip in src.lower() for skip in ['logo', 'icon', 'button']):
+                faculty['photo_url'] = urljoin(profile_url, src)
+                break
+
+    faculty['research_areas'] = []
+    for tag in soup.find_all(['span', 'a'], class_=lambda x: x and (
+            'tag' in x.lower() or 'category' in x.lower() or 'keyword' in x.lower())):
+        faculty['research_areas'].append(tag.text.strip())
+
+    faculty['research_areas_str'] = ', '.join(faculty['research_areas'])
+
+    return faculty
+
+
+WORDS = ('coral reef kelp forest population dynamics microbial community ocean acidification '
+         'phylogenetics disease ecology climate change fisheries evolution genomics '
+         'symbiosis biodiversity predator prey field experiments modeling').split()
+
+
+def synthetic_profile(n, rng, paragraphs):
+    """A Drupal-like faculty profile page; layout details vary with n"""
+    def sentence():
+        return ' '.join(rng.choice(WORDS) for _ in range(rng.randint(8, 20))).capitalize() + '.'
+
+    def para():
+        return '<p>' + ' '.join(sentence() for _ in range(rng.randint(2, 6))) + '</p>'
+
+    name = f"Alex Example{n}"
+    nav = ''.join(f'<li><a href="/section-{i}">Section {i}</a></li>' for i in range(40))
+    contact = [f'<a href="mailto:example{n}@ucsb.edu">example{n}@ucsb.edu</a>']
+    if n % 3:
+        contact.append(f'<a href="tel:805-893-{n % 10000:04d}">(805) 893-{n % 10000:04d}</a>')
+    else:
+        contact.append(f'<span>Phone 805.893.{n % 10000:04d}</span>')
+    if n % 4:
+        contact.append(f'<div class="field-office"><span>Office:</span> Noble Hall {1000 + n}</div>')
+    title = ['Professor', 'Associate Professor', 'Lecturer', 'Assistant Researcher'][n % 4]
+    if n % 5 == 0:
+        name_html = f'<h2 class="field-name">{name}</h2>'
+    else:
+        name_html = f'<h1 class="page-title">{name}</h1>'
+    sections = []
+    if n % 6:
+        sections.append('<h2>Biography</h2>' + ''.join(para() for _ in range(paragraphs)))
+    if n % 7:
+        sections.append('<h3>Research Interests</h3>' + ''.join(para() for _ in range(paragraphs))
+                        + '<ul>' + ''.join(f'<li>{sentence()}</li>' for _ in range(5)) + '</ul>')
+    sections.append('<h2>Publications</h2>' + ''.join(f'<div class="pub"><p>{sentence()}</p></div>'
+                                                      for _ in range(paragraphs * 4)))
+    tags = ''.join(f'<a class="taxonomy-term tag" href="/tags/{w}">{w}</a>'
+                   for w in rng.sample(WORDS, 4)) if n % 2 else ''
+    photo = (f'<img class="faculty-headshot" src="/files/people/{n}.jpg" alt="{name}">'
+             if n % 8 else f'<img src="/files/people/{n}.jpg">')
+    lab = f'<a href="https://lab{n}.example.edu">Lab Website</a>' if n % 3 != 1 else ''
+    return (
+        f'<!DOCTYPE html><html><head><title>{name} | EEMB</title>'
+        f'<style>.x {{ color: red }}</style><script>var office = "tel";</script></head><body>'
+        f'<header><img src="/themes/eemb/logo.png" alt="UCSB"><nav><ul>{nav}</ul></nav></header>'
+        f'<main><div class="region-content"><article>'
+        f'{name_html}<div class="field-position"><span>{title}</span></div>'
+        f'<div class="contact">{"".join(contact)}</div>{photo}'
+        f'<div class="body">{"".join(sections)}</div><div class="tags">{tags}</div>{lab}'
+        f'</article></div></main>'
+        f'<footer><p>Department of Ecology, Evolution, and Marine Biology</p>'
+        f'<p>Building 1 &middot; Santa Barbara</p></footer></body></html>'
+    )
+
+
+def synthetic_corpus(count, seed=0):
+    rng = random.Random(seed)
+    for n in range(count):
+        # Every tenth page is a long profile with a large publication list
+        paragraphs = 40 if n % 10 == 0 else rng.randint(2, 6)
+        yield f"https://eemb.ucsb.edu/people/faculty/example{n}", synthetic_profile(n, rng, paragraphs)
+
+
+def directory_corpus(directory):
+    for path in sorted(glob.glob(os.path.join(directory, '**', '*.htm*'), recursive=True)):
+        with open(path, 'rb') as f:
+            yield 'https://eemb.ucsb.edu/people/' + os.path.basename(path), f.read()
+
+
+def archive_corpus(archive_dir):
+    from page_archive import PageArchive
+
+    archive = PageArchive(archive_dir)
+    try:
+        for url, body in archive.iter_latest('html'):
+            if '/people/' in url:
+                yield url, body
+    finally:
+        archive.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark single-pass vs per-field profile extraction')
+    source = parser.add_mutually_exclusive_group()
+    source.add_argument('--corpus', help='Directory of saved profile .html files')
+    source.add_argument('--archive', help='Page archive directory; uses its /people/ pages')
+    parser.add_argument('--pages', type=int, default=200, help='Synthetic pages when no corpus is given')
+    parser.add_argument('--parser', default='html.parser', help='BeautifulSoup parser for both extractors')
+    args = parser.parse_args()
+
+    if args.corpus:
+        corpus = list(directory_corpus(args.corpus))
+    elif args.archive:
+        corpus = list(archive_corpus(args.archive))
+    else:
+        corpus = list(synthetic_corpus(args.pages))
+    if not corpus:
+        print("❌ No pages to benchmark")
+        return 1
+
+    print(f"📊 Profile extraction benchmark: {len(corpus)} pages, parser {args.parser}\n")
+
+    legacy_total = single_total = 0.0
+    slowest = []
+    mismatches = 0
+    for url, html in corpus:
+        # Each extractor gets its own tree so neither benefits from the other's work
+        legacy_soup = BeautifulSoup(html, args.parser)
+        single_soup = BeautifulSoup(html, args.parser)
+
+        start = time.perf_counter()
+        expected = legacy_extract(legacy_soup, url)
+        legacy_time = time.perf_counter() - start
+
+        start = time.perf_counter()
+        actual = extract_profile(single_soup, url)
+        single_time = time.perf_counter() - start
+
+        legacy_total += legacy_time
+        single_total += single_time
+        slowest.append((legacy_time, single_time, len(html), url))
+        if actual != expected:
+            mismatches += 1
+            if mismatches <= 5:
+                diff = [k for k in expected if expected[k] != actual.get(k)]
+                print(f"  ❌ Field mismatch on {url}: {', '.join(diff)}")
+
+    pages = len(corpus)
+    print(f"  {'per-field searches':24} {legacy_total:7.3f}s  {legacy_total / pages * 1000:7.2f} ms/page")
+    print(f"  {'single pass':24} {single_total:7.3f}s  {single_total / pages * 1000:7.2f} ms/page")
+    print(f"  Speedup: {legacy_total / single_total:.1f}x")
+
+    print("\n  Largest pages:")
+    for legacy_time, single_time, size, url in sorted(slowest, key=lambda r: -r[2])[:5]:
+        print(f"    {size / 1024:7.1f} KB  {legacy_time * 1000:7.2f} ms -> {single_time * 1000:6.2f} ms  {url}")
+
+    print(f"\n  Identical fields on every page: {'✅' if not mismatches else f'❌ ({mismatches} pages differ)'}")
+    return 1 if mismatches else 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
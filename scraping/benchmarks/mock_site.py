@@ -0,0 +1,172 @@
+#!/usr/bin/env python3
+"""
+EEMB Mock Site Server
+Local stand-in for eemb.ucsb.edu that serves a synthetic site for offline benchmarks.
+
+Every page links to a handful of other pages, a few images and a PDF, and
+section pages (/people/, /news/, ...) mirror the real site's layout closely
+enough for the crawler and downstream scrapers to exercise their full code
+paths. Pages are generated deterministically from their number, so two runs
+against the same page count see the same site.
+
+Run standalone:
+    python mock_site.py --pages 3000 --port 8765
+"""
+
+import argparse
+import hashlib
+import random
+import threading
+import time
+from contextlib import contextmanager
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+SECTIONS = ['people', 'news', 'research', 'academics', 'about']
+
+# 1x1 transparent GIF served for every image URL
+PIXEL_GIF = (b'GIF89a\x01\x00\x01\x00\x80\x00\x00\x00\x00\x00\xff\xff\xff!'
+             b'\xf9\x04\x01\x00\x00\x00\x00,\x00\x00\x00\x00\x01\x00\x01\x00'
+             b'\x00\x02\x02D\x01\x00;')
+
+# The synthetic site never changes
+LAST_MODIFIED = 'Mon, 06 Jan 2025 08:00:00 GMT'
+
+LOREM = ('kelp forest coral reef disease ecology phytoplankton evolution '
+         'genomics biodiversity ocean resilience climate nutrient cycling').split()
+
+
+def page_path(n):
+    """URL path of synthetic page n (page 0 is the home page)"""
+    if n == 0:
+        return '/'
+    return f'/{SECTIONS[n % len(SECTIONS)]}/page-{n}'
+
+
+def render_page(n, total_pages, links_per_page=8):
+    """Build the HTML for synthetic page n"""
+    rng = random.Random(n)
+    # Always link forward so the whole site is reachable from the home page
+    targets = {(n * links_per_page + i + 1) % total_pages for i in range(links_per_page)}
+    targets.update(rng.randrange(total_pages) for _ in range(links_per_page // 2))
+
+    nav = ''.join(f'<li><a href="/{s}/">{s.title()}</a></li>' for s in SECTIONS)
+    links = ''.join(f'<li><a href="{page_path(t)}">Page {t}</a></li>' for t in sorted(targets))
+    body = ' '.join(rng.choice(LOREM) for _ in range(300))
+
+    return f"""<!DOCTYPE html>
+<html>
+<head>
+  <title>Synthetic Page {n} | EEMB</title>
+  <meta name="description" content="Synthetic page {n} for offline benchmarks">
+</head>
+<body>
+  <nav><ul>{nav}</ul></nav>
+  <main>
+    <h1>Synthetic Page {n}</h1>
+    <img src="/sites/default/files/page-{n}.gif" alt="Page {n} photo">
+    <img src="/sites/default/files/logo.gif" alt="EEMB logo">
+    <div class="field-name-body"><p>{body}</p></div>
+    <p><a href="/sites/default/files/handbook-{n % 20}.pdf">Handbook</a></p>
+    <p><a href="https://doi.org/10.1000/{n}">Publication</a></p>
+    <ul>{links}</ul>
+  </main>
+</body>
+</html>"""
+
+
+def make_handler(total_pages, latency):
+    """Build a request handler class bound to a site size and latency"""
+
+    class MockSiteHandler(BaseHTTPRequestHandler):
+        protocol_version = 'HTTP/1.1'
+        disable_nagle_algorithm = True  # Headers and body go out in separate writes
+
+        def log_message(self, format, *args):
+            pass  # Keep benchmark output clean
+
+        def _send(self, status, body, content_type):
+            if latency:
+                time.sleep(latency)
+
+            # Validators so conditional GETs can be answered with 304
+            etag = '"%s"' % hashlib.md5(body).hexdigest()
+            if status == 200 and self.headers.get('If-None-Match') == etag:
+                self.send_response(304)
+                self.send_header('ETag', etag)
+                self.send_header('Content-Length', '0')
+                self.end_headers()
+                return
+
+            self.send_response(status)
+            self.send_header('Content-Type', content_type)
+            self.send_header('Content-Length', str(len(body)))
+            if status == 200:
+                self.send_header('ETag', etag)
+                self.send_header('Last-Modified', LAST_MODIFIED)
+            self.end_headers()
+            if self.command != 'HEAD':
+                self.wfile.write(body)
+
+        def do_GET(self):
+            path = self.path.split('?')[0]
+
+            if path.endswith('.gif'):
+                return self._send(200, PIXEL_GIF, 'image/gif')
+            if path.endswith('.pdf'):
+                return self._send(200, b'%PDF-1.4\n%%EOF\n', 'application/pdf')
+
+            if path == '/':
+                n = 0
+            elif path.rstrip('/') in (f'/{s}' for s in SECTIONS):
+                n = SECTIONS.index(path.strip('/')) + 1  # Section landing pages
+            else:
+                try:
+                    n = int(path.rsplit('-', 1)[1])
+                except (IndexError, ValueError):
+                    n = -1
+            if not 0 <= n < total_pages:
+                return self._send(404, b'<html><title>Not Found</title></html>', 'text/html; charset=utf-8')
+
+            html = render_page(n, total_pages).encode('utf-8')
+            self._send(200, html, 'text/html; charset=utf-8')
+
+        do_HEAD = do_GET
+
+    return MockSiteHandler
+
+
+@contextmanager
+def serve_mock_site(pages=3000, latency=0.0, port=0):
+    """Serve a synthetic site on localhost for the duration of a with-block
+
+    Yields the base URL, e.g. "http://127.0.0.1:54321".
+    """
+    server = ThreadingHTTPServer(('127.0.0.1', port), make_handler(pages, latency))
+    server.daemon_threads = True
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    try:
+        yield f'http://127.0.0.1:{server.server_address[1]}'
+    finally:
+        server.shutdown()
+        server.server_close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Serve a synthetic EEMB site locally')
+    parser.add_argument('--pages', type=int, default=3000)
+    parser.add_argument('--latency', type=float, default=0.0, help='Seconds of delay per response')
+    parser.add_argument('--port', type=int, default=8765)
+    args = parser.parse_args()
+
+    with serve_mock_site(args.pages, args.latency, args.port) as base_url:
+        print(f"🌐 Serving {args.pages} synthetic pages at {base_url} (Ctrl+C to stop)")
+        try:
+            while True:
+                time.sleep(1)
+        except KeyboardInterrupt:
+            pass
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,240 @@
+#!/usr/bin/env python3
+"""
+EEMB Mock Strapi Server
+Local stand-in for the Strapi v4 REST API, for testing the import scripts offline.
+
+Speaks enough of the API for the importers: paginated and slug-filtered
+GET /api/<collection>, POST /api/<collection> and PUT /api/<collection>/<id>,
+with Strapi's response envelope ({data: {id, attributes}, meta: {pagination}}),
+its page size cap and a unique-field check like Strapi's ValidationError.
+Latency and a share of 503 answers can be injected to exercise
+pooling and retries. Everything is kept in memory.
+
+Run standalone:
+    python mock_strapi.py --port 1337
+"""
+
+import argparse
+import json
+import random
+import threading
+import time
+from contextlib import contextmanager
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+# backend/config/api.js
+DEFAULT_PAGE_SIZE = 25
+MAX_PAGE_SIZE = 100
+
+# Attributes Strapi keeps unique (uid and unique: true fields of the faculty schema)
+UNIQUE_FIELDS = ('slug', 'email')
+
+
+class MockStrapiStore:
+    """Collections of entries {id: attributes}, shared by the handler threads"""
+
+    def __init__(self, entries=None):
+        self.lock = threading.Lock()
+        self.collections = {}
+        self.next_id = 1
+        self.requests = 0
+        for collection, records in (entries or {}).items():
+            for record in records:
+                self.create(collection, record)
+
+    def entries(self, collection):
+        with self.lock:
+            return dict(self.collections.get(collection, {}))
+
+    def conflict(self, collection, data, entry_id=None):
+        for field in UNIQUE_FIELDS:
+            if data.get(field) is None:
+                continue
+            for other_id, other in self.collections.get(collection, {}).items():
+                if other_id != entry_id and other.get(field) == data[field]:
+                    return field
+        return None
+
+    def create(self, collection, data):
+        """(entry id, None) or (None, conflicting field)"""
+        with self.lock:
+            field = self.conflict(collection, data)
+            if field:
+                return None, field
+            entry_id = self.next_id
+            self.next_id += 1
+            now = time.strftime('%Y-%m-%dT%H:%M:%S.000Z', time.gmtime())
+            self.collections.setdefault(collection, {})[entry_id] = dict(data, createdAt=now, updatedAt=now)
+            return entry_id, None
+
+    def update(self, collection, entry_id, data):
+        """(True, None), (False, None) if missing, or (False, conflicting field)"""
+        with self.lock:
+            entry = self.collections.get(collection, {}).get(entry_id)
+            if entry is None:
+                return False, None
+            field = self.conflict(collection, data, entry_id)
+            if field:
+                return False, field
+            entry.update(data, updatedAt=time.strftime('%Y-%m-%dT%H:%M:%S.000Z', time.gmtime()))
+            return True, None
+
+
+def make_handler(store, latency, fail_rate, seed):
+    """Build a request handler class bound to a store, latency and failure rate"""
+    rng = random.Random(seed)
+    rng_lock = threading.Lock()
+
+    class MockStrapiHandler(BaseHTTPRequestHandler):
+        protocol_version = 'HTTP/1.1'
+        disable_nagle_algorithm = True
+
+        def log_message(self, format, *args):
+            pass  # Keep benchmark output clean
+
+        def _send(self, status, payload):
+            body = json.dumps(payload).encode('utf-8')
+            self.send_response(status)
+            self.send_header('Content-Type', 'application/json; charset=utf-8')
+            self.send_header('Content-Length', str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def _error(self, status, name, message):
+            self._send(status, {'data': None, 'error': {'status': status, 'name': name, 'message': message}})
+
+        def _route(self):
+            """(collection, entry id or None, query), or None after answering the request itself"""
+            length = int(self.headers.get('Content-Length') or 0)
+            self.body = self.rfile.read(length) if length else b''
+            with store.lock:
+                store.requests += 1
+            if latency:
+                time.sleep(latency)
+            with rng_lock:
+                failed = rng.random() < fail_rate
+            if failed:
+                self._error(503, 'ServiceUnavailableError', 'Injected failure')
+                return None
+
+            url = urlparse(self.path)
+            parts = url.path.strip('/').split('/')
+            if len(parts) not in (2, 3) or parts[0] != 'api':
+                self._error(404, 'NotFoundError', 'Not Found')
+                return None
+            entry_id = None
+            if len(parts) == 3:
+                if not parts[2].isdigit():
+                    self._error(404, 'NotFoundError', 'Not Found')
+                    return None
+                entry_id = int(parts[2])
+            return parts[1], entry_id, {k: v[0] for k, v in parse_qs(url.query).items()}
+
+        def _data(self):
+            try:
+                data = json.loads(self.body or b'{}').get('data')
+            except (ValueError, AttributeError):
+                data = None
+            if not isinstance(data, dict):
+                self._error(400, 'ValidationError', 'Missing "data" payload in the request body')
+                return None
+            return data
+
+        def do_GET(self):
+            route = self._route()
+            if route is None:
+                return
+            collection, entry_id, query = route
+            entries = store.entries(collection)
+            if entry_id is not None:
+                if entry_id not in entries:
+                    return self._error(404, 'NotFoundError', 'Not Found')
+                return self._send(200, {'data': {'id': entry_id, 'attributes': entries[entry_id]}, 'meta': {}})
+
+            filters = {key[len('filters['):].split(']')[0]: value for key, value in query.items()
+                       if key.startswith('filters[') and key.endswith('][$eq]')}
+            matches = [(i, e) for i, e in sorted(entries.items())
+                       if all(str(e.get(field)) == value for field, value in filters.items())]
+
+            page = max(1, int(query.get('pagination[page]', 1)))
+            page_size = min(MAX_PAGE_SIZE, max(1, int(query.get('pagination[pageSize]', DEFAULT_PAGE_SIZE))))
+            rows = matches[(page - 1) * page_size:page * page_size]
+            self._send(200, {
+                'data': [{'id': i, 'attributes': e} for i, e in rows],
+                'meta': {'pagination': {'page': page, 'pageSize': page_size,
+                                        'pageCount': -(-len(matches) // page_size), 'total': len(matches)}},
+            })
+
+        def do_POST(self):
+            route = self._route()
+            if route is None:
+                return
+            collection, entry_id, _ = route
+            if entry_id is not None:
+                return self._error(405, 'MethodNotAllowedError', 'Method Not Allowed')
+            data = self._data()
+            if data is None:
+                return
+            new_id, field = store.create(collection, data)
+            if field:
+                return self._error(400, 'ValidationError', f'{field}: This attribute must be unique')
+            self._send(200, {'data': {'id': new_id, 'attributes': store.entries(collection)[new_id]}, 'meta': {}})
+
+        def do_PUT(self):
+            route = self._route()
+            if route is None:
+                return
+            collection, entry_id, _ = route
+            if entry_id is None:
+                return self._error(405, 'MethodNotAllowedError', 'Method Not Allowed')
+            data = self._data()
+            if data is None:
+                return
+            ok, field = store.update(collection, entry_id, data)
+            if field:
+                return self._error(400, 'ValidationError', f'{field}: This attribute must be unique')
+            if not ok:
+                return self._error(404, 'NotFoundError', 'Not Found')
+            self._send(200, {'data': {'id': entry_id, 'attributes': store.entries(collection)[entry_id]}, 'meta': {}})
+
+    return MockStrapiHandler
+
+
+@contextmanager
+def serve_mock_strapi(entries=None, latency=0.0, fail_rate=0.0, seed=0, port=0):
+    """Serve a mock Strapi API on localhost for the duration of a with-block
+
+    `entries` pre-populates collections ({'faculties': [attributes, ...]}).
+    Yields (base URL, MockStrapiStore) so callers can inspect what was written.
+    """
+    store = MockStrapiStore(entries)
+    server = ThreadingHTTPServer(('127.0.0.1', port), make_handler(store, latency, fail_rate, seed))
+    server.daemon_threads = True
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    try:
+        yield f'http://127.0.0.1:{server.server_address[1]}', store
+    finally:
+        server.shutdown()
+        server.server_close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Serve a mock Strapi REST API locally')
+    parser.add_argument('--port', type=int, default=1337)
+    parser.add_argument('--latency', type=float, default=0.0, help='Seconds of delay per response')
+    parser.add_argument('--fail-rate', type=float, default=0.0, help='Share of requests answered with 503')
+    args = parser.parse_args()
+
+    with serve_mock_strapi(latency=args.latency, fail_rate=args.fail_rate, port=args.port) as (base_url, _):
+        print(f"🌐 Mock Strapi API at {base_url}/api (Ctrl+C to stop)")
+        try:
+            while True:
+                time.sleep(1)
+        except KeyboardInterrupt:
+            pass
+
+
+if __name__ == "__main__":
+    main()
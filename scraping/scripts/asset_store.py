@@ -0,0 +1,198 @@
+#!/usr/bin/env python3
+"""
+EEMB Asset Store
+Content-addressed storage for downloaded images and documents.
+
+Every file is stored once under assets/store/objects/, named by the
+sha256 of its content. data/asset-index.db maps each source URL to the
+hash it last served, with its ETag and Last-Modified, so the next run can
+ask the server "has this changed?" instead of downloading it again.
+
+The familiar layout (assets/images/<name>, assets/documents/<name>) is
+kept as relative symlinks into the store. The index records which URL and
+hash own each readable name, so name conflicts are settled with a lookup
+instead of probing the file system.
+"""
+
+import mimetypes
+import os
+import shutil
+import sqlite3
+import time
+
+DEFAULT_ASSET_DIR = '../assets'
+DEFAULT_ASSET_INDEX = '../data/asset-index.db'
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS objects (
+    hash TEXT PRIMARY KEY,        -- sha256 of the content
+    path TEXT NOT NULL,           -- object file, relative to the asset directory
+    size INTEGER NOT NULL,
+    content_type TEXT,
+    stored_at REAL NOT NULL,      -- epoch seconds
+    ahash TEXT,                   -- perceptual hashes of images (image_hashing.py)
+    dhash TEXT,
+    phash TEXT
+);
+CREATE TABLE IF NOT EXISTS urls (
+    url TEXT PRIMARY KEY,
+    hash TEXT NOT NULL,
+    file_type TEXT,               -- 'image' or 'document'
+    local_path TEXT,              -- readable name, relative to the asset directory
+    etag TEXT,
+    last_modified TEXT,
+    fetched_at REAL NOT NULL      -- epoch seconds of the latest 200 or 304
+);
+CREATE INDEX IF NOT EXISTS urls_local_path ON urls (local_path);
+"""
+
+# Columns added after the first release, for index files created before them
+MIGRATIONS = {
+    'objects': [('ahash', 'TEXT'), ('dhash', 'TEXT'), ('phash', 'TEXT')],
+}
+
+
+class AssetStore:
+    """Content-addressed files plus a URL -> hash index
+
+    Not thread-safe: download workers hand their temporary files to the
+    thread that owns the store.
+    """
+
+    def __init__(self, asset_dir=DEFAULT_ASSET_DIR, index_path=DEFAULT_ASSET_INDEX, commit_every=50):
+        self.asset_dir = asset_dir
+        self.objects_dir = os.path.join(asset_dir, 'store', 'objects')
+        # Temporary downloads live on the same file system as the objects, so renames are atomic
+        self.tmp_dir = os.path.join(asset_dir, 'store', 'tmp')
+        os.makedirs(self.objects_dir, exist_ok=True)
+        os.makedirs(self.tmp_dir, exist_ok=True)
+        self.commit_every = commit_every
+        self.pending = 0
+        os.makedirs(os.path.dirname(os.path.abspath(index_path)), exist_ok=True)
+        self.conn = sqlite3.connect(index_path)
+        self.conn.row_factory = sqlite3.Row
+        self.conn.executescript(SCHEMA)
+        self.migrate()
+
+    def migrate(self):
+        for table, columns in MIGRATIONS.items():
+            existing = {row['name'] for row in self.conn.execute(f"PRAGMA table_info({table})")}
+            for name, sql_type in columns:
+                if name not in existing:
+                    self.conn.execute(f"ALTER TABLE {table} ADD COLUMN {name} {sql_type}")
+        self.conn.commit()
+
+    def lookup(self, url):
+        """Index entry of url joined with its object, or None if the object is gone"""
+        row = self.conn.execute(
+            "SELECT u.url, u.hash, u.file_type, u.local_path, u.etag, u.last_modified, "
+            "o.path, o.size, o.content_type "
+            "FROM urls u JOIN objects o ON o.hash = u.hash WHERE u.url = ?", (url,)
+        ).fetchone()
+        if row is None or not os.path.exists(os.path.join(self.asset_dir, row['path'])):
+            return None
+        return dict(row)
+
+    def conditional_headers(self, entry):
+        """If-None-Match / If-Modified-Since for a stored URL"""
+        headers = {}
+        if entry and entry['etag']:
+            headers['If-None-Match'] = entry['etag']
+        if entry and entry['last_modified']:
+            headers['If-Modified-Since'] = entry['last_modified']
+        return headers
+
+    def add_object(self, tmp_path, digest, size, content_type):
+        """Move a downloaded temporary file into the store; returns (object path, is_new)"""
+        row = self.conn.execute("SELECT path FROM objects WHERE hash = ?", (digest,)).fetchone()
+        if row is not None and os.path.exists(os.path.join(self.asset_dir, row['path'])):
+            os.remove(tmp_path)
+            return row['path'], False
+
+        ext = mimetypes.guess_extension((content_type or '').split(';')[0].strip()) or ''
+        relative = os.path.join('store', 'objects', digest[:2], digest + ext)
+        path = os.path.join(self.asset_dir, relative)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        # mkstemp creates files readable only by their owner
+        os.chmod(tmp_path, 0o644)
+        os.replace(tmp_path, path)
+        self.conn.execute(
+            "INSERT OR REPLACE INTO objects (hash, path, size, content_type, stored_at) VALUES (?, ?, ?, ?, ?)",
+            (digest, relative, size, content_type, time.time())
+        )
+        return relative, True
+
+    def claim_name(self, url, directory, filename, digest):
+        """Readable path (relative to the asset directory) for url's content
+
+        A URL keeps the name it had before in the same directory. Otherwise
+        it gets `filename`, unless another URL with different content owns
+        that name, in which case the name gets a short hash suffix.
+        """
+        row = self.conn.execute("SELECT local_path FROM urls WHERE url = ?", (url,)).fetchone()
+        if row is not None and row['local_path'] and os.path.dirname(row['local_path']) == directory:
+            return row['local_path']
+
+        candidate = os.path.join(directory, filename)
+        owner = self.conn.execute("SELECT hash FROM urls WHERE local_path = ? LIMIT 1", (candidate,)).fetchone()
+        if owner is None:
+            # Files left by downloads from before the store also count as taken,
+            # links to this same content do not
+            path = os.path.join(self.asset_dir, candidate)
+            if not os.path.lexists(path) or (os.path.islink(path) and digest in os.readlink(path)):
+                return candidate
+        elif owner['hash'] == digest:
+            return candidate
+        base, ext = os.path.splitext(filename)
+        return os.path.join(directory, f"{base}-{digest[:8]}{ext}")
+
+    def link(self, local_path, object_path):
+        """Point the readable name at its object (relative symlink, else a copy)"""
+        link_path = os.path.join(self.asset_dir, local_path)
+        target = os.path.join(self.asset_dir, object_path)
+        os.makedirs(os.path.dirname(link_path), exist_ok=True)
+        if os.path.islink(link_path) and os.path.realpath(link_path) == os.path.realpath(target):
+            return
+        tmp_link = link_path + '.tmp'
+        if os.path.lexists(tmp_link):
+            os.remove(tmp_link)
+        try:
+            os.symlink(os.path.relpath(target, os.path.dirname(link_path)), tmp_link)
+        except OSError:  # No symlinks (e.g. Windows without developer mode)
+            shutil.copyfile(target, tmp_link)
+        os.replace(tmp_link, link_path)
+
+    def record_url(self, url, digest, file_type, local_path, etag='', last_modified=''):
+        self.conn.execute(
+            "INSERT INTO urls (url, hash, file_type, local_path, etag, last_modified, fetched_at) "
+            "VALUES (?, ?, ?, ?, ?, ?, ?) "
+            "ON CONFLICT(url) DO UPDATE SET hash = excluded.hash, file_type = excluded.file_type, "
+            "local_path = excluded.local_path, etag = excluded.etag, "
+            "last_modified = excluded.last_modified, fetched_at = excluded.fetched_at",
+            (url, digest, file_type, local_path, etag, last_modified, time.time())
+        )
+        self.pending += 1
+        if self.pending >= self.commit_every:
+            self.commit()
+
+    def image_hashes(self, digest):
+        """Stored perceptual hashes of an object, or None if not computed yet"""
+        row = self.conn.execute("SELECT ahash, dhash, phash FROM objects WHERE hash = ?", (digest,)).fetchone()
+        if row is None or row['phash'] is None:
+            return None
+        return dict(row)
+
+    def set_image_hashes(self, digest, hashes):
+        self.conn.execute("UPDATE objects SET ahash = ?, dhash = ?, phash = ? WHERE hash = ?",
+                          (hashes['ahash'], hashes['dhash'], hashes['phash'], digest))
+
+    def object_count(self):
+        return self.conn.execute("SELECT COUNT(*) FROM objects").fetchone()[0]
+
+    def commit(self):
+        self.conn.commit()
+        self.pending = 0
+
+    def close(self):
+        self.commit()
+        self.conn.close()
@@ -0,0 +1,126 @@
+#!/usr/bin/env python3
+"""
+EEMB Async Link Validator
+asyncio engine for validate_links.py (--engine async).
+
+LinkValidator checks links from a thread pool over one requests session.
+With thousands of external links, most of the time goes to thread
+switching and reconnecting. AsyncLinkValidator makes the same checks from
+a single event loop with aiohttp:
+    - one keep-alive connection pool, at most `per_host` connections per host
+    - DNS answers cached for the whole run
+    - at most `max_workers` requests in flight overall
+    - the same per-host request rate as the threaded engine (AsyncHostThrottle)
+
+Everything else (link extraction, status cache, HEAD-to-GET fallback,
+result rows, save_results) is inherited, so both engines write identical
+files. Needs aiohttp (pip install aiohttp).
+"""
+
+import asyncio
+import time
+
+try:
+    import aiohttp
+except ImportError:  # the threaded engine still works without aiohttp
+    aiohttp = None
+
+from throttle import AsyncHostThrottle
+from validate_links import HEAD_REFUSED, LinkValidator
+
+# Seconds a resolved host name is reused
+DNS_CACHE_TTL = 300
+
+# Largest fallback GET body read to the end so its connection can be reused
+MAX_DRAIN_BYTES = 64 * 1024
+
+
+class AsyncLinkValidator(LinkValidator):
+    """LinkValidator whose requests run on an asyncio event loop"""
+
+    def __init__(self, timeout=10, max_workers=50, per_host=2, rps=5, **kwargs):
+        if aiohttp is None:
+            raise ValueError("The async link validator needs aiohttp (pip install aiohttp)")
+        super().__init__(timeout=timeout, max_workers=max_workers, per_host=per_host, rps=rps, **kwargs)
+        self.per_host = per_host
+        self.rps = rps
+
+    def check_urls(self, urls, handle):
+        asyncio.run(self._check_urls(urls, handle))
+
+    async def _check_urls(self, urls, handle):
+        connector = aiohttp.TCPConnector(
+            limit=self.max_workers,
+            limit_per_host=self.per_host,
+            use_dns_cache=True,
+            ttl_dns_cache=DNS_CACHE_TTL,
+        )
+        timeout = aiohttp.ClientTimeout(total=self.timeout)
+        headers = {'User-Agent': self.session.headers['User-Agent']}
+        throttle = AsyncHostThrottle(per_host=self.per_host, rps=self.rps)
+        in_flight = asyncio.Semaphore(self.max_workers)
+
+        async def check(url):
+            async with in_flight:
+                async with throttle.slot(url):
+                    result = await self.validate_url_async(session, url)
+            # Runs on the event loop thread, like the threaded engine's as_completed loop
+            handle(result)
+
+        async with aiohttp.ClientSession(connector=connector, timeout=timeout, headers=headers) as session:
+            await asyncio.gather(*(check(url) for url in urls))
+
+    async def request_status_async(self, session, url):
+        """HEAD, then a ranged GET if the server refuses HEAD; returns (status, final url, content type, method)"""
+        async with session.head(url, allow_redirects=True) as response:
+            if response.status not in HEAD_REFUSED:
+                return response.status, str(response.url), response.headers.get('Content-Type', ''), 'HEAD'
+        async with session.get(url, allow_redirects=True, headers={'Range': 'bytes=0-0'}) as response:
+            # aiohttp only returns a connection to the pool once its body has been read; a server that
+            # ignored the Range header with a large body is cheaper to disconnect from
+            if response.content_length is not None and response.content_length <= MAX_DRAIN_BYTES:
+                await response.read()
+            return response.status, str(response.url), response.headers.get('Content-Type', ''), 'GET'
+
+    async def validate_url_async(self, session, url, source_page=''):
+        """validate_url() for the event loop"""
+        try:
+            start_time = time.time()
+            status_code, final_url, content_type, method = await self.request_status_async(session, url)
+            response_time = time.time() - start_time
+
+            result = self.response_result(url, status_code, response_time, method,
+                                          final_url, content_type, source_page)
+
+        except asyncio.TimeoutError:
+            result = {
+                'url': url,
+                'source_page': source_page,
+                'status_code': 'timeout',
+                'status': 'timeout',
+                'response_time_ms': self.timeout * 1000,
+                'error': 'Request timeout',
+                'checked_at': time.strftime('%Y-%m-%d %H:%M:%S')
+            }
+
+        except aiohttp.ClientConnectionError:
+            result = {
+                'url': url,
+                'source_page': source_page,
+                'status_code': 'connection_error',
+                'status': 'error',
+                'error': 'Connection failed',
+                'checked_at': time.strftime('%Y-%m-%d %H:%M:%S')
+            }
+
+        except (aiohttp.ClientError, ValueError) as e:
+            result = {
+                'url': url,
+                'source_page': source_page,
+                'status_code': 'error',
+                'status': 'error',
+                'error': str(e),
+                'checked_at': time.strftime('%Y-%m-%d %H:%M:%S')
+            }
+
+        return result
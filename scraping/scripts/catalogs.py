@@ -0,0 +1,237 @@
+#!/usr/bin/env python3
+"""
+EEMB Catalog Schemas
+Typed Parquet copies of the scraper outputs, next to the CSV and JSON files.
+
+Each catalog (site map, faculty, link validation, images, documents) has
+an explicit column schema. Columns with few distinct values, such as
+`status` and `content_type`, are dictionary-encoded. HTTP status columns
+that mix numbers with words like 'timeout' are split in two: the number
+goes in `status_code` and the word in `status_code_error`. Columns a
+record has but the schema does not list are kept as strings, so nothing
+is dropped.
+
+Readers can load only the columns and rows they need:
+
+    from catalogs import read_catalog
+    broken = read_catalog('../data/link-validation.parquet', columns=['url', 'status'],
+                          filters=[('status', '!=', 'ok')])
+
+Needs pyarrow (pip install pyarrow). Without it write_parquet() prints a
+warning and the CSV/JSON outputs are unaffected.
+"""
+
+import json
+import os
+from datetime import datetime
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:  # CSV and JSON outputs still work without pyarrow
+    pa = None
+
+TIMESTAMP_FORMAT = '%Y-%m-%d %H:%M:%S'
+
+# Rows converted and written at a time
+ROW_GROUP_SIZE = 5000
+
+# Column kinds:
+#   string, category (dictionary-encoded string), int32, int64, float64, bool,
+#   timestamp ('%Y-%m-%d %H:%M:%S' strings), http_status (see module docstring),
+#   string_list, variants (image_derivatives.py variant list)
+SCHEMAS = {
+    'site_map': [
+        ('url', 'string'),
+        ('final_url', 'string'),
+        ('title', 'string'),
+        ('description', 'string'),
+        ('status_code', 'http_status'),
+        ('word_count', 'int32'),
+        ('internal_links_count', 'int32'),
+        ('external_links_count', 'int32'),
+        ('images_count', 'int32'),
+        ('content_type', 'category'),
+        ('last_modified', 'string'),
+        ('crawled_at', 'timestamp'),
+        ('error', 'string'),
+    ],
+    'faculty': [
+        ('profile_url', 'string'),
+        ('scraped_at', 'timestamp'),
+        ('page_title', 'string'),
+        ('name', 'string'),
+        ('email', 'string'),
+        ('phone', 'string'),
+        ('office', 'string'),
+        ('title', 'category'),
+        ('bio', 'string'),
+        ('research', 'string'),
+        ('lab_url', 'string'),
+        ('photo_url', 'string'),
+        ('research_areas', 'string_list'),
+        ('research_areas_str', 'string'),
+        ('error', 'string'),
+    ],
+    'link_validation': [
+        ('url', 'string'),
+        ('source_page', 'string'),
+        ('status_code', 'http_status'),
+        ('status', 'category'),
+        ('response_time_ms', 'float64'),
+        ('method', 'category'),
+        ('final_url', 'string'),
+        ('is_redirect', 'bool'),
+        ('content_type', 'category'),
+        ('error', 'category'),
+        ('checked_at', 'timestamp'),
+        ('from_cache', 'bool'),
+    ],
+    'documents': [
+        ('original_url', 'string'),
+        ('local_path', 'string'),
+        ('filename', 'string'),
+        ('file_type', 'category'),
+        ('content_type', 'category'),
+        ('file_size_bytes', 'int64'),
+        ('file_size_mb', 'float64'),
+        ('hash', 'string'),
+        ('object_path', 'string'),
+        ('status', 'category'),
+        ('downloaded_at', 'timestamp'),
+    ],
+}
+SCHEMAS['images'] = SCHEMAS['documents'] + [
+    ('dimensions', 'string'),
+    ('ahash', 'string'),
+    ('dhash', 'string'),
+    ('phash', 'string'),
+    ('cluster_id', 'int32'),
+    ('near_duplicates', 'string_list'),
+    ('variants', 'variants'),
+]
+
+
+def _arrow_type(kind):
+    return {
+        'string': pa.string(),
+        'category': pa.dictionary(pa.int32(), pa.string()),
+        'int32': pa.int32(),
+        'int64': pa.int64(),
+        'float64': pa.float64(),
+        'bool': pa.bool_(),
+        'timestamp': pa.timestamp('s'),
+        'string_list': pa.list_(pa.string()),
+        'variants': pa.list_(pa.struct([
+            ('width', pa.int32()),
+            ('height', pa.int32()),
+            ('format', pa.string()),
+            ('path', pa.string()),
+            ('bytes', pa.int64()),
+        ])),
+    }[kind]
+
+
+def _is_missing(value):
+    return value is None or value == '' or (isinstance(value, float) and value != value)
+
+
+def _as_string(value):
+    if _is_missing(value):
+        return None
+    return value if isinstance(value, str) else json.dumps(value)
+
+
+def _convert(value, kind):
+    """One record value -> the Python value pyarrow expects for the column kind"""
+    if kind in ('string', 'category'):
+        return _as_string(value)
+    if _is_missing(value):
+        return None
+    if kind in ('int32', 'int64'):
+        return int(value)
+    if kind == 'float64':
+        return float(value)
+    if kind == 'bool':
+        return bool(value)
+    if kind == 'timestamp':
+        return datetime.strptime(value, TIMESTAMP_FORMAT) if isinstance(value, str) else value
+    if kind == 'string_list':
+        return [str(v) for v in value]
+    return value  # variants: already a list of dicts
+
+
+def arrow_schema(catalog, extra_columns=()):
+    """pyarrow schema of a catalog, plus string columns for anything unlisted"""
+    fields = []
+    for name, kind in SCHEMAS[catalog]:
+        if kind == 'http_status':
+            fields.append(pa.field(name, pa.int16()))
+            fields.append(pa.field(name + '_error', _arrow_type('category')))
+        else:
+            fields.append(pa.field(name, _arrow_type(kind)))
+    fields.extend(pa.field(name, pa.string()) for name in extra_columns)
+    return pa.schema(fields)
+
+
+def to_table(records, catalog, extra_columns=None):
+    """Records (list of dicts) -> pyarrow Table with the catalog's schema"""
+    if extra_columns is None:
+        extra_columns = unlisted_columns(catalog, (name for record in records for name in record))
+
+    columns = {}
+    for name, kind in SCHEMAS[catalog]:
+        values = [record.get(name) for record in records]
+        if kind == 'http_status':
+            # 200 / 404 / 'timeout' / 'connection_error' -> number column + word column
+            columns[name] = [int(v) if str(v).isdigit() else None for v in values]
+            columns[name + '_error'] = [None if _is_missing(v) or str(v).isdigit() else str(v) for v in values]
+        else:
+            columns[name] = [_convert(v, kind) for v in values]
+    for name in extra_columns:
+        columns[name] = [_as_string(record.get(name)) for record in records]
+
+    return pa.Table.from_pydict(columns, schema=arrow_schema(catalog, extra_columns))
+
+
+def unlisted_columns(catalog, names):
+    """The names the catalog's schema does not list, in order, without repeats"""
+    known = {name for name, _ in SCHEMAS[catalog]}
+    return [name for name in dict.fromkeys(names) if name not in known]
+
+
+def write_parquet(records, catalog, path, columns=None):
+    """Write records as a typed Parquet file; returns the path, or None without pyarrow
+
+    Given `columns` (every key the records use, e.g. RecordSink.columns),
+    records may be any re-iterable and are written in row groups of
+    ROW_GROUP_SIZE without loading them all.
+    """
+    if pa is None:
+        print(f"  ⚠️  pyarrow not installed, skipping {path} (pip install pyarrow)")
+        return None
+    if columns is None:
+        records = list(records)
+        columns = [name for record in records for name in record]
+    extra = unlisted_columns(catalog, columns)
+
+    tmp_path = path + '.tmp'
+    with pq.ParquetWriter(tmp_path, arrow_schema(catalog, extra), compression='zstd') as writer:
+        batch = []
+        for record in records:
+            batch.append(record)
+            if len(batch) >= ROW_GROUP_SIZE:
+                writer.write_table(to_table(batch, catalog, extra))
+                batch = []
+        if batch:
+            writer.write_table(to_table(batch, catalog, extra))
+    # Readers never see a half-written file
+    os.replace(tmp_path, path)
+    return path
+
+
+def read_catalog(path, columns=None, filters=None):
+    """Load a Parquet catalog as a DataFrame, reading only the given columns and matching rows"""
+    if pa is None:
+        raise ValueError("Reading Parquet catalogs needs pyarrow (pip install pyarrow)")
+    return pq.read_table(path, columns=columns, filters=filters).to_pandas()
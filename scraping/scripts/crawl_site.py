@@ -4,26 +4,69 @@ EEMB Website Crawler
 Crawls entire eemb.ucsb.edu site and maps all pages, links, and content.
 """
 
+import argparse
+import asyncio
 import requests
-from bs4 import BeautifulSoup
+from requests.adapters import HTTPAdapter
 from urllib.parse import urljoin, urlparse
-import pandas as pd
 import time
 import os
 from tqdm import tqdm
-import json
+
+from crawl_state import DEFAULT_CRAWL_STATE, CrawlState, parse_revisit
+from frontier import CrawlFrontier
+from http_cache import create_session
+from page_archive import DEFAULT_ARCHIVE_DIR, PageArchive
+from page_store import DEFAULT_PAGE_STORE, PageStore, extract_edges
+from parsing import BACKENDS, parse_page, resolve_backend
+from record_sink import RecordSink, materialize
+from throttle import AsyncHostThrottle
+
+DEFAULT_RECORDS = '../data/site-map.jsonl'
 
 class EEMBSiteCrawler:
-    def __init__(self, start_url="https://eemb.ucsb.edu", max_pages=1000):
+    def __init__(self, start_url="https://eemb.ucsb.edu", max_pages=1000, delay=1,
+                 priority_patterns=None, by_depth=False, max_queued=None,
+                 page_store_path=DEFAULT_PAGE_STORE, archive_dir=DEFAULT_ARCHIVE_DIR, parser=None,
+                 crawl_state_path=DEFAULT_CRAWL_STATE, incremental=False, revisit_policy=None,
+                 records_path=DEFAULT_RECORDS):
         self.start_url = start_url
         self.max_pages = max_pages
+        self.delay = delay  # Seconds to sleep between pages in the serial crawl
         self.visited = set()
-        self.to_visit = [start_url]
-        self.site_map = []
-        self.session = requests.Session()
-        self.session.headers.update({
-            'User-Agent': 'EEMB-Scraper/1.0 (Content preservation for website redesign)'
-        })
+        # Pages waiting to be crawled; also remembers every URL ever queued
+        self.frontier = CrawlFrontier(
+            [start_url],
+            priority_patterns=priority_patterns,
+            by_depth=by_depth,
+            max_queued=max_queued
+        )
+        # Page records go to disk as they are made (None keeps them in a list)
+        self.site_map = RecordSink(records_path) if records_path else []
+        # Raw HTML and edges for the later pipeline stages (None to skip)
+        self.page_store = PageStore(page_store_path) if page_store_path else None
+        # Every fetched response, compressed and deduplicated (None to skip)
+        self.archive = PageArchive(archive_dir) if archive_dir else None
+        self.session = create_session('EEMB-Scraper/1.0 (Content preservation for website redesign)')
+        # HTML parser backend (see parsing.py); None picks EEMB_HTML_PARSER or html.parser
+        self.parser = resolve_backend(parser)
+        # Per-URL history across runs, drives incremental recrawls (None to skip)
+        self.crawl_state = CrawlState(crawl_state_path, revisit_policy) if crawl_state_path else None
+        self.incremental = False
+        if incremental and self.crawl_state is not None and self.crawl_state.page_count():
+            self.start_incremental(priority_patterns, by_depth, max_queued)
+
+    def start_incremental(self, priority_patterns, by_depth, max_queued):
+        """Queue only the known pages that are due; other known pages count as already seen"""
+        self.incremental = True
+        self.frontier = CrawlFrontier(priority_patterns=priority_patterns, by_depth=by_depth, max_queued=max_queued)
+        due = self.crawl_state.due()
+        for url, depth in due:
+            self.frontier.push(url, depth)
+        # New pages linked from refetched ones are still discovered and crawled
+        for url in self.crawl_state.urls():
+            self.frontier.mark_seen(url)
+        print(f"Incremental crawl: {len(due)} of {self.crawl_state.page_count()} known pages are due")
 
     def is_same_domain(self, url):
         """Check if URL belongs to eemb.ucsb.edu domain"""
@@ -40,166 +83,314 @@ class EEMBSiteCrawler:
             normalized += f"?{parsed.query}"
         return normalized
 
-    def extract_links(self, soup, base_url):
+    def extract_links(self, page, base_url):
         """Extract all links from page"""
         links = []
-        for link in soup.find_all('a', href=True):
-            full_url = urljoin(base_url, link['href'])
+        for href, _ in page.links():
+            full_url = urljoin(base_url, href)
             full_url = self.normalize_url(full_url)
             links.append(full_url)
         return links
 
-    def extract_images(self, soup, base_url):
+    def extract_images(self, page, base_url):
         """Extract all image URLs from page"""
         images = []
-        for img in soup.find_all('img', src=True):
-            img_url = urljoin(base_url, img['src'])
+        for src, alt, title in page.images():
+            img_url = urljoin(base_url, src)
             images.append({
                 'url': img_url,
-                'alt': img.get('alt', ''),
-                'title': img.get('title', '')
+                'alt': alt,
+                'title': title
             })
         return images
 
-    def crawl_page(self, url):
+    def crawl_page(self, url, depth=0):
         """Crawl a single page and extract data"""
         try:
             response = self.session.get(url, timeout=10, allow_redirects=True)
-
-            # Check if redirected
-            final_url = response.url
-            if final_url != url:
-                print(f"  Redirected: {url} → {final_url}")
-
-            soup = BeautifulSoup(response.content, 'html.parser')
-
-            # Extract page title
-            title = soup.find('title')
-            title_text = title.text.strip() if title else ''
-
-            # Extract meta description
-            meta_desc = soup.find('meta', attrs={'name': 'description'})
-            description = meta_desc.get('content', '') if meta_desc else ''
-
-            # Get text content
-            text_content = soup.get_text(separator=' ', strip=True)
-            word_count = len(text_content.split())
-
-            # Extract links
-            links = self.extract_links(soup, url)
-            internal_links = [l for l in links if self.is_same_domain(l)]
-            external_links = [l for l in links if not self.is_same_domain(l)]
-
-            # Extract images
-            images = self.extract_images(soup, url)
-
-            # Record page info
-            page_data = {
-                'url': url,
-                'final_url': final_url,
-                'title': title_text,
-                'description': description,
-                'status_code': response.status_code,
-                'word_count': word_count,
-                'internal_links_count': len(internal_links),
-                'external_links_count': len(external_links),
-                'images_count': len(images),
-                'content_type': response.headers.get('Content-Type', ''),
-                'last_modified': response.headers.get('Last-Modified', ''),
-                'crawled_at': time.strftime('%Y-%m-%d %H:%M:%S')
-            }
-
-            self.site_map.append(page_data)
-
-            # Add new internal links to crawl queue
-            for link in internal_links:
-                if link not in self.visited and link not in self.to_visit:
-                    self.to_visit.append(link)
-
+            self.process_response(url, response, depth)
             return True
 
         except requests.exceptions.Timeout:
-            print(f"  Timeout: {url}")
-            self.site_map.append({
-                'url': url,
-                'status_code': 'timeout',
-                'error': 'Request timeout'
-            })
+            self.record_error(url, 'timeout', 'Request timeout', depth)
             return False
 
         except requests.exceptions.RequestException as e:
-            print(f"  Error crawling {url}: {e}")
-            self.site_map.append({
-                'url': url,
-                'status_code': 'error',
-                'error': str(e)
-            })
+            self.record_error(url, 'error', str(e), depth)
             return False
 
+    def process_response(self, url, response, depth=0):
+        """Parse a fetched page, record it in the site map and queue its links"""
+        # Check if redirected
+        final_url = response.url
+        if final_url != url:
+            print(f"  Redirected: {url} → {final_url}")
+
+        if self.archive is not None:
+            self.archive.write_response(url, response)
+
+        page = parse_page(response.content, self.parser)
+
+        # Extract page title
+        title = page.title()
+        title_text = title.strip() if title is not None else ''
+
+        # Extract meta description
+        description = page.meta_content('description')
+
+        # Get text content
+        text_content = page.text(separator=' ', strip=True)
+        word_count = len(text_content.split())
+
+        # Extract links
+        links = self.extract_links(page, url)
+        internal_links = [l for l in links if self.is_same_domain(l)]
+        external_links = [l for l in links if not self.is_same_domain(l)]
+
+        # Extract images
+        images = self.extract_images(page, url)
+
+        # Persist HTML and edges so downstream stages don't re-download the page
+        content_type = response.headers.get('Content-Type', '')
+        if self.page_store is not None:
+            html = response.text if 'html' in content_type else None
+            self.page_store.save_page(url, final_url, response.status_code, content_type,
+                                      html, extract_edges(page, url))
+
+        # Record page info
+        page_data = {
+            'url': url,
+            'final_url': final_url,
+            'title': title_text,
+            'description': description,
+            'status_code': response.status_code,
+            'word_count': word_count,
+            'internal_links_count': len(internal_links),
+            'external_links_count': len(external_links),
+            'images_count': len(images),
+            'content_type': content_type,
+            'last_modified': response.headers.get('Last-Modified', ''),
+            'crawled_at': time.strftime('%Y-%m-%d %H:%M:%S')
+        }
+
+        self.site_map.append(page_data)
+        if self.crawl_state is not None:
+            self.crawl_state.record_fetch(url, response, page_data, depth)
+
+        # Add new internal links to crawl queue
+        for link in internal_links:
+            self.frontier.push(link, depth + 1)
+
+    def flush_stores(self):
+        """Commit the page store and archive so later stages can read them"""
+        if self.page_store is not None:
+            self.page_store.commit()
+        if self.archive is not None:
+            self.archive.flush()
+        if self.crawl_state is not None:
+            self.crawl_state.commit()
+
+    def record_error(self, url, status_code, error, depth=0):
+        """Record a page that could not be fetched"""
+        if status_code == 'timeout':
+            print(f"  Timeout: {url}")
+        else:
+            print(f"  Error crawling {url}: {error}")
+        record = {
+            'url': url,
+            'status_code': status_code,
+            'error': error
+        }
+        self.site_map.append(record)
+        if self.crawl_state is not None:
+            self.crawl_state.record_error(url, status_code, record, depth)
+
     def crawl(self):
         """Main crawl loop"""
         print(f"Starting crawl of {self.start_url}")
         print(f"Max pages: {self.max_pages}")
 
-        pbar = tqdm(total=min(len(self.to_visit), self.max_pages), desc="Crawling")
+        pbar = tqdm(total=min(len(self.frontier), self.max_pages), desc="Crawling")
 
-        while self.to_visit and len(self.visited) < self.max_pages:
-            url = self.to_visit.pop(0)
-
-            if url in self.visited:
-                continue
+        while self.frontier and len(self.visited) < self.max_pages:
+            url, depth = self.frontier.pop()
 
             print(f"\nCrawling ({len(self.visited)+1}/{self.max_pages}): {url}")
 
             self.visited.add(url)
-            self.crawl_page(url)
+            self.crawl_page(url, depth)
 
             pbar.update(1)
-            pbar.total = min(len(self.to_visit) + len(self.visited), self.max_pages)
+            pbar.total = min(len(self.frontier) + len(self.visited), self.max_pages)
             pbar.refresh()
 
             # Be polite - rate limit
-            time.sleep(1)
+            time.sleep(self.delay)
 
         pbar.close()
+        self.flush_stores()
         print(f"\n✅ Crawl complete! Visited {len(self.visited)} pages")
 
+    def crawl_async(self, concurrency=8, per_host=4, rps=4.0):
+        """Crawl with up to `concurrency` requests in flight
+
+        Replaces the fixed sleep of crawl() with a per-host budget: at most
+        `per_host` concurrent requests and `rps` request starts per second
+        against any single host. Produces the same site_map records.
+        """
+        print(f"Starting async crawl of {self.start_url}")
+        print(f"Max pages: {self.max_pages} | concurrency: {concurrency} | "
+              f"per host: {per_host} | rps: {rps or 'unlimited'}")
+
+        # Let the connection pool hold one keep-alive connection per worker
+        adapter = HTTPAdapter(pool_connections=concurrency, pool_maxsize=concurrency)
+        self.session.mount('http://', adapter)
+        self.session.mount('https://', adapter)
+
+        asyncio.run(self._crawl_async(concurrency, AsyncHostThrottle(per_host, rps)))
+        print(f"\n✅ Crawl complete! Visited {len(self.visited)} pages")
+
+    async def _crawl_async(self, concurrency, throttle):
+        pbar = tqdm(total=min(len(self.frontier), self.max_pages), desc="Crawling")
+        in_flight = set()
+
+        def fetch(url):
+            return self.session.get(url, timeout=10, allow_redirects=True)
+
+        async def crawl_one(url, depth):
+            try:
+                async with throttle.slot(url):
+                    response = await asyncio.to_thread(fetch, url)
+                # Parsing runs on the event loop so site_map and the queue
+                # are only ever touched from one thread
+                self.process_response(url, response, depth)
+            except requests.exceptions.Timeout:
+                self.record_error(url, 'timeout', 'Request timeout', depth)
+            except requests.exceptions.RequestException as e:
+                self.record_error(url, 'error', str(e), depth)
+
+        while True:
+            # Top up the worker set from the queue
+            while (self.frontier and len(in_flight) < concurrency
+                   and len(self.visited) < self.max_pages):
+                url, depth = self.frontier.pop()
+                self.visited.add(url)
+                in_flight.add(asyncio.create_task(crawl_one(url, depth)))
+
+            if not in_flight:
+                break
+
+            done, in_flight = await asyncio.wait(in_flight, return_when=asyncio.FIRST_COMPLETED)
+            pbar.update(len(done))
+            pbar.total = min(len(self.frontier) + len(self.visited), self.max_pages)
+            pbar.refresh()
+
+        pbar.close()
+        self.flush_stores()
+
     def save_results(self, output_dir='../data'):
-        """Save crawl results to CSV and JSON"""
+        """Save crawl results to CSV, JSON and Parquet"""
         os.makedirs(output_dir, exist_ok=True)
 
-        # Save as CSV
-        df = pd.DataFrame(self.site_map)
-        csv_path = os.path.join(output_dir, 'site-map.csv')
-        df.to_csv(csv_path, index=False)
-        print(f"✅ Site map saved to {csv_path}")
+        if isinstance(self.site_map, RecordSink):
+            self.site_map.sync()
+
+        # An incremental crawl only fetched the due pages; the others keep their previous entry
+        site_map = self.crawl_state.site_map() if self.incremental else self.site_map
+
+        # CSV, JSON (more detailed) and Parquet (typed, for analysis), streamed from the records
+        for path in materialize(site_map, os.path.join(output_dir, 'site-map'), 'site_map'):
+            print(f"✅ Site map saved to {path}")
 
-        # Save as JSON (more detailed)
-        json_path = os.path.join(output_dir, 'site-map.json')
-        with open(json_path, 'w') as f:
-            json.dump(self.site_map, f, indent=2)
-        print(f"✅ Site map saved to {json_path}")
+        # Pages that are new, changed or failing since the last crawl, for the later stages
+        if self.crawl_state is not None:
+            changes_path = os.path.join(output_dir, 'changed-pages.json')
+            delta = self.crawl_state.write_changes(
+                changes_path, 'incremental' if self.incremental else 'full', len(self.site_map)
+            )
+            print(f"✅ {len(delta['changes'])} changed pages saved to {changes_path}")
 
         # Print summary statistics
         print("\n📊 Crawl Statistics:")
-        print(f"  Total pages crawled: {len(self.site_map)}")
-        print(f"  Successful: {len([p for p in self.site_map if p.get('status_code') == 200])}")
-        print(f"  Errors: {len([p for p in self.site_map if p.get('status_code') != 200])}")
-        print(f"  Total internal links found: {sum(p.get('internal_links_count', 0) for p in self.site_map)}")
-        print(f"  Total external links found: {sum(p.get('external_links_count', 0) for p in self.site_map)}")
-        print(f"  Total images found: {sum(p.get('images_count', 0) for p in self.site_map)}")
-
-        return df
+        if self.incremental:
+            print(f"  Pages fetched this run: {len(self.site_map)}")
+            counts = {}
+            for change in self.crawl_state.changes:
+                counts[change['change']] = counts.get(change['change'], 0) + 1
+            print(f"  Changes: {counts.get('new', 0)} new, {counts.get('changed', 0)} changed, "
+                  f"{counts.get('gone', 0)} gone")
+        totals = {'pages': 0, 'successful': 0, 'internal': 0, 'external': 0, 'images': 0}
+        for p in site_map:
+            totals['pages'] += 1
+            totals['successful'] += p.get('status_code') == 200
+            totals['internal'] += p.get('internal_links_count', 0)
+            totals['external'] += p.get('external_links_count', 0)
+            totals['images'] += p.get('images_count', 0)
+        print(f"  Total pages crawled: {totals['pages']}")
+        print(f"  Successful: {totals['successful']}")
+        print(f"  Errors: {totals['pages'] - totals['successful']}")
+        print(f"  Total internal links found: {totals['internal']}")
+        print(f"  Total external links found: {totals['external']}")
+        print(f"  Total images found: {totals['images']}")
+        print(f"  {self.session.cache_summary()}")
+        if self.page_store is not None:
+            print(f"  Pages stored for later stages: {self.page_store.page_count()} ({self.page_store.path})")
+        if self.archive is not None:
+            print(f"  Archived: {self.archive.stats['responses']} new bodies, "
+                  f"{self.archive.stats['revisits']} unchanged ({self.archive.archive_path})")
+
+        return site_map
+
+    def close(self):
+        if isinstance(self.site_map, RecordSink):
+            self.site_map.close()
 
 def main():
     """Run the crawler"""
+    parser = argparse.ArgumentParser(description='Crawl the EEMB website')
+    parser.add_argument('--start-url', default='https://eemb.ucsb.edu')
+    parser.add_argument('--max-pages', type=int, default=500)  # Adjust as needed
+    parser.add_argument('--async', dest='use_async', action='store_true',
+                        help='Keep several requests in flight instead of crawling one page at a time')
+    parser.add_argument('--concurrency', type=int, default=8,
+                        help='Total requests in flight (async mode)')
+    parser.add_argument('--per-host', type=int, default=4,
+                        help='Concurrent requests per host (async mode)')
+    parser.add_argument('--rps', type=float, default=4.0,
+                        help='Request starts per second per host, 0 for unlimited (async mode)')
+    parser.add_argument('--priority', action='append', default=[], metavar='PATTERN',
+                        help='Crawl URLs containing PATTERN first (repeatable, e.g. --priority /people/)')
+    parser.add_argument('--by-depth', action='store_true',
+                        help='Crawl shallower pages before deeper ones')
+    parser.add_argument('--parser', choices=BACKENDS,
+                        help='HTML parser backend (default: EEMB_HTML_PARSER or html.parser)')
+    parser.add_argument('--incremental', action='store_true',
+                        help='Only refetch known pages that are due under the revisit policy')
+    parser.add_argument('--revisit', action='append', default=[], metavar='PATTERN=DAYS', type=parse_revisit,
+                        help='Revisit URLs containing PATTERN every DAYS days (repeatable, e.g. --revisit /news=1)')
+    parser.add_argument('--output-dir', default='../data')
+    args = parser.parse_args()
+
     crawler = EEMBSiteCrawler(
-        start_url="https://eemb.ucsb.edu",
-        max_pages=500  # Adjust as needed
+        start_url=args.start_url,
+        max_pages=args.max_pages,
+        priority_patterns=args.priority,
+        by_depth=args.by_depth,
+        page_store_path=os.path.join(args.output_dir, 'page-store.db'),
+        archive_dir=os.path.join(args.output_dir, 'archive'),
+        parser=args.parser,
+        crawl_state_path=os.path.join(args.output_dir, 'crawl-state.db'),
+        incremental=args.incremental,
+        revisit_policy=args.revisit,
+        records_path=os.path.join(args.output_dir, 'site-map.jsonl')
     )
 
-    crawler.crawl()
-    crawler.save_results()
+    if args.use_async:
+        crawler.crawl_async(concurrency=args.concurrency, per_host=args.per_host, rps=args.rps or None)
+    else:
+        crawler.crawl()
+    crawler.save_results(args.output_dir)
+    crawler.close()
 
     print("\n🎉 Done! Check ../data/site-map.csv for results")
 
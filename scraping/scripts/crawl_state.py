@@ -0,0 +1,183 @@
+#!/usr/bin/env python3
+"""
+EEMB Crawl State
+Persistent per-URL crawl history that makes incremental recrawls possible.
+
+Every page the crawler fetches is recorded in data/crawl-state.db with
+its fetch time, status, content hash, validators and site map entry. An
+incremental crawl (crawl_site.py --incremental) then only refetches pages
+that are due under the revisit policy: news and events daily, people
+weekly, everything else monthly. Pages that are not due keep their
+previous site map entry.
+
+Each crawl writes data/changed-pages.json, the pages that are new, whose
+content changed, or that started failing. download_images.py and
+validate_links.py read it with --changed-only.
+"""
+
+import hashlib
+import json
+import os
+import sqlite3
+import time
+
+DEFAULT_CRAWL_STATE = '../data/crawl-state.db'
+DEFAULT_CHANGES_PATH = '../data/changed-pages.json'
+
+DAY = 24 * 60 * 60
+
+# (URL pattern, days between visits); the first pattern found in the URL wins
+REVISIT_POLICY = [
+    ('/news', 1),
+    ('/events', 1),
+    ('/seminars', 1),
+    ('/people', 7),
+]
+DEFAULT_REVISIT_DAYS = 30
+# Pages that failed are retried on the next daily run
+ERROR_REVISIT_DAYS = 1
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS pages (
+    url TEXT PRIMARY KEY,
+    first_seen REAL NOT NULL,     -- epoch seconds
+    fetched_at REAL NOT NULL,     -- epoch seconds of the latest fetch
+    status_code TEXT,             -- HTTP status, or 'timeout' / 'error'
+    content_hash TEXT,            -- sha256 of the body, NULL if the fetch failed
+    etag TEXT,
+    last_modified TEXT,
+    depth INTEGER,
+    record TEXT                   -- site map entry of the latest fetch (JSON)
+);
+"""
+
+
+def parse_revisit(spec):
+    """'PATTERN=DAYS' command line value -> (pattern, days)"""
+    pattern, _, days = spec.rpartition('=')
+    if not pattern:
+        raise ValueError(f"Expected PATTERN=DAYS, got {spec!r}")
+    return pattern, float(days)
+
+
+def is_ok(status_code):
+    return str(status_code).isdigit() and int(status_code) < 400
+
+
+def load_changed_pages(path=DEFAULT_CHANGES_PATH, kinds=('new', 'changed')):
+    """URLs of the pages with a change of one of `kinds` in the latest crawl's delta, or None if there is none"""
+    if not os.path.exists(path):
+        return None
+    with open(path, 'r') as f:
+        delta = json.load(f)
+    return {c['url'] for c in delta.get('changes', []) if c['change'] in kinds}
+
+
+class CrawlState:
+    """Per-URL crawl history with a revisit policy"""
+
+    def __init__(self, path=DEFAULT_CRAWL_STATE, revisit_policy=None, commit_every=50):
+        self.path = path
+        # Caller-supplied patterns take precedence over the defaults
+        self.revisit_policy = list(revisit_policy or []) + REVISIT_POLICY
+        self.commit_every = commit_every
+        self.pending = 0
+        self.changes = []  # delta of the current crawl
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self.conn = sqlite3.connect(path)
+        self.conn.executescript(SCHEMA)
+
+    def revisit_days(self, url, status_code=200):
+        """Days a page may go unvisited before an incremental crawl fetches it again"""
+        if not is_ok(status_code):
+            return ERROR_REVISIT_DAYS
+        for pattern, days in self.revisit_policy:
+            if pattern in url:
+                return days
+        return DEFAULT_REVISIT_DAYS
+
+    def page_count(self):
+        return self.conn.execute("SELECT COUNT(*) FROM pages").fetchone()[0]
+
+    def urls(self):
+        return [row[0] for row in self.conn.execute("SELECT url FROM pages")]
+
+    def due(self, now=None):
+        """(url, depth) of every known page due for a visit, shallowest first"""
+        now = time.time() if now is None else now
+        rows = self.conn.execute("SELECT url, fetched_at, status_code, depth FROM pages ORDER BY depth, rowid")
+        return [(url, depth or 0) for url, fetched_at, status_code, depth in rows
+                if now - fetched_at >= self.revisit_days(url, status_code) * DAY]
+
+    def _previous(self, url):
+        return self.conn.execute(
+            "SELECT status_code, content_hash FROM pages WHERE url = ?", (url,)
+        ).fetchone()
+
+    def _save(self, url, status_code, content_hash, etag, last_modified, depth, record):
+        now = time.time()
+        previous = self._previous(url)
+        if previous is None:
+            change = 'new'
+        elif is_ok(previous[0]) and not is_ok(status_code):
+            change = 'gone'
+        elif content_hash is not None and content_hash != previous[1]:
+            change = 'changed'
+        else:
+            change = None
+
+        self.conn.execute(
+            "INSERT INTO pages "
+            "(url, first_seen, fetched_at, status_code, content_hash, etag, last_modified, depth, record) "
+            "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?) "
+            "ON CONFLICT(url) DO UPDATE SET fetched_at = excluded.fetched_at, status_code = excluded.status_code, "
+            "content_hash = excluded.content_hash, etag = excluded.etag, last_modified = excluded.last_modified, "
+            "depth = MIN(depth, excluded.depth), record = excluded.record",
+            (url, now, now, str(status_code), content_hash, etag, last_modified, depth, json.dumps(record))
+        )
+        if change:
+            self.changes.append({
+                'url': url,
+                'change': change,
+                'status_code': status_code,
+                'fetched_at': time.strftime('%Y-%m-%d %H:%M:%S', time.localtime(now))
+            })
+        self.pending += 1
+        if self.pending >= self.commit_every:
+            self.commit()
+        return change
+
+    def record_fetch(self, url, response, record, depth=0):
+        """Record a fetched page. Returns 'new', 'changed', 'gone' or None."""
+        return self._save(
+            url, response.status_code, hashlib.sha256(response.content).hexdigest(),
+            response.headers.get('ETag', ''), response.headers.get('Last-Modified', ''), depth, record
+        )
+
+    def record_error(self, url, status_code, record, depth=0):
+        """Record a page that could not be fetched at all"""
+        return self._save(url, status_code, None, '', '', depth, record)
+
+    def site_map(self):
+        """Latest site map entry of every known page, in the order pages were first found"""
+        return [json.loads(row[0]) for row in self.conn.execute("SELECT record FROM pages ORDER BY rowid")]
+
+    def write_changes(self, path=DEFAULT_CHANGES_PATH, mode='full', fetched=0):
+        """Write the delta of the current crawl for the downstream stages"""
+        delta = {
+            'generated_at': time.strftime('%Y-%m-%d %H:%M:%S'),
+            'mode': mode,
+            'pages_fetched': fetched,
+            'changes': self.changes,
+        }
+        with open(path, 'w') as f:
+            json.dump(delta, f, indent=2)
+        return delta
+
+    def commit(self):
+        self.conn.commit()
+        self.pending = 0
+
+    def close(self):
+        self.commit()
+        self.conn.close()
@@ -2,8 +2,26 @@
 """
 EEMB Image & Document Downloader
 Downloads all images and documents from scraped pages and creates inventory.
+
+Files are streamed to a temporary file in fixed-size chunks and hashed as
+they are written, so memory use does not grow with file size and an
+interrupted download never leaves a partial file. Image dimensions come
+from the file header only.
+
+Each image also gets perceptual hashes (image_hashing.py). The old site
+serves one headshot at several sizes and crops, so images-catalog.csv
+keeps only the highest-resolution image of each near-duplicate cluster.
+image-clusters.csv lists every image with its cluster.
+
+Downloads land in the content-addressed asset store (asset_store.py):
+each distinct file is stored once, and assets/images/ and
+assets/documents/ hold readable links to it. URLs downloaded by an
+earlier run are re-requested conditionally, so unchanged files cost a
+304 instead of a download. A small thread pool fetches in parallel under
+a per-host budget (throttle.HostThrottle).
 """
 
+import argparse
 import requests
 from urllib.parse import urlparse, urljoin
 import os
@@ -11,24 +29,78 @@ import hashlib
 import mimetypes
 from pathlib import Path
 import pandas as pd
-import json
+import tempfile
 from tqdm import tqdm
 import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from requests.adapters import HTTPAdapter
+
+from asset_store import DEFAULT_ASSET_DIR, DEFAULT_ASSET_INDEX, AssetStore
+from crawl_state import DEFAULT_CHANGES_PATH, load_changed_pages
+from http_cache import create_session
+from image_hashing import DEFAULT_MAX_DISTANCE, HASH_KINDS, cluster_near_duplicates, hamming, image_hashes
+from json_stream import iter_records
+from page_store import DEFAULT_PAGE_STORE, PageStore, is_document_link
+from parsing import parse_page
+from record_sink import RecordSink, materialize
+from throttle import HostThrottle
+
+# Bytes read from the network and written to disk at a time
+CHUNK_SIZE = 64 * 1024
+
+# Catalog rows as they are made: every image (before near-duplicate clustering) and every document
+DEFAULT_IMAGE_RECORDS = '../data/images-downloaded.jsonl'
+DEFAULT_DOCUMENT_RECORDS = '../data/documents-catalog.jsonl'
 
 class MediaDownloader:
-    def __init__(self, base_url="https://eemb.ucsb.edu"):
+    def __init__(self, base_url="https://eemb.ucsb.edu", asset_dir=DEFAULT_ASSET_DIR,
+                 index_path=DEFAULT_ASSET_INDEX, workers=4, per_host=2, rps=2,
+                 image_records_path=DEFAULT_IMAGE_RECORDS, document_records_path=DEFAULT_DOCUMENT_RECORDS):
         self.base_url = base_url
-        self.session = requests.Session()
-        self.session.headers.update({
-            'User-Agent': 'EEMB-Scraper/1.0 (Content preservation for website redesign)'
-        })
-        self.image_catalog = []
-        self.document_catalog = []
-        self.downloaded_hashes = set()  # Avoid duplicate downloads
-
-    def get_file_hash(self, content):
-        """Generate hash of file content to detect duplicates"""
-        return hashlib.md5(content).hexdigest()
+        self.session = create_session('EEMB-Scraper/1.0 (Content preservation for website redesign)')
+        adapter = HTTPAdapter(pool_connections=workers, pool_maxsize=workers)
+        self.session.mount('http://', adapter)
+        self.session.mount('https://', adapter)
+        self.workers = workers
+        # Replaces the fixed 0.5s sleep between downloads
+        self.throttle = HostThrottle(per_host=per_host, rps=rps)
+        self.store = AssetStore(asset_dir, index_path)
+        # Catalog rows go to disk as they are made (None keeps them in a list); a --changed-only
+        # run carries the rows of media still on unchanged pages over from the previous run
+        self.image_catalog = RecordSink(image_records_path, keep_previous=True) if image_records_path else []
+        self.document_catalog = RecordSink(document_records_path, keep_previous=True) if document_records_path else []
+        self.downloaded_hashes = set()  # Catalog each distinct file once per run
+        self.stats = {'downloaded': 0, 'not_modified': 0, 'duplicate': 0, 'failed': 0}
+
+    def stream_to_temp(self, response, directory):
+        """Write a streamed response body to a temporary file in directory, hashing as it goes
+
+        Returns (temp path, sha256 hex digest, size in bytes). The temporary
+        file is removed if the download fails part way.
+        """
+        digest = hashlib.sha256()
+        size = 0
+        fd, tmp_path = tempfile.mkstemp(dir=directory, prefix='.download-', suffix='.part')
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                for chunk in response.iter_content(chunk_size=CHUNK_SIZE):
+                    f.write(chunk)
+                    digest.update(chunk)
+                    size += len(chunk)
+        except BaseException:
+            os.remove(tmp_path)
+            raise
+        return tmp_path, digest.hexdigest(), size
+
+    def image_dimensions(self, path):
+        """'WIDTHxHEIGHT' read from the image header, without decoding the pixels"""
+        try:
+            from PIL import Image
+            # Image.open only parses the header; pixels load on first access
+            with Image.open(path) as img:
+                return f"{img.width}x{img.height}"
+        except Exception:
+            return None
 
     def get_filename_from_url(self, url):
         """Extract filename from URL"""
@@ -56,91 +128,189 @@ class MediaDownloader:
         else:
             return 'other'
 
-    def download_file(self, url, output_dir, file_type='image'):
+    def fetch(self, url, conditional_headers=None):
+        """Download url into the store's temporary directory (runs on a worker thread)
+
+        Returns a dict with the response metadata, plus tmp_path, hash
+        and size unless the server answered 304 Not Modified.
+        """
+        with self.throttle.slot(url):
+            response = self.session.get(url, timeout=30, stream=True, headers=conditional_headers or {})
+            with response:
+                fetched = {
+                    'url': url,
+                    'status_code': response.status_code,
+                    'content_type': response.headers.get('Content-Type', ''),
+                    'etag': response.headers.get('ETag', ''),
+                    'last_modified': response.headers.get('Last-Modified', ''),
+                }
+                if response.status_code == 304:
+                    return fetched
+                response.raise_for_status()
+                fetched['tmp_path'], fetched['hash'], fetched['size'] = self.stream_to_temp(
+                    response, self.store.tmp_dir)
+        return fetched
+
+    def store_download(self, fetched, file_type, previous=None, directory=None):
+        """Add a fetch() result to the store and the catalog (runs on the store's thread)
+
+        The readable link goes in `directory` under the asset directory,
+        by default images/ or documents/.
+        """
+        url = fetched['url']
+        if fetched['status_code'] == 304:
+            # The stored copy is still current
+            file_hash, object_path = previous['hash'], previous['path']
+            file_size, content_type = previous['size'], previous['content_type']
+            etag = fetched['etag'] or previous['etag']
+            last_modified = fetched['last_modified'] or previous['last_modified']
+            status = 'not_modified'
+        else:
+            content_type = fetched['content_type']
+            file_hash, file_size = fetched['hash'], fetched['size']
+            object_path, _ = self.store.add_object(fetched['tmp_path'], file_hash, file_size, content_type)
+            etag, last_modified = fetched['etag'], fetched['last_modified']
+            status = 'downloaded'
+        self.stats[status] += 1
+
+        # Get filename
+        filename = self.get_filename_from_url(url)
+
+        # Ensure proper extension
+        if '.' not in filename:
+            ext = mimetypes.guess_extension((content_type or '').split(';')[0])
+            if ext:
+                filename += ext
+
+        filepath = self.store.claim_name(url, directory or file_type + 's', filename, file_hash)
+        self.store.link(filepath, object_path)
+        self.store.record_url(url, file_hash, file_type, filepath, etag, last_modified)
+
+        # Check for duplicates
+        if file_hash in self.downloaded_hashes:
+            self.stats['duplicate'] += 1
+            print(f"  ⏭️  Skipping duplicate: {url}")
+            return None
+
+        self.downloaded_hashes.add(file_hash)
+
+        filepath = os.path.join(self.store.asset_dir, filepath)
+        object_file = os.path.join(self.store.asset_dir, object_path)
+
+        # Get dimensions and perceptual hashes for images
+        dimensions = self.image_dimensions(object_file) if file_type == 'image' else None
+        hashes = self.perceptual_hashes(file_hash, object_file) if file_type == 'image' else None
+
+        # Record in catalog
+        file_info = {
+            'original_url': url,
+            'local_path': filepath,
+            'filename': os.path.basename(filepath),
+            'file_type': file_type,
+            'content_type': content_type,
+            'file_size_bytes': file_size,
+            'file_size_mb': round(file_size / (1024 * 1024), 2),
+            'dimensions': dimensions,
+            'hash': file_hash,
+            **{kind: (hashes or {}).get(kind) for kind in (HASH_KINDS if file_type == 'image' else ())},
+            'object_path': object_file,
+            'status': status,
+            'downloaded_at': time.strftime('%Y-%m-%d %H:%M:%S')
+        }
+
+        if file_type == 'image':
+            self.image_catalog.append(file_info)
+        else:
+            self.document_catalog.append(file_info)
+
+        return filepath
+
+    def perceptual_hashes(self, file_hash, object_file):
+        """Perceptual hashes of a stored image, computed once per object"""
+        hashes = self.store.image_hashes(file_hash)
+        if hashes is None:
+            hashes = image_hashes(object_file)
+            if hashes is not None:
+                self.store.set_image_hashes(file_hash, hashes)
+        return hashes
+
+    def cluster_images(self, max_distance=DEFAULT_MAX_DISTANCE):
+        """Mark near-duplicate images; returns (representatives, every image with its cluster)
+
+        The representative of a cluster is its largest image by pixel
+        count, then by file size.
+        """
+        def resolution(info):
+            width, _, height = (info.get('dimensions') or '0x0').partition('x')
+            return int(width) * int(height), info['file_size_bytes']
+
+        # Cluster members are looked up by index, so the rows are loaded once here;
+        # candidates come from a BK-tree (image_hashing.py), not from comparing every pair
+        catalog = list(self.image_catalog)
+        representatives, members = [], []
+        clusters = cluster_near_duplicates(catalog, max_distance)
+        for cluster_id, cluster in enumerate(sorted(clusters, key=min)):
+            images = [catalog[i] for i in cluster]
+            best = max(images, key=resolution)
+            near_duplicates = [info['original_url'] for info in images if info is not best]
+            representatives.append(dict(best, cluster_id=cluster_id, near_duplicates=near_duplicates))
+            for info in images:
+                members.append({
+                    'cluster_id': cluster_id,
+                    'is_representative': info is best,
+                    'original_url': info['original_url'],
+                    'local_path': info['local_path'],
+                    'dimensions': info['dimensions'],
+                    'file_size_bytes': info['file_size_bytes'],
+                    'hash': info['hash'],
+                    'phash': info.get('phash'),
+                    'phash_distance': (None if info.get('phash') is None or best.get('phash') is None
+                                       else hamming(info['phash'], best['phash'])),
+                })
+        return representatives, members
+
+    def download_file(self, url, file_type='image', directory=None):
         """Download a single file"""
+        previous = self.store.lookup(url)
         try:
-            response = self.session.get(url, timeout=30, stream=True)
-            response.raise_for_status()
-
-            content = response.content
-            content_type = response.headers.get('Content-Type', '')
-
-            # Check for duplicates
-            file_hash = self.get_file_hash(content)
-            if file_hash in self.downloaded_hashes:
-                print(f"  ⏭️  Skipping duplicate: {url}")
-                return None
-
-            self.downloaded_hashes.add(file_hash)
-
-            # Get filename
-            filename = self.get_filename_from_url(url)
-
-            # Ensure proper extension
-            if '.' not in filename:
-                ext = mimetypes.guess_extension(content_type.split(';')[0])
-                if ext:
-                    filename += ext
-
-            # Create subdirectory by type
-            type_dir = os.path.join(output_dir, file_type + 's')
-            os.makedirs(type_dir, exist_ok=True)
-
-            # Full file path
-            filepath = os.path.join(type_dir, filename)
-
-            # Handle filename conflicts
-            base_name, ext = os.path.splitext(filename)
-            counter = 1
-            while os.path.exists(filepath):
-                filename = f"{base_name}_{counter}{ext}"
-                filepath = os.path.join(type_dir, filename)
-                counter += 1
-
-            # Write file
-            with open(filepath, 'wb') as f:
-                f.write(content)
-
-            file_size = len(content)
-
-            # Get dimensions for images
-            dimensions = None
-            if file_type == 'image':
-                try:
-                    from PIL import Image
-                    from io import BytesIO
-                    img = Image.open(BytesIO(content))
-                    dimensions = f"{img.width}x{img.height}"
-                except Exception:
-                    pass
-
-            # Record in catalog
-            file_info = {
-                'original_url': url,
-                'local_path': filepath,
-                'filename': filename,
-                'file_type': file_type,
-                'content_type': content_type,
-                'file_size_bytes': file_size,
-                'file_size_mb': round(file_size / (1024 * 1024), 2),
-                'dimensions': dimensions,
-                'hash': file_hash,
-                'downloaded_at': time.strftime('%Y-%m-%d %H:%M:%S')
-            }
-
-            if file_type == 'image':
-                self.image_catalog.append(file_info)
-            else:
-                self.document_catalog.append(file_info)
-
-            return filepath
-
+            fetched = self.fetch(url, self.store.conditional_headers(previous))
         except requests.exceptions.RequestException as e:
+            self.stats['failed'] += 1
             print(f"  ❌ Error downloading {url}: {e}")
             return None
-
-    def download_from_site_map(self, site_map_path='../data/site-map.json', output_dir='../assets'):
-        """Download all media from site map"""
+        return self.store_download(fetched, file_type, previous, directory)
+
+    def download_all(self, items, desc="Downloading", directory=None):
+        """Download (file_type, url) pairs on the worker pool
+
+        Index lookups and store updates stay on this thread; workers only
+        do the HTTP request and write the temporary file.
+        """
+        with ThreadPoolExecutor(max_workers=self.workers) as executor:
+            futures = {}
+            for file_type, url in items:
+                previous = self.store.lookup(url)
+                future = executor.submit(self.fetch, url, self.store.conditional_headers(previous))
+                futures[future] = (file_type, url, previous)
+
+            for future in tqdm(as_completed(futures), total=len(futures), desc=desc):
+                file_type, url, previous = futures[future]
+                try:
+                    fetched = future.result()
+                except requests.exceptions.RequestException as e:
+                    self.stats['failed'] += 1
+                    print(f"  ❌ Error downloading {url}: {e}")
+                    continue
+                self.store_download(fetched, file_type, previous, directory)
+        self.store.commit()
+
+    def download_from_site_map(self, site_map_path='../data/site-map.json',
+                               page_store_path=DEFAULT_PAGE_STORE, changes_path=None):
+        """Download all media from site map
+
+        With `changes_path` only the media of the pages in that crawl delta
+        (changed-pages.json) are downloaded.
+        """
         print("📥 Starting media download from site map")
 
         # Load site map
@@ -149,12 +319,89 @@ class MediaDownloader:
             print("  Run crawl_site.py first!")
             return
 
-        with open(site_map_path, 'r') as f:
-            site_map = json.load(f)
-
-        print(f"  Found {len(site_map)} pages in site map")
+        changed, gone = None, set()
+        if changes_path:
+            changed = load_changed_pages(changes_path)
+            if changed is None:
+                print(f"  No crawl delta at {changes_path}, processing every page")
+            else:
+                # Pages that now fail lose their media along with the changed pages
+                gone = load_changed_pages(changes_path, kinds=('gone',))
+
+        # Pages are read from the site map one at a time, never all at once
+        pages = selected = 0
+        unchanged = set()
+
+        def site_map():
+            nonlocal pages, selected
+            for page in iter_records(site_map_path):
+                pages += 1
+                if changed is None or page.get('url') in changed:
+                    selected += 1
+                    yield page
+                elif page.get('url') not in gone:
+                    unchanged.add(page.get('url'))
 
         # Extract all image and document URLs from pages
+        still_linked = None  # Media of the unchanged pages; None when unknown (no page store)
+        store = PageStore.open_existing(page_store_path)
+        if store is not None:
+            print(f"  Reading media edges from page store {page_store_path}")
+            urls_to_download = self.media_urls_from_store(store, site_map())
+            if changed is not None:
+                still_linked = {target for kind in ('image', 'document')
+                                for _, _, target, _ in store.iter_edges(kind, unchanged)}
+            store.close()
+        else:
+            print("  No page store found, re-fetching pages")
+            urls_to_download = self.media_urls_from_pages(site_map())
+
+        print(f"  Found {pages} pages in site map")
+        if changed is not None:
+            print(f"  Only the {selected} new or changed pages from {changes_path}")
+        print(f"\n📊 Found {len(urls_to_download)} unique media files to download")
+
+        # Download all files
+        self.download_all(sorted(urls_to_download))
+
+        if changed is not None:
+            kept = self.carry_over(still_linked)
+            print(f"  Kept {kept} catalog rows of media on the {len(unchanged)} unchanged pages from the last run")
+
+        print(f"\n✅ Download complete!")
+
+    def carry_over(self, still_linked=None):
+        """Copy the previous run's catalog rows this run did not replace; returns how many
+
+        A row is kept unless this run cataloged the same file, or (when
+        `still_linked` is known) no unchanged page links to it any more.
+        """
+        def keep(record):
+            if record.get('hash') in self.downloaded_hashes:
+                return False
+            if still_linked is not None and record.get('original_url') not in still_linked:
+                return False
+            self.downloaded_hashes.add(record.get('hash'))
+            return True
+
+        kept = 0
+        for catalog in (self.image_catalog, self.document_catalog):
+            if isinstance(catalog, RecordSink):
+                kept += catalog.carry_over(keep)
+        return kept
+
+    def media_urls_from_store(self, store, site_map):
+        """Image and document URLs of the site map's pages, read from the crawler's page store"""
+        page_urls = {page.get('url', '') for page in site_map}
+        urls_to_download = set()
+        for _, _, img_url, _ in store.iter_edges('image', page_urls):
+            urls_to_download.add(('image', img_url))
+        for _, _, doc_url, _ in store.iter_edges('document', page_urls):
+            urls_to_download.add(('document', doc_url))
+        return urls_to_download
+
+    def media_urls_from_pages(self, site_map):
+        """Image and document URLs of the site map's pages, found by re-fetching each page"""
         urls_to_download = set()
 
         for page in site_map:
@@ -163,19 +410,17 @@ class MediaDownloader:
             # Re-fetch page to get media
             try:
                 response = self.session.get(url, timeout=10)
-                from bs4 import BeautifulSoup
-                soup = BeautifulSoup(response.content, 'html.parser')
+                page = parse_page(response.content)
 
                 # Find all images
-                for img in soup.find_all('img', src=True):
-                    img_url = urljoin(url, img['src'])
+                for src, _, _ in page.images():
+                    img_url = urljoin(url, src)
                     urls_to_download.add(('image', img_url))
 
                 # Find all document links
-                for link in soup.find_all('a', href=True):
-                    href = link['href']
+                for href, _ in page.links():
                     # Check if it's a document
-                    if any(ext in href.lower() for ext in ['.pdf', '.doc', '.docx', '.xls', '.xlsx', '.ppt', '.pptx', '.csv']):
+                    if is_document_link(href):
                         doc_url = urljoin(url, href)
                         urls_to_download.add(('document', doc_url))
 
@@ -183,16 +428,9 @@ class MediaDownloader:
                 print(f"  Error processing {url}: {e}")
                 continue
 
-        print(f"\n📊 Found {len(urls_to_download)} unique media files to download")
-
-        # Download all files
-        for file_type, url in tqdm(list(urls_to_download), desc="Downloading"):
-            self.download_file(url, output_dir, file_type)
-            time.sleep(0.5)  # Rate limit
-
-        print(f"\n✅ Download complete!")
+        return urls_to_download
 
-    def download_faculty_photos(self, faculty_data_path='../data/faculty-scraped.json', output_dir='../assets'):
+    def download_faculty_photos(self, faculty_data_path='../data/faculty-scraped.json'):
         """Download all faculty photos from scraped faculty data"""
         print("📥 Downloading faculty photos")
 
@@ -201,67 +439,73 @@ class MediaDownloader:
             print("  Run scrape_faculty.py first!")
             return
 
-        with open(faculty_data_path, 'r') as f:
-            faculty_data = json.load(f)
-
-        photo_urls = [f.get('photo_url') for f in faculty_data if f.get('photo_url')]
+        photo_urls = [f.get('photo_url') for f in iter_records(faculty_data_path) if f.get('photo_url')]
         print(f"  Found {len(photo_urls)} faculty photos to download")
 
-        # Create faculty-specific subdirectory
-        faculty_dir = os.path.join(output_dir, 'images', 'faculty')
-        os.makedirs(faculty_dir, exist_ok=True)
-
-        for url in tqdm(photo_urls, desc="Faculty photos"):
-            self.download_file(url, output_dir, 'image')
-            time.sleep(0.5)
+        # Readable links in a faculty-specific subdirectory
+        faculty_dir = os.path.join('images', 'faculty')
+        self.download_all([('image', url) for url in dict.fromkeys(photo_urls)], "Faculty photos", faculty_dir)
 
-        print(f"✅ Faculty photos downloaded to {faculty_dir}")
+        print(f"✅ Faculty photos downloaded to {os.path.join(self.store.asset_dir, faculty_dir)}")
 
     def save_catalog(self, output_dir='../data'):
-        """Save media catalog to CSV and JSON"""
+        """Save media catalogs to CSV, JSON and Parquet"""
         os.makedirs(output_dir, exist_ok=True)
 
-        # Save image catalog
+        # Save image catalog, one representative per near-duplicate cluster
         if self.image_catalog:
-            df_images = pd.DataFrame(self.image_catalog)
-            csv_path = os.path.join(output_dir, 'images-catalog.csv')
-            df_images.to_csv(csv_path, index=False)
-            print(f"✅ Image catalog saved to {csv_path}")
+            representatives, members = self.cluster_images()
+            for path in materialize(representatives, os.path.join(output_dir, 'images-catalog'), 'images'):
+                print(f"✅ Image catalog saved to {path}")
 
-            json_path = os.path.join(output_dir, 'images-catalog.json')
-            with open(json_path, 'w') as f:
-                json.dump(self.image_catalog, f, indent=2)
+            clusters_path = os.path.join(output_dir, 'image-clusters.csv')
+            pd.DataFrame(members).to_csv(clusters_path, index=False)
+            print(f"✅ {len(members) - len(representatives)} near-duplicate images listed in {clusters_path}")
 
-        # Save document catalog
+        # Save document catalog, streamed from its rows
         if self.document_catalog:
-            df_docs = pd.DataFrame(self.document_catalog)
-            csv_path = os.path.join(output_dir, 'documents-catalog.csv')
-            df_docs.to_csv(csv_path, index=False)
-            print(f"✅ Document catalog saved to {csv_path}")
-
-            json_path = os.path.join(output_dir, 'documents-catalog.json')
-            with open(json_path, 'w') as f:
-                json.dump(self.document_catalog, f, indent=2)
+            for path in materialize(self.document_catalog, os.path.join(output_dir, 'documents-catalog'),
+                                    'documents'):
+                print(f"✅ Document catalog saved to {path}")
 
         # Print summary
         print("\n📊 Download Statistics:")
         print(f"  Images downloaded: {len(self.image_catalog)}")
         print(f"  Documents downloaded: {len(self.document_catalog)}")
+        print(f"  Fetched: {self.stats['downloaded']} downloaded, {self.stats['not_modified']} not modified (304), "
+              f"{self.stats['duplicate']} duplicates, {self.stats['failed']} failed")
+        print(f"  Asset store: {self.store.object_count()} distinct files in {self.store.objects_dir}")
         print(f"  Total size (images): {sum(img['file_size_mb'] for img in self.image_catalog):.2f} MB")
         print(f"  Total size (documents): {sum(doc['file_size_mb'] for doc in self.document_catalog):.2f} MB")
+        print(f"  {self.session.cache_summary()}")
+
+    def close(self):
+        for catalog in (self.image_catalog, self.document_catalog):
+            if isinstance(catalog, RecordSink):
+                catalog.close()
+        self.store.close()
 
 def main():
     """Run the media downloader"""
-    downloader = MediaDownloader()
+    parser = argparse.ArgumentParser(description='Download the images and documents of every crawled page')
+    parser.add_argument('--changed-only', action='store_true',
+                        help='Only download media of pages the latest crawl found new or changed')
+    parser.add_argument('--workers', type=int, default=4, help='Downloads in flight across all hosts')
+    parser.add_argument('--per-host', type=int, default=2, help='Downloads in flight per host')
+    parser.add_argument('--rps', type=float, default=2, help='Download starts per second per host')
+    args = parser.parse_args()
+
+    downloader = MediaDownloader(workers=args.workers, per_host=args.per_host, rps=args.rps)
 
     # Download from site map
-    downloader.download_from_site_map()
+    downloader.download_from_site_map(changes_path=DEFAULT_CHANGES_PATH if args.changed_only else None)
 
     # Download faculty photos specifically
     downloader.download_faculty_photos()
 
     # Save catalog
     downloader.save_catalog()
+    downloader.close()
 
     print("\n🎉 Done! Check ../data/ for catalogs and ../assets/ for downloads")
 
@@ -0,0 +1,107 @@
+#!/usr/bin/env python3
+"""
+EEMB Crawl Frontier
+URL queue shared by the crawler and scrapers: constant-time push, pop and
+"have we seen this?" checks, optional prioritisation, reduced memory.
+"""
+
+import hashlib
+import heapq
+from collections import deque
+
+
+def url_key(url):
+    """128-bit digest of a URL, used instead of the full string in the seen-set
+
+    Unlike hash(), it is the same in every process, and two URLs sharing
+    a digest (which would leave the second one uncrawled) are not a
+    practical concern at 128 bits.
+    """
+    return hashlib.blake2b(url.encode('utf-8'), digest_size=16).digest()
+
+
+class CrawlFrontier:
+    """FIFO crawl queue with a seen-set and optional priorities
+
+    Without priorities this is a plain breadth-first queue. With
+    `priority_patterns` (e.g. ['/people/', '/news/']) URLs containing an
+    earlier pattern are popped before later ones, and URLs matching no
+    pattern come last. With `by_depth=True` shallower pages are popped
+    before deeper ones within the same pattern class. Each (pattern, depth)
+    class is its own deque, so push and pop stay O(1) in the number of
+    queued URLs.
+
+    Memory use is reduced, not bounded. The seen-set holds 16-byte
+    digests rather than URL strings, about 90 bytes per URL ever queued
+    with the bytes object and set slot, and it grows with every new URL.
+    Only the queue is bounded: `max_queued` caps the number of URLs
+    waiting in it. URLs pushed while the queue is full are dropped (and
+    counted in `dropped`) without being marked as seen.
+    """
+
+    def __init__(self, start_urls=(), priority_patterns=None, by_depth=False, max_queued=None):
+        self.priority_patterns = list(priority_patterns or [])
+        self.by_depth = by_depth
+        self.max_queued = max_queued
+        self.seen = set()
+        self.queues = {}      # priority class -> deque of (url, depth)
+        self.classes = []     # heap of priority classes with a non-empty deque
+        self.queued = 0
+        self.dropped = 0
+
+        for url in start_urls:
+            self.push(url)
+
+    def priority(self, url, depth):
+        """Priority class of a URL (lower pops first)"""
+        rank = len(self.priority_patterns)
+        for i, pattern in enumerate(self.priority_patterns):
+            if pattern in url:
+                rank = i
+                break
+        return (rank, depth if self.by_depth else 0)
+
+    def push(self, url, depth=0):
+        """Queue url unless it has been seen before. Returns True if queued."""
+        key = url_key(url)
+        if key in self.seen:
+            return False
+        if self.max_queued is not None and self.queued >= self.max_queued:
+            self.dropped += 1
+            return False
+
+        self.seen.add(key)
+        cls = self.priority(url, depth)
+        queue = self.queues.get(cls)
+        if queue is None:
+            queue = self.queues[cls] = deque()
+        if not queue:
+            heapq.heappush(self.classes, cls)
+        queue.append((url, depth))
+        self.queued += 1
+        return True
+
+    def pop(self):
+        """Remove and return the next (url, depth). Raises IndexError if empty."""
+        if not self.classes:
+            raise IndexError('pop from empty frontier')
+        cls = self.classes[0]
+        queue = self.queues[cls]
+        item = queue.popleft()
+        if not queue:
+            heapq.heappop(self.classes)
+        self.queued -= 1
+        return item
+
+    def mark_seen(self, url):
+        """Record url as seen without queueing it (e.g. the final URL of a redirect)"""
+        self.seen.add(url_key(url))
+
+    def __contains__(self, url):
+        return url_key(url) in self.seen
+
+    def __len__(self):
+        return self.queued
+
+    def __bool__(self):
+        return self.queued > 0
@@ -0,0 +1,196 @@
+#!/usr/bin/env python3
+"""
+EEMB HTTP Cache
+On-disk conditional-GET cache shared by all scrapers.
+
+Responses to GET requests are stored under a key derived from the
+normalized URL, together with their ETag / Last-Modified validators.
+Re-runs send If-None-Match / If-Modified-Since and reuse the stored body
+when the server answers 304 Not Modified.
+
+Modes (set with EEMB_HTTP_CACHE_MODE or create_session(mode=...)):
+    revalidate  - default; conditional GET for anything already cached
+    offline     - never touch the network for cached URLs, fail on misses
+    off         - plain requests.Session behaviour, nothing stored
+
+The cache lives in scraping/data/http-cache unless EEMB_HTTP_CACHE_DIR
+points somewhere else, so every script shares one cache regardless of
+its working directory.
+"""
+
+import hashlib
+import json
+import os
+import tempfile
+import time
+from urllib.parse import urlparse, urlunparse
+
+import requests
+from requests.structures import CaseInsensitiveDict
+
+DEFAULT_CACHE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'data', 'http-cache')
+MODES = ('revalidate', 'offline', 'off')
+
+
+def normalize_url(url):
+    """Canonical form of a URL used as the cache key
+
+    Lowercases scheme and host, drops default ports and the fragment, and
+    gives an empty path a trailing slash.
+    """
+    parsed = urlparse(url)
+    scheme = parsed.scheme.lower()
+    netloc = parsed.netloc.lower()
+    if (scheme, netloc.rsplit(':', 1)[-1]) in (('http', '80'), ('https', '443')):
+        netloc = netloc.rsplit(':', 1)[0]
+    return urlunparse((scheme, netloc, parsed.path or '/', parsed.params, parsed.query, ''))
+
+
+class OfflineCacheMiss(requests.exceptions.ConnectionError):
+    """Raised in offline mode when a URL has never been cached"""
+
+
+class HTTPCache:
+    """Body and validator storage keyed by normalized URL"""
+
+    def __init__(self, cache_dir=None):
+        self.cache_dir = os.path.abspath(cache_dir or os.environ.get('EEMB_HTTP_CACHE_DIR') or DEFAULT_CACHE_DIR)
+        self.stats = {'fetched': 0, 'revalidated': 0, 'offline_hits': 0, 'stored': 0}
+
+    def _paths(self, url):
+        key = hashlib.sha256(normalize_url(url).encode('utf-8')).hexdigest()
+        base = os.path.join(self.cache_dir, key[:2], key)
+        return base + '.json', base + '.body'
+
+    def get(self, url):
+        """Return (metadata, body) for a cached URL, or (None, None)"""
+        meta_path, body_path = self._paths(url)
+        try:
+            with open(meta_path, 'r') as f:
+                meta = json.load(f)
+            with open(body_path, 'rb') as f:
+                body = f.read()
+        except (FileNotFoundError, ValueError):
+            return None, None
+        return meta, body
+
+    def put(self, url, response, body=None):
+        """Store a response body and its validators"""
+        meta_path, body_path = self._paths(url)
+        os.makedirs(os.path.dirname(meta_path), exist_ok=True)
+        meta = {
+            'url': normalize_url(url),
+            'final_url': response.url,
+            'status_code': response.status_code,
+            'headers': dict(response.headers),
+            'etag': response.headers.get('ETag', ''),
+            'last_modified': response.headers.get('Last-Modified', ''),
+            'fetched_at': time.strftime('%Y-%m-%d %H:%M:%S')
+        }
+        # Body first, then metadata, each via rename so readers never see half an entry
+        self._atomic_write(body_path, response.content if body is None else body)
+        self._atomic_write(meta_path, json.dumps(meta, indent=2).encode('utf-8'))
+        self.stats['stored'] += 1
+
+    def _atomic_write(self, path, data):
+        fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path), suffix='.tmp')
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                f.write(data)
+            os.replace(tmp_path, path)
+        except BaseException:
+            if os.path.exists(tmp_path):
+                os.unlink(tmp_path)
+            raise
+
+    def conditional_headers(self, meta):
+        """Request headers that ask the server to revalidate a cached entry"""
+        headers = {}
+        if meta.get('etag'):
+            headers['If-None-Match'] = meta['etag']
+        if meta.get('last_modified'):
+            headers['If-Modified-Since'] = meta['last_modified']
+        return headers
+
+    def build_response(self, meta, body, request_url, response=None):
+        """Rebuild a requests.Response from a cache entry
+
+        When `response` is the live 304 reply its headers are merged over
+        the stored ones, as HTTP caches are supposed to.
+        """
+        if response is None:
+            response = requests.Response()
+            response.headers = CaseInsensitiveDict()
+            response.url = meta.get('final_url') or request_url
+        headers = CaseInsensitiveDict(meta.get('headers', {}))
+        headers.update(response.headers)
+        response.status_code = meta.get('status_code', 200)
+        response.headers = headers
+        response._content = body
+        response.encoding = requests.utils.get_encoding_from_headers(headers)
+        response.from_cache = True
+        return response
+
+
+class CachedSession(requests.Session):
+    """requests.Session that answers GETs through an HTTPCache
+
+    Streaming GETs (stream=True) and non-GET methods bypass the cache.
+    """
+
+    def __init__(self, cache=None, mode='revalidate'):
+        super().__init__()
+        if mode not in MODES:
+            raise ValueError(f"Unknown cache mode {mode!r}, expected one of {MODES}")
+        self.cache = cache or HTTPCache()
+        self.mode = mode
+
+    def request(self, method, url, **kwargs):
+        if self.mode == 'off' or method.upper() != 'GET' or kwargs.get('stream'):
+            return super().request(method, url, **kwargs)
+
+        meta, body = self.cache.get(url)
+
+        if self.mode == 'offline':
+            if meta is None:
+                raise OfflineCacheMiss(f"Not in HTTP cache (offline mode): {url}")
+            self.cache.stats['offline_hits'] += 1
+            return self.cache.build_response(meta, body, url)
+
+        if meta is not None:
+            headers = dict(kwargs.pop('headers', None) or {})
+            headers.update(self.cache.conditional_headers(meta))
+            kwargs['headers'] = headers
+
+        response = super().request(method, url, **kwargs)
+
+        if response.status_code == 304 and meta is not None:
+            self.cache.stats['revalidated'] += 1
+            return self.cache.build_response(meta, body, url, response)
+
+        self.cache.stats['fetched'] += 1
+        # Keep 404s too so offline replays report the same broken pages
+        if response.status_code < 500:
+            self.cache.put(url, response)
+        response.from_cache = False
+        return response
+
+    def cache_summary(self):
+        """One-line description of cache activity for end-of-run statistics"""
+        if self.mode == 'off':
+            return "HTTP cache: off"
+        s = self.cache.stats
+        return (f"HTTP cache ({self.mode}): {s['fetched']} fetched, "
+                f"{s['revalidated']} not modified (304), {s['offline_hits']} served offline")
+
+
+def create_session(user_agent, mode=None, cache_dir=None):
+    """Build the shared scraper session
+
+    Mode and cache directory default to EEMB_HTTP_CACHE_MODE and
+    EEMB_HTTP_CACHE_DIR so run_all.py can configure every stage at once.
+    """
+    mode = mode or os.environ.get('EEMB_HTTP_CACHE_MODE', 'revalidate')
+    session = CachedSession(HTTPCache(cache_dir), mode=mode)
+    session.headers.update({'User-Agent': user_agent})
+    return session
@@ -0,0 +1,310 @@
+#!/usr/bin/env python3
+"""
+EEMB Image Derivatives
+Builds responsive, modern-format variants of the downloaded photos and of
+the faculty photos already uploaded to the backend.
+
+Every source image gets resized copies at RESPONSIVE_WIDTHS (never wider
+than the original), each encoded as JPEG (PNG for images with
+transparency), WebP and, where Pillow can write it, AVIF. Variants live
+under assets/derivatives/<hash>/, keyed by the sha256 of the source, so
+the same photo saved under two names is processed once.
+
+Runs are incremental. data/image-derivatives.json records the variants
+of every source hash and the settings they were made with, and only new
+or changed sources are processed. Sources are resized in a process pool,
+one image per task. The variants of each image are also written into
+data/images-catalog.json and .csv.
+
+    python image_derivatives.py
+    python image_derivatives.py --source ../assets/images --widths 640,1280
+"""
+
+import argparse
+import hashlib
+import json
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import pandas as pd
+from PIL import Image, ImageOps
+from tqdm import tqdm
+
+try:
+    import pillow_avif  # noqa: F401  (registers AVIF with Pillow < 11)
+except ImportError:  # Recent Pillow has AVIF built in; older versions go without
+    pass
+
+from catalogs import write_parquet
+
+# Downloaded photos, and the faculty photos the backend serves (missing directories are skipped)
+DEFAULT_SOURCES = ['../assets/images', '../../backend/public/uploads/faculty']
+DEFAULT_OUTPUT_DIR = '../assets/derivatives'
+DEFAULT_MANIFEST = '../data/image-derivatives.json'
+DEFAULT_CATALOG = '../data/images-catalog.json'
+
+RESPONSIVE_WIDTHS = (320, 640, 960, 1280)
+FORMATS = ('jpeg', 'webp', 'avif')
+QUALITY = {'jpeg': 82, 'webp': 80, 'avif': 60}
+EXTENSIONS = {'jpeg': '.jpg', 'png': '.png', 'webp': '.webp', 'avif': '.avif'}
+
+SOURCE_EXTENSIONS = ('.jpg', '.jpeg', '.png', '.gif', '.webp')
+
+ORIENTATION_TAG = 0x0112  # EXIF Orientation; 5-8 mean the stored image is rotated a quarter turn
+
+
+def save_json(path, data):
+    """Write data as JSON through a temporary file, so readers never see a partial file"""
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    tmp_path = path + '.tmp'
+    with open(tmp_path, 'w') as f:
+        json.dump(data, f, indent=2)
+    os.replace(tmp_path, path)
+
+
+def available_formats(formats=FORMATS):
+    """The requested formats Pillow can actually write here"""
+    Image.init()
+    return [fmt for fmt in formats if fmt.upper() in Image.SAVE]
+
+
+def settings_key(widths, formats):
+    """Changes whenever the variants of an unchanged source would come out differently"""
+    return json.dumps({'widths': list(widths), 'formats': list(formats),
+                       'quality': {fmt: QUALITY[fmt] for fmt in formats if fmt in QUALITY}}, sort_keys=True)
+
+
+def file_sha256(path):
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(1024 * 1024), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def find_sources(directories, skip_dirs=()):
+    """Image files (and links to them) below the source directories"""
+    skip = {os.path.abspath(d) for d in skip_dirs}
+    for directory in directories:
+        for root, dirs, files in os.walk(directory):
+            dirs[:] = sorted(d for d in dirs if os.path.abspath(os.path.join(root, d)) not in skip)
+            for name in sorted(files):
+                if name.lower().endswith(SOURCE_EXTENSIONS) and not name.startswith('.'):
+                    yield os.path.join(root, name)
+
+
+def encode(img, fmt, path):
+    """Save one variant atomically; returns its size in bytes"""
+    tmp_path = path + '.tmp'
+    options = {'quality': QUALITY[fmt]} if fmt in QUALITY else {}
+    if fmt == 'jpeg':
+        options.update(optimize=True, progressive=True)
+    elif fmt == 'webp':
+        options.update(method=4)
+    img.save(tmp_path, format=fmt.upper(), **options)
+    os.replace(tmp_path, path)
+    return os.path.getsize(path)
+
+
+def make_derivatives(source_path, digest, output_dir, widths, formats):
+    """Resize and encode one source image (runs in a worker process)
+
+    Returns the manifest entry: source size and the list of variants.
+    """
+    target_dir = os.path.join(output_dir, digest[:2], digest)
+    os.makedirs(target_dir, exist_ok=True)
+
+    with Image.open(source_path) as img:
+        if getattr(img, 'is_animated', False):
+            return {'width': img.width, 'height': img.height, 'variants': [], 'skipped': 'animated'}
+
+        # The source's own size, upright; draft() below shrinks img.size
+        width, height = img.size
+        if img.getexif().get(ORIENTATION_TAG) in (5, 6, 7, 8):  # rotated by 90 or 270 degrees
+            width, height = height, width
+
+        # Let the JPEG decoder downscale by 2/4/8 while decoding when the largest variant
+        # allows it; both sides are kept >= that width since EXIF rotation may swap them
+        largest = min(max(widths), max(img.size))
+        img.draft('RGB', (largest, largest))
+        img = ImageOps.exif_transpose(img)
+
+        has_alpha = img.mode in ('RGBA', 'LA', 'PA') or (img.mode == 'P' and 'transparency' in img.info)
+        img = img.convert('RGBA' if has_alpha else 'RGB')
+
+        # Never upscale; a photo narrower than the smallest width gets one variant at its own size
+        targets = [w for w in widths if w <= width] or [width]
+
+        variants = []
+        for target_width in targets:
+            target_height = max(1, round(height * target_width / width))
+            size = (target_width, target_height)
+            resized = img if img.size == size else img.resize(size, Image.LANCZOS)
+            for fmt in formats:
+                if fmt == 'jpeg' and has_alpha:
+                    fmt = 'png'  # JPEG has no transparency
+                path = os.path.join(target_dir, f"{target_width}w{EXTENSIONS[fmt]}")
+                variants.append({
+                    'width': target_width,
+                    'height': target_height,
+                    'format': fmt,
+                    'path': path,
+                    'bytes': encode(resized, fmt, path),
+                })
+
+    return {'width': width, 'height': height, 'variants': variants}
+
+
+class DerivativeBuilder:
+    """Incremental responsive-variant generation for a set of source directories"""
+
+    def __init__(self, sources=None, output_dir=DEFAULT_OUTPUT_DIR, manifest_path=DEFAULT_MANIFEST,
+                 widths=RESPONSIVE_WIDTHS, formats=FORMATS, workers=None):
+        self.sources = list(sources or DEFAULT_SOURCES)
+        self.output_dir = output_dir
+        self.manifest_path = manifest_path
+        self.widths = sorted(widths)
+        self.formats = available_formats(formats)
+        self.workers = workers or os.cpu_count()
+        self.settings = settings_key(self.widths, self.formats)
+        self.manifest = self.load_manifest()
+        self.stats = {'processed': 0, 'up_to_date': 0, 'failed': 0}
+
+    def load_manifest(self):
+        if not os.path.exists(self.manifest_path):
+            return {'images': {}, 'hashes': {}}
+        with open(self.manifest_path, 'r') as f:
+            return json.load(f)
+
+    def source_hash(self, path):
+        """sha256 of a source file, reusing the last run's hash while size and mtime match"""
+        st = os.stat(path)
+        stamp = [st.st_size, st.st_mtime_ns]
+        cached = self.manifest['hashes'].get(path)
+        if cached and cached['stamp'] == stamp:
+            return cached['hash']
+        digest = file_sha256(path)
+        self.manifest['hashes'][path] = {'stamp': stamp, 'hash': digest}
+        return digest
+
+    def is_up_to_date(self, digest):
+        entry = self.manifest['images'].get(digest)
+        return (entry is not None and entry.get('settings') == self.settings
+                and all(os.path.exists(v['path']) for v in entry['variants']))
+
+    def run(self):
+        by_hash = {}
+        for path in find_sources(self.sources, skip_dirs=[self.output_dir]):
+            try:
+                by_hash.setdefault(self.source_hash(path), []).append(path)
+            except OSError as e:  # Dangling link or unreadable file
+                print(f"  ⚠️  Skipping {path}: {e}")
+
+        todo = {digest: paths for digest, paths in by_hash.items() if not self.is_up_to_date(digest)}
+        for digest, paths in by_hash.items():
+            if digest not in todo:
+                self.manifest['images'][digest]['sources'] = paths
+        self.stats['up_to_date'] = len(by_hash) - len(todo)
+
+        print(f"🖼️  {len(by_hash)} distinct source images, {len(todo)} new or changed")
+        print(f"  Widths: {', '.join(map(str, self.widths))} | formats: {', '.join(self.formats)} | "
+              f"workers: {self.workers}")
+
+        if todo:
+            with ProcessPoolExecutor(max_workers=self.workers) as executor:
+                futures = {
+                    executor.submit(make_derivatives, paths[0], digest, self.output_dir,
+                                    self.widths, self.formats): digest
+                    for digest, paths in todo.items()
+                }
+                for future in tqdm(as_completed(futures), total=len(futures), desc="Derivatives"):
+                    digest = futures[future]
+                    try:
+                        entry = future.result()
+                    except Exception as e:  # Truncated or unsupported image
+                        self.stats['failed'] += 1
+                        print(f"  ❌ {todo[digest][0]}: {e}")
+                        continue
+                    entry.update(sources=todo[digest], settings=self.settings,
+                                 generated_at=time.strftime('%Y-%m-%d %H:%M:%S'))
+                    self.manifest['images'][digest] = entry
+                    self.stats['processed'] += 1
+
+        # Forget files that are gone
+        self.manifest['hashes'] = {p: h for p, h in self.manifest['hashes'].items() if os.path.exists(p)}
+        save_json(self.manifest_path, self.manifest)
+        return self.manifest
+
+    def update_catalog(self, catalog_path=DEFAULT_CATALOG):
+        """Add each image's variants to images-catalog.json and .csv"""
+        if not os.path.exists(catalog_path):
+            print(f"  No image catalog at {catalog_path}, skipping")
+            return
+        with open(catalog_path, 'r') as f:
+            catalog = json.load(f)
+
+        images = self.manifest['images']
+        for row in catalog:
+            entry = images.get(row.get('hash'))
+            row['variants'] = entry['variants'] if entry else []
+
+        save_json(catalog_path, catalog)
+        csv_path = os.path.splitext(catalog_path)[0] + '.csv'
+        df = pd.DataFrame(catalog)
+        df['variants'] = df['variants'].apply(json.dumps)
+        df.to_csv(csv_path, index=False)
+        outputs = [catalog_path, csv_path]
+        parquet_path = write_parquet(catalog, 'images', os.path.splitext(catalog_path)[0] + '.parquet')
+        if parquet_path:
+            outputs.append(parquet_path)
+        print(f"✅ Variants recorded in {', '.join(outputs)}")
+
+    def print_summary(self):
+        variants = [v for e in self.manifest['images'].values() for v in e['variants']]
+        sizes = {}
+        for entry in self.manifest['images'].values():
+            for source in entry.get('sources', [])[:1]:
+                if os.path.exists(source):
+                    sizes[source] = os.path.getsize(source)
+        print("\n📊 Derivative Statistics:")
+        print(f"  Processed this run: {self.stats['processed']}")
+        print(f"  Already up to date: {self.stats['up_to_date']}")
+        print(f"  Failed: {self.stats['failed']}")
+        print(f"  Variants: {len(variants)} in {self.output_dir}")
+        print(f"  Originals: {sum(sizes.values()) / 1024 / 1024:.1f} MB")
+        for fmt in sorted({v['format'] for v in variants}):
+            fmt_bytes = sum(v['bytes'] for v in variants if v['format'] == fmt)
+            print(f"  {fmt.upper()} variants: {fmt_bytes / 1024 / 1024:.1f} MB")
+
+
+def main():
+    """Build image derivatives"""
+    parser = argparse.ArgumentParser(description='Build responsive WebP/AVIF variants of downloaded images')
+    parser.add_argument('--source', action='append', default=None, metavar='DIR',
+                        help=f"Directory of source images (repeatable, default: {' and '.join(DEFAULT_SOURCES)})")
+    parser.add_argument('--output', default=DEFAULT_OUTPUT_DIR, help='Directory for the variants')
+    parser.add_argument('--widths', default=','.join(map(str, RESPONSIVE_WIDTHS)),
+                        help='Comma-separated variant widths in pixels')
+    parser.add_argument('--formats', default=','.join(FORMATS), help='Comma-separated output formats')
+    parser.add_argument('--workers', type=int, default=None, help='Worker processes (default: one per core)')
+    args = parser.parse_args()
+
+    formats = [f.strip().lower() for f in args.formats.split(',') if f.strip()]
+    unknown = [f for f in formats if f not in EXTENSIONS]
+    if unknown:
+        parser.error(f"Unknown format(s): {', '.join(unknown)}")
+    missing = [f for f in formats if f not in available_formats(formats)]
+    if missing:
+        print(f"⚠️  This Pillow cannot write {', '.join(missing)}; skipping (AVIF: pip install pillow-avif-plugin)")
+
+    builder = DerivativeBuilder(args.source, args.output, widths=[int(w) for w in args.widths.split(',')],
+                                formats=formats, workers=args.workers)
+    builder.run()
+    builder.update_catalog()
+    builder.print_summary()
+
+    print("\n🎉 Done! Check ../assets/derivatives/ for the variants")
+
+if __name__ == "__main__":
+    main()
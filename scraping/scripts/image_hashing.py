@@ -0,0 +1,164 @@
+#!/usr/bin/env python3
+"""
+EEMB Image Hashing
+Perceptual hashes and near-duplicate clustering for the image catalog.
+
+The old site serves the same headshot at several sizes and crops, and
+an md5 of the bytes treats each copy as a different image. Perceptual
+hashes describe what the image looks like, so copies of one photo
+differ in only a few of their 64 bits:
+    ahash - pixels above/below the mean of an 8x8 thumbnail
+    dhash - brightness gradient between neighbours of a 9x8 thumbnail
+    phash - signs of the low DCT frequencies of a 32x32 thumbnail
+
+cluster_near_duplicates() groups images whose phash and dhash are both
+within a few bits. Candidates come from a BK-tree lookup rather than
+comparing every pair.
+"""
+
+import numpy as np
+from PIL import Image, ImageOps
+
+HASH_KINDS = ('ahash', 'dhash', 'phash')
+
+# Bits out of 64 two copies of one photo may differ by
+DEFAULT_MAX_DISTANCE = 8
+
+
+def _grayscale(img, size):
+    return np.asarray(img.convert('L').resize(size, Image.LANCZOS), dtype=np.float64)
+
+
+def _to_hex(bits):
+    value = 0
+    for bit in bits.flatten():
+        value = (value << 1) | int(bit)
+    return f"{value:016x}"
+
+
+def average_hash(img):
+    pixels = _grayscale(img, (8, 8))
+    return _to_hex(pixels > pixels.mean())
+
+
+def difference_hash(img):
+    pixels = _grayscale(img, (9, 8))
+    return _to_hex(pixels[:, 1:] > pixels[:, :-1])
+
+
+def _dct_matrix(n):
+    """Orthonormal DCT-II basis; C @ X @ C.T is the 2D DCT of X"""
+    k = np.arange(n)[:, None]
+    i = np.arange(n)[None, :]
+    matrix = np.sqrt(2.0 / n) * np.cos(np.pi * (2 * i + 1) * k / (2 * n))
+    matrix[0] /= np.sqrt(2.0)
+    return matrix
+
+
+_DCT_32 = _dct_matrix(32)
+
+
+def perceptual_hash(img):
+    pixels = _grayscale(img, (32, 32))
+    low = (_DCT_32 @ pixels @ _DCT_32.T)[:8, :8]
+    # The DC term is overall brightness, not structure
+    return _to_hex(low > np.median(low.flatten()[1:]))
+
+
+def image_hashes(path):
+    """{'ahash', 'dhash', 'phash'} hex strings of an image file, or None if it cannot be decoded"""
+    try:
+        with Image.open(path) as img:
+            # A 32x32 thumbnail needs nothing like full resolution. draft() lets the JPEG
+            # decoder scale down; other formats decode in full, so convert and shrink them
+            # once here (both sides kept >= 64) rather than in each of the three hashes
+            img.draft('RGB', (64, 64))
+            img = ImageOps.exif_transpose(img).convert('L')
+            factor = min(img.size) // 64
+            if factor > 1:
+                img = img.reduce(factor)
+            return {
+                'ahash': average_hash(img),
+                'dhash': difference_hash(img),
+                'phash': perceptual_hash(img),
+            }
+    except Exception:  # SVG, truncated download, ...
+        return None
+
+
+def hamming(a, b):
+    """Differing bits between two hex hashes"""
+    return bin(int(a, 16) ^ int(b, 16)).count('1')
+
+
+class BKTree:
+    """Metric tree over hex hashes under Hamming distance
+
+    search() only descends into children whose edge distance is within
+    `radius` of the query's distance to the node (triangle inequality),
+    so a lookup touches a small part of the tree.
+    """
+
+    def __init__(self):
+        self.root = None  # [hash, items, {distance: child}]
+
+    def add(self, key, item):
+        if self.root is None:
+            self.root = [key, [item], {}]
+            return
+        node = self.root
+        while True:
+            distance = hamming(key, node[0])
+            if distance == 0:
+                node[1].append(item)
+                return
+            child = node[2].get(distance)
+            if child is None:
+                node[2][distance] = [key, [item], {}]
+                return
+            node = child
+
+    def search(self, key, radius):
+        """(distance, item) of everything within radius of key"""
+        found = []
+        stack = [self.root] if self.root else []
+        while stack:
+            node = stack.pop()
+            distance = hamming(key, node[0])
+            if distance <= radius:
+                found.extend((distance, item) for item in node[1])
+            for edge, child in node[2].items():
+                if distance - radius <= edge <= distance + radius:
+                    stack.append(child)
+        return found
+
+
+def cluster_near_duplicates(records, max_distance=DEFAULT_MAX_DISTANCE):
+    """Group records that look like the same image
+
+    `records` are dicts with 'phash' and 'dhash' (records without hashes
+    stay on their own). Returns a list of clusters, each a list of
+    indexes into `records`.
+    """
+    parent = list(range(len(records)))
+
+    def find(i):
+        while parent[i] != i:
+            parent[i] = parent[parent[i]]
+            i = parent[i]
+        return i
+
+    tree = BKTree()
+    for i, record in enumerate(records):
+        if not record.get('phash'):
+            continue
+        for _, j in tree.search(record['phash'], max_distance):
+            # Both hashes must agree, which keeps unrelated images with similar layouts apart
+            if records[j].get('dhash') and hamming(record['dhash'], records[j]['dhash']) <= max_distance:
+                parent[find(i)] = find(j)
+        tree.add(record['phash'], i)
+
+    clusters = {}
+    for i in range(len(records)):
+        clusters.setdefault(find(i), []).append(i)
+    return list(clusters.values())
@@ -0,0 +1,131 @@
+#!/usr/bin/env python3
+"""
+EEMB JSON Stream
+Read the records of a JSON array or JSONL file one at a time.
+
+json.load on site-map.json, news.json or the scraped people lists holds
+the whole document in memory, on top of everything built from it. These
+readers yield one record at a time instead, so memory use is set by the
+largest record (or by whatever the caller batches), not by the file.
+
+iter_records() takes either format and tells them apart by the first
+character: a file starting with '[' is parsed incrementally as an array,
+anything else is read as JSONL (a torn last line, as a crash leaves it,
+is skipped). Callers can therefore be pointed at the crawl's .jsonl
+record files or at the .json outputs.
+
+Used by the downloader, link validator, profile scraper, faculty
+importer and news loaders. Count the records of a file:
+
+    python json_stream.py ../data/site-map.json
+"""
+
+import argparse
+import json
+
+# Characters read from the file at a time by the array parser
+CHUNK_SIZE = 1 << 16
+
+WHITESPACE = ' \t\n\r'
+
+
+def read_jsonl(path):
+    """Records of a JSONL file, skipping a last line left half-written by a crash"""
+    with open(path, 'r', encoding='utf-8') as f:
+        for line in f:
+            if not line.strip():
+                continue
+            try:
+                yield json.loads(line)
+            except json.JSONDecodeError:
+                if line.endswith('\n'):
+                    raise
+                return
+
+
+def iter_json_array(f, chunk_size=CHUNK_SIZE):
+    """Elements of the JSON array in file object f, parsed one at a time"""
+    decoder = json.JSONDecoder()
+    buf = f.read(chunk_size)
+    eof = not buf
+    pos = 0
+
+    def more():
+        nonlocal buf, pos, eof
+        chunk = f.read(chunk_size)
+        eof = not chunk
+        # Drop what has been consumed so the buffer stays about one record long
+        buf = buf[pos:] + chunk
+        pos = 0
+        return not eof
+
+    def skip_whitespace():
+        nonlocal pos
+        while True:
+            while pos < len(buf) and buf[pos] in WHITESPACE:
+                pos += 1
+            if pos < len(buf) or not more():
+                return
+
+    skip_whitespace()
+    if pos >= len(buf) or buf[pos] != '[':
+        raise ValueError("Expected a JSON array")
+    pos += 1
+    first = True
+    while True:
+        skip_whitespace()
+        if pos >= len(buf):
+            raise ValueError("Unterminated JSON array")
+        if buf[pos] == ']':
+            return
+        if not first:
+            if buf[pos] != ',':
+                raise ValueError(f"Expected ',' or ']' in JSON array, found {buf[pos]!r}")
+            pos += 1
+            skip_whitespace()
+        first = False
+        while True:
+            try:
+                value, end = decoder.raw_decode(buf, pos)
+            except json.JSONDecodeError:
+                # Record continues past the buffer (or the file is malformed)
+                if not more():
+                    raise
+                continue
+            # Objects, arrays and strings end on their closing character; a number
+            # cut by the chunk boundary ("-2." of "-2.5") is only complete once the
+            # next ',' or ']' is in the buffer
+            if eof or buf[pos] in '{["' or buf[end:].lstrip(WHITESPACE)[:1] in (',', ']'):
+                break
+            more()
+        pos = end
+        yield value
+
+
+def iter_records(path, chunk_size=CHUNK_SIZE):
+    """Records of a JSON array or JSONL file, one at a time"""
+    with open(path, 'r', encoding='utf-8') as f:
+        start = f.read(chunk_size).lstrip(WHITESPACE)
+        while not start:
+            chunk = f.read(chunk_size)
+            if not chunk:
+                return  # Empty file
+            start = chunk.lstrip(WHITESPACE)
+        is_array = start[0] == '['
+    if is_array:
+        with open(path, 'r', encoding='utf-8') as f:
+            yield from iter_json_array(f, chunk_size)
+    else:
+        yield from read_jsonl(path)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Count the records of a JSON array or JSONL file, streaming')
+    parser.add_argument('path')
+    args = parser.parse_args()
+    count = sum(1 for _ in iter_records(args.path))
+    print(f"📄 {count} records in {args.path}")
+
+
+if __name__ == "__main__":
+    main()
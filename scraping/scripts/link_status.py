@@ -0,0 +1,100 @@
+#!/usr/bin/env python3
+"""
+EEMB Link Status Cache
+Remembers link validation results between runs so repeat runs only
+recheck links whose result has expired.
+
+Each result is kept for a time that depends on its status. Working links
+are rechecked monthly, broken ones after a few days, and timeouts and
+connection errors on the next run of the day, since those are usually
+transient.
+"""
+
+import json
+import os
+import sqlite3
+import time
+
+DEFAULT_LINK_STATUS = '../data/link-status.db'
+
+HOUR = 60 * 60
+DAY = 24 * HOUR
+
+# Seconds a result stays valid, by LinkValidator.categorize_status category
+STATUS_TTL = {
+    'ok': 30 * DAY,
+    'ok_other': 30 * DAY,
+    'redirect': 14 * DAY,
+    'not_found': 7 * DAY,
+    'client_error': 3 * DAY,
+    'server_error': DAY,
+    'timeout': 6 * HOUR,
+    'error': 6 * HOUR,
+}
+DEFAULT_TTL = DAY
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS links (
+    url TEXT PRIMARY KEY,
+    status TEXT NOT NULL,          -- categorize_status category
+    checked_at REAL NOT NULL,      -- epoch seconds
+    expires_at REAL NOT NULL,      -- epoch seconds
+    result TEXT NOT NULL           -- validation result without source_page (JSON)
+);
+"""
+
+
+class LinkStatusCache:
+    """On-disk link validation results with a TTL per status category"""
+
+    def __init__(self, path=DEFAULT_LINK_STATUS, ttls=None, commit_every=100):
+        self.path = path
+        self.ttls = dict(STATUS_TTL, **(ttls or {}))
+        self.commit_every = commit_every
+        self.pending = 0
+        self.stats = {'fresh': 0, 'expired': 0, 'missing': 0}
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self.conn = sqlite3.connect(path)
+        self.conn.executescript(SCHEMA)
+
+    def ttl(self, status):
+        return self.ttls.get(status, DEFAULT_TTL)
+
+    def get(self, url, now=None):
+        """Cached result for url if it has not expired, else None"""
+        now = time.time() if now is None else now
+        row = self.conn.execute("SELECT expires_at, result FROM links WHERE url = ?", (url,)).fetchone()
+        if row is None:
+            self.stats['missing'] += 1
+            return None
+        if row[0] <= now:
+            self.stats['expired'] += 1
+            return None
+        self.stats['fresh'] += 1
+        return json.loads(row[1])
+
+    def put(self, result, now=None):
+        """Store a validation result; it expires after its status's TTL"""
+        now = time.time() if now is None else now
+        result = {k: v for k, v in result.items() if k != 'source_page'}
+        self.conn.execute(
+            "INSERT INTO links (url, status, checked_at, expires_at, result) VALUES (?, ?, ?, ?, ?) "
+            "ON CONFLICT(url) DO UPDATE SET status = excluded.status, checked_at = excluded.checked_at, "
+            "expires_at = excluded.expires_at, result = excluded.result",
+            (result['url'], result['status'], now, now + self.ttl(result['status']), json.dumps(result))
+        )
+        self.pending += 1
+        if self.pending >= self.commit_every:
+            self.commit()
+
+    def summary(self):
+        s = self.stats
+        return f"Link status cache: {s['fresh']} still fresh, {s['expired']} expired, {s['missing']} new"
+
+    def commit(self):
+        self.conn.commit()
+        self.pending = 0
+
+    def close(self):
+        self.commit()
+        self.conn.close()
@@ -0,0 +1,246 @@
+#!/usr/bin/env python3
+"""
+EEMB Page Archive
+Append-only, gzip-compressed, WARC-style archive of every response the crawler fetches.
+
+Each record is its own gzip member appended to data/archive/pages.warc.gz,
+so a record can be decompressed on its own once you know where it starts.
+Bodies are deduplicated by SHA-256: the first capture of a payload is a
+full `response` record, later captures of the same bytes (from any URL,
+in any crawl) are small header-only `revisit` records pointing at it.
+
+A SQLite index next to the archive maps payload digests to the offset and
+length of the record holding the body, and URLs to their captures, so any
+URL's body can be read back with a single seek.
+
+    python page_archive.py
+    python page_archive.py --get https://eemb.ucsb.edu/people/faculty
+"""
+
+import argparse
+import gzip
+import hashlib
+import os
+import sqlite3
+import time
+
+DEFAULT_ARCHIVE_DIR = '../data/archive'
+
+INDEX_SCHEMA = """
+CREATE TABLE IF NOT EXISTS payloads (
+    digest TEXT PRIMARY KEY,    -- sha256 of the body
+    record_offset INTEGER NOT NULL,
+    record_length INTEGER NOT NULL,
+    body_length INTEGER NOT NULL
+);
+CREATE TABLE IF NOT EXISTS captures (
+    url TEXT NOT NULL,
+    captured_at TEXT NOT NULL,
+    status_code INTEGER,
+    content_type TEXT,
+    digest TEXT NOT NULL,
+    record_offset INTEGER NOT NULL
+);
+CREATE INDEX IF NOT EXISTS captures_url ON captures (url);
+"""
+
+# Headers describing the wire encoding; the archive stores decoded bodies
+WIRE_HEADERS = {'content-encoding', 'transfer-encoding', 'content-length'}
+
+
+def warc_date():
+    return time.strftime('%Y-%m-%dT%H:%M:%SZ', time.gmtime())
+
+
+class PageArchive:
+    """Content-addressed response archive with an offset index"""
+
+    def __init__(self, archive_dir=DEFAULT_ARCHIVE_DIR, commit_every=50):
+        self.archive_dir = archive_dir
+        os.makedirs(archive_dir, exist_ok=True)
+        self.archive_path = os.path.join(archive_dir, 'pages.warc.gz')
+        self.index = sqlite3.connect(os.path.join(archive_dir, 'index.db'))
+        self.index.executescript(INDEX_SCHEMA)
+        self.commit_every = commit_every
+        self.pending = 0
+        self.stats = {'responses': 0, 'revisits': 0, 'bytes_written': 0}
+        self._file = None
+
+    def _writer(self):
+        if self._file is None:
+            self._file = open(self.archive_path, 'ab')
+        return self._file
+
+    def _append_record(self, warc_headers, block):
+        """Compress one WARC record into its own gzip member; return (offset, length)"""
+        header_lines = ['WARC/1.0'] + [f'{k}: {v}' for k, v in warc_headers]
+        header_lines.append(f'Content-Length: {len(block)}')
+        record = ('\r\n'.join(header_lines) + '\r\n\r\n').encode('utf-8') + block + b'\r\n\r\n'
+        member = gzip.compress(record, compresslevel=6)
+
+        f = self._writer()
+        f.seek(0, os.SEEK_END)
+        offset = f.tell()
+        f.write(member)
+        self.stats['bytes_written'] += len(member)
+        return offset, len(member)
+
+    def _http_block(self, response):
+        """Status line and headers of a response as they would appear on the wire"""
+        reason = getattr(response, 'reason', None) or ''
+        lines = [f'HTTP/1.1 {response.status_code} {reason}'.rstrip()]
+        for name, value in response.headers.items():
+            if name.lower() not in WIRE_HEADERS:
+                lines.append(f'{name}: {value}')
+        lines.append(f'Content-Length: {len(response.content)}')
+        return ('\r\n'.join(lines) + '\r\n\r\n').encode('utf-8')
+
+    def write_response(self, url, response):
+        """Archive a fetched response. Returns the body's digest."""
+        body = response.content
+        digest = 'sha256:' + hashlib.sha256(body).hexdigest()
+        http_head = self._http_block(response)
+        common = [
+            ('WARC-Target-URI', url),
+            ('WARC-Date', warc_date()),
+            ('WARC-Payload-Digest', digest),
+            ('Content-Type', 'application/http; msgtype=response'),
+        ]
+
+        known = self.index.execute("SELECT record_offset FROM payloads WHERE digest = ?", (digest,)).fetchone()
+        if known:
+            # Same bytes already archived: keep the headers, point at the body
+            offset, _ = self._append_record(
+                [('WARC-Type', 'revisit'),
+                 ('WARC-Profile', 'http://netpreserve.org/warc/1.0/revisit/identical-payload-digest')] + common,
+                http_head
+            )
+            self.stats['revisits'] += 1
+        else:
+            offset, length = self._append_record([('WARC-Type', 'response')] + common, http_head + body)
+            self.index.execute(
+                "INSERT INTO payloads (digest, record_offset, record_length, body_length) VALUES (?, ?, ?, ?)",
+                (digest, offset, length, len(body))
+            )
+            self.stats['responses'] += 1
+
+        self.index.execute(
+            "INSERT INTO captures (url, captured_at, status_code, content_type, digest, record_offset) "
+            "VALUES (?, ?, ?, ?, ?, ?)",
+            (url, time.strftime('%Y-%m-%d %H:%M:%S'), response.status_code,
+             response.headers.get('Content-Type', ''), digest, offset)
+        )
+        self.pending += 1
+        if self.pending >= self.commit_every:
+            self.flush()
+        return digest
+
+    def flush(self):
+        """Make everything written so far durable and visible to readers"""
+        if self._file is not None:
+            self._file.flush()
+            os.fsync(self._file.fileno())
+        self.index.commit()
+        self.pending = 0
+
+    def _read_member(self, offset, length):
+        with open(self.archive_path, 'rb') as f:
+            f.seek(offset)
+            return gzip.decompress(f.read(length))
+
+    def read_payload(self, digest):
+        """Body bytes for a payload digest, or None"""
+        row = self.index.execute(
+            "SELECT record_offset, record_length, body_length FROM payloads WHERE digest = ?", (digest,)
+        ).fetchone()
+        if not row:
+            return None
+        offset, length, body_length = row
+        record = self._read_member(offset, length)
+        # Strip the trailing record separator, then take the last body_length bytes
+        block = record[:-4]
+        return block[len(block) - body_length:]
+
+    def latest_capture(self, url):
+        """(captured_at, status_code, content_type, digest) of the newest capture of url"""
+        return self.index.execute(
+            "SELECT captured_at, status_code, content_type, digest FROM captures "
+            "WHERE url = ? ORDER BY rowid DESC LIMIT 1", (url,)
+        ).fetchone()
+
+    def read_body(self, url):
+        """Body of the newest capture of url, or None if it was never archived"""
+        capture = self.latest_capture(url)
+        return self.read_payload(capture[3]) if capture else None
+
+    def captures(self, url):
+        """Every capture of url, oldest first"""
+        return self.index.execute(
+            "SELECT captured_at, status_code, content_type, digest FROM captures WHERE url = ? ORDER BY rowid",
+            (url,)
+        ).fetchall()
+
+    def iter_latest(self, content_type_contains='html'):
+        """Yield (url, body) for the newest capture of every archived URL
+
+        Meant for re-extraction jobs that would otherwise re-crawl the site.
+        """
+        rows = self.index.execute(
+            "SELECT url, digest, content_type FROM captures WHERE rowid IN "
+            "(SELECT MAX(rowid) FROM captures GROUP BY url) ORDER BY url"
+        ).fetchall()
+        for url, digest, content_type in rows:
+            if content_type_contains and content_type_contains not in (content_type or ''):
+                continue
+            yield url, self.read_payload(digest)
+
+    def summary(self):
+        """Counts describing the archive contents"""
+        captures, urls = self.index.execute("SELECT COUNT(*), COUNT(DISTINCT url) FROM captures").fetchone()
+        payloads, body_bytes = self.index.execute(
+            "SELECT COUNT(*), COALESCE(SUM(body_length), 0) FROM payloads"
+        ).fetchone()
+        archive_bytes = os.path.getsize(self.archive_path) if os.path.exists(self.archive_path) else 0
+        return {
+            'captures': captures,
+            'urls': urls,
+            'unique_payloads': payloads,
+            'payload_bytes': body_bytes,
+            'archive_bytes': archive_bytes,
+        }
+
+    def close(self):
+        self.flush()
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+        self.index.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Inspect the crawled page archive')
+    parser.add_argument('--archive-dir', default=DEFAULT_ARCHIVE_DIR)
+    parser.add_argument('--get', metavar='URL', help='Write the newest archived body of URL to stdout')
+    args = parser.parse_args()
+
+    archive = PageArchive(args.archive_dir)
+    try:
+        if args.get:
+            body = archive.read_body(args.get)
+            if body is None:
+                print(f"❌ Not archived: {args.get}")
+                return 1
+            os.write(1, body)
+        else:
+            s = archive.summary()
+            print("📊 Page Archive Statistics:")
+            print(f"  Captures: {s['captures']} of {s['urls']} URLs")
+            print(f"  Unique bodies: {s['unique_payloads']} ({s['payload_bytes'] / 1024 / 1024:.1f} MB uncompressed)")
+            print(f"  Archive size: {s['archive_bytes'] / 1024 / 1024:.1f} MB")
+    finally:
+        archive.close()
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,131 @@
+#!/usr/bin/env python3
+"""
+EEMB Page Store
+SQLite store for the HTML and link/image/document edges of every crawled page.
+
+The crawler writes each page here as it parses it, so later stages
+(download_images.py, validate_links.py) can read the edges instead of
+downloading and re-parsing every page of the site again.
+"""
+
+import os
+import sqlite3
+import time
+from urllib.parse import urljoin
+
+DEFAULT_PAGE_STORE = '../data/page-store.db'
+
+DOCUMENT_EXTENSIONS = ['.pdf', '.doc', '.docx', '.xls', '.xlsx', '.ppt', '.pptx', '.csv']
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS pages (
+    url TEXT PRIMARY KEY,
+    final_url TEXT,
+    status_code INTEGER,
+    content_type TEXT,
+    html TEXT,
+    stored_at TEXT
+);
+CREATE TABLE IF NOT EXISTS edges (
+    page_url TEXT NOT NULL,
+    kind TEXT NOT NULL,         -- 'link', 'image' or 'document'
+    href TEXT NOT NULL,         -- attribute value exactly as written in the page
+    target_url TEXT NOT NULL,   -- href resolved against the page URL
+    label TEXT                  -- link text or image alt text
+);
+CREATE INDEX IF NOT EXISTS edges_page ON edges (page_url);
+CREATE INDEX IF NOT EXISTS edges_kind ON edges (kind);
+"""
+
+
+def is_document_link(href):
+    """Whether an href points at a downloadable document"""
+    href = href.lower()
+    return any(ext in href for ext in DOCUMENT_EXTENSIONS)
+
+
+def extract_edges(page, page_url):
+    """Collect the link, image and document edges of a parsed page
+
+    `page` is a parsing.parse_page() result. Returns a list of
+    (kind, href, target_url, label) tuples. A link to a document is
+    recorded both as a 'link' and as a 'document'.
+    """
+    edges = []
+    for href, label in page.links():
+        target = urljoin(page_url, href)
+        edges.append(('link', href, target, label))
+        if is_document_link(href):
+            edges.append(('document', href, target, label))
+    for src, alt, _ in page.images():
+        edges.append(('image', src, urljoin(page_url, src), alt))
+    return edges
+
+
+class PageStore:
+    """Persisted pages and their outgoing edges"""
+
+    def __init__(self, path=DEFAULT_PAGE_STORE, commit_every=50):
+        self.path = path
+        self.commit_every = commit_every
+        self.pending = 0
+        directory = os.path.dirname(os.path.abspath(path))
+        os.makedirs(directory, exist_ok=True)
+        self.conn = sqlite3.connect(path)
+        self.conn.executescript(SCHEMA)
+
+    @classmethod
+    def open_existing(cls, path=DEFAULT_PAGE_STORE):
+        """Open a store written by an earlier crawl, or return None if there is none"""
+        if not os.path.exists(path):
+            return None
+        store = cls(path)
+        if not store.page_count():
+            store.close()
+            return None
+        return store
+
+    def save_page(self, url, final_url, status_code, content_type, html, edges):
+        """Insert or replace a page and all of its edges"""
+        self.conn.execute(
+            "INSERT OR REPLACE INTO pages (url, final_url, status_code, content_type, html, stored_at) "
+            "VALUES (?, ?, ?, ?, ?, ?)",
+            (url, final_url, status_code, content_type, html, time.strftime('%Y-%m-%d %H:%M:%S'))
+        )
+        self.conn.execute("DELETE FROM edges WHERE page_url = ?", (url,))
+        self.conn.executemany(
+            "INSERT INTO edges (page_url, kind, href, target_url, label) VALUES (?, ?, ?, ?, ?)",
+            [(url, kind, href, target, label) for kind, href, target, label in edges]
+        )
+        self.pending += 1
+        if self.pending >= self.commit_every:
+            self.commit()
+
+    def commit(self):
+        self.conn.commit()
+        self.pending = 0
+
+    def page_count(self):
+        return self.conn.execute("SELECT COUNT(*) FROM pages").fetchone()[0]
+
+    def get_html(self, url):
+        """Stored HTML of a page, or None"""
+        row = self.conn.execute("SELECT html FROM pages WHERE url = ?", (url,)).fetchone()
+        return row[0] if row else None
+
+    def iter_edges(self, kind, page_urls=None):
+        """Yield (page_url, href, target_url, label) for every edge of one kind
+
+        `page_urls` restricts the result to those pages, e.g. the pages of
+        the current site map.
+        """
+        cursor = self.conn.execute(
+            "SELECT page_url, href, target_url, label FROM edges WHERE kind = ? ORDER BY rowid", (kind,)
+        )
+        for row in cursor:
+            if page_urls is None or row[0] in page_urls:
+                yield row
+
+    def close(self):
+        self.commit()
+        self.conn.close()
@@ -0,0 +1,179 @@
+#!/usr/bin/env python3
+"""
+EEMB HTML Parsing
+One place to choose how scraped pages are parsed.
+
+Backends (set with EEMB_HTML_PARSER, run_all.py --parser, or the
+`backend` argument of parse_html() / parse_page()):
+    html.parser  - default; BeautifulSoup on Python's built-in parser, no
+                   dependencies, slowest
+    lxml         - BeautifulSoup on lxml; same tree API, much faster parsing
+    lxml-xpath   - whole-page extraction (title, meta, text, links, images)
+                   runs as XPath over a plain lxml tree, and .soup falls back
+                   to BeautifulSoup on lxml
+
+The lxml backends are opt-in: lxml repairs broken markup differently from
+html.parser, so having it installed must not change what gets scraped.
+
+Code that only needs the common page-level fields should use parse_page();
+code that walks the tree with find()/find_all() should use parse_html().
+Both give the same results as BeautifulSoup(content, 'html.parser') on
+well-formed pages; tests/test_parsers.py checks this, and
+benchmarks/bench_parsers.py on real pages.
+"""
+
+import os
+
+from bs4 import BeautifulSoup
+from bs4.dammit import UnicodeDammit
+
+try:
+    import lxml.html
+    from lxml import etree
+except ImportError:  # html.parser still works without lxml
+    lxml = None
+
+BACKENDS = ('html.parser', 'lxml', 'lxml-xpath')
+
+# Strings inside these tags are not counted by BeautifulSoup's get_text()
+# (bs4 gives them their own string types: Script, Stylesheet, ...)
+STRING_CONTAINERS = {'script', 'style', 'template', 'rt', 'rp'}
+
+
+def default_backend():
+    """Backend from EEMB_HTML_PARSER, else html.parser"""
+    return resolve_backend(os.environ.get('EEMB_HTML_PARSER') or 'html.parser')
+
+
+def resolve_backend(backend=None):
+    """Validate a backend name, filling in the default for None"""
+    if backend is None:
+        return default_backend()
+    if backend not in BACKENDS:
+        raise ValueError(f"Unknown HTML parser backend {backend!r}, expected one of {BACKENDS}")
+    if backend != 'html.parser' and lxml is None:
+        raise ValueError(f"HTML parser backend {backend!r} needs lxml (pip install lxml)")
+    return backend
+
+
+def parse_html(markup, backend=None):
+    """BeautifulSoup tree of a page using the selected backend"""
+    backend = resolve_backend(backend)
+    return BeautifulSoup(markup, 'html.parser' if backend == 'html.parser' else 'lxml')
+
+
+def parse_page(markup, backend=None):
+    """Page-level view of a document (see SoupPage for the interface)"""
+    backend = resolve_backend(backend)
+    if backend == 'lxml-xpath':
+        return XPathPage(markup)
+    return SoupPage(parse_html(markup, backend))
+
+
+class SoupPage:
+    """Page fields read through BeautifulSoup"""
+
+    def __init__(self, soup):
+        self.soup = soup
+
+    def title(self):
+        """Text of the first <title>, or None"""
+        tag = self.soup.find('title')
+        return tag.text if tag else None
+
+    def meta_content(self, name):
+        """content attribute of the first <meta name=...>, '' if missing"""
+        meta = self.soup.find('meta', attrs={'name': name})
+        return meta.get('content', '') if meta else ''
+
+    def text(self, separator='', strip=False):
+        return self.soup.get_text(separator=separator, strip=strip)
+
+    def links(self):
+        """(href, link text stripped) of every <a href>, in document order"""
+        return [(a['href'], a.get_text(strip=True)) for a in self.soup.find_all('a', href=True)]
+
+    def images(self):
+        """(src, alt, title) of every <img src>, in document order"""
+        return [(img['src'], img.get('alt', ''), img.get('title', '')) for img in self.soup.find_all('img', src=True)]
+
+
+def _lxml_document(markup):
+    """Parse with lxml after decoding the way BeautifulSoup does, so both see the same text"""
+    if isinstance(markup, str):
+        text = markup
+    else:
+        text = UnicodeDammit(markup, is_html=True).unicode_markup
+    parser = lxml.html.HTMLParser(encoding='utf-8')
+    try:
+        return lxml.html.document_fromstring(text.encode('utf-8'), parser=parser)
+    except etree.ParserError:
+        # Empty or whitespace-only document
+        return None
+
+
+def _strings(element, skipped=False):
+    """Text nodes under an element in document order, BeautifulSoup get_text() style"""
+    skipped = skipped or element.tag in STRING_CONTAINERS
+    if element.text and not skipped:
+        yield element.text
+    for child in element:
+        if isinstance(child.tag, str):
+            yield from _strings(child, skipped)
+        # Comments and processing instructions contribute only their tail
+        if child.tail and not skipped:
+            yield child.tail
+
+
+def element_text(element, separator='', strip=False):
+    """tag.get_text(separator, strip) for an lxml element"""
+    if element.tag in STRING_CONTAINERS:
+        # get_text() on the container itself returns its own (script, style...) text
+        strings = [element.text or '']
+    else:
+        strings = _strings(element)
+    if strip:
+        strings = (s.strip() for s in strings)
+        strings = (s for s in strings if s)
+    return separator.join(strings)
+
+
+class XPathPage:
+    """Page fields read with XPath straight from an lxml tree
+
+    `soup` builds a BeautifulSoup tree (lxml backend) on first use, for
+    callers that need more than the page-level fields.
+    """
+
+    def __init__(self, markup):
+        self.markup = markup
+        self.root = _lxml_document(markup)
+        self._soup = None
+
+    @property
+    def soup(self):
+        if self._soup is None:
+            self._soup = BeautifulSoup(self.markup, 'lxml')
+        return self._soup
+
+    def _xpath(self, expression):
+        return self.root.xpath(expression) if self.root is not None else []
+
+    def title(self):
+        found = self._xpath('(//title)[1]')
+        return element_text(found[0]) if found else None
+
+    def meta_content(self, name):
+        if self.root is None:
+            return ''
+        found = self.root.xpath('(//meta[@name=$name])[1]', name=name)
+        return found[0].get('content', '') if found else ''
+
+    def text(self, separator='', strip=False):
+        return element_text(self.root, separator, strip) if self.root is not None else ''
+
+    def links(self):
+        return [(a.get('href'), element_text(a, strip=True)) for a in self._xpath('//a[@href]')]
+
+    def images(self):
+        return [(img.get('src'), img.get('alt', ''), img.get('title', '')) for img in self._xpath('//img[@src]')]
@@ -0,0 +1,320 @@
+#!/usr/bin/env python3
+"""
+EEMB Pipeline Scheduler
+Runs the scraping stages as a dependency graph instead of a fixed sequence.
+
+Each Stage names the stages it depends on and the files it reads and
+writes. A stage starts as soon as all of its dependencies have succeeded,
+so independent stages (the crawl and the faculty scrape, media download
+and link validation) run at the same time.
+
+Stages are skipped make-style. After a successful run the stage's
+fingerprint is stored in data/pipeline-state.json. The fingerprint covers
+its script, its arguments and the contents of its input files, so a
+stage reruns when a dependency changed what it reads, not merely because
+the dependency ran. JSON and SQLite inputs are compared by content:
+record order and per-run fields such as crawled_at are ignored, so a
+recrawl of an unchanged site leaves the downstream stages skipped. The
+next run skips the stage while the fingerprint is unchanged and the
+outputs still exist. Stages without dependencies or input files (the
+ones that read the live site) are never skipped: the site may have
+changed, and the HTTP cache keeps a rerun cheap when it hasn't.
+
+Every run writes data/run-report.json with the status and timings of each stage.
+"""
+
+import hashlib
+import json
+import os
+import sqlite3
+import subprocess
+import sys
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+
+from json_stream import iter_records
+
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+DEFAULT_STATE_PATH = '../data/pipeline-state.json'
+DEFAULT_REPORT_PATH = '../data/run-report.json'
+DEFAULT_LOG_DIR = '../data/logs'
+
+# Fields that record when or how a run happened rather than what it found; left out of input digests
+VOLATILE_FIELDS = {'crawled_at', 'scraped_at', 'downloaded_at', 'stored_at', 'generated_at', 'fetched_at',
+                   'pages_fetched'}
+
+
+class Stage:
+    """One pipeline step: a script plus its place in the dependency graph
+
+    Paths are relative to the scripts directory, like everywhere else in
+    the pipeline.
+    """
+
+    def __init__(self, name, script, description, args=(), deps=(), inputs=(), outputs=()):
+        self.name = name
+        self.script = script
+        self.description = description
+        self.args = list(args)
+        self.deps = list(deps)
+        self.inputs = list(inputs)
+        self.outputs = list(outputs)
+
+    def fingerprint(self):
+        """Hash of everything that decides what this stage would produce"""
+        digest = hashlib.sha256()
+        digest.update(json.dumps([self.script, self.args]).encode('utf-8'))
+        for path in [self.script] + self.inputs:
+            digest.update(path.encode('utf-8'))
+            digest.update(file_digest(os.path.join(SCRIPT_DIR, path)).encode('utf-8'))
+        return digest.hexdigest()
+
+    def outputs_exist(self):
+        return all(os.path.exists(os.path.join(SCRIPT_DIR, path)) for path in self.outputs)
+
+
+def file_digest(path):
+    """sha256 of what an input holds, or 'missing'
+
+    JSON and SQLite files are digested by content (see json_digest and
+    sqlite_digest), a directory by its file names and contents, anything
+    else byte for byte.
+    """
+    if not os.path.exists(path):
+        return 'missing'
+    if os.path.isdir(path):
+        return directory_digest(path)
+    if path.endswith(('.json', '.jsonl')):
+        return json_digest(path)
+    if path.endswith('.db'):
+        return sqlite_digest(path)
+    return bytes_digest(path)
+
+
+def bytes_digest(path):
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(1024 * 1024), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def without_volatile(value):
+    """value with every VOLATILE_FIELDS key removed, at any depth"""
+    if isinstance(value, dict):
+        return {k: without_volatile(v) for k, v in value.items() if k not in VOLATILE_FIELDS}
+    if isinstance(value, list):
+        return [without_volatile(v) for v in value]
+    return value
+
+
+def json_digest(path):
+    """Digest of a JSON/JSONL file's records, ignoring their order and VOLATILE_FIELDS"""
+    with open(path, 'r', encoding='utf-8') as f:
+        first = f.read(64).lstrip()[:1]
+    if first == '{' and path.endswith('.json'):
+        # A single document (changed-pages.json), not a list of records
+        with open(path, 'r', encoding='utf-8') as f:
+            records = [json.load(f)]
+    else:
+        records = iter_records(path)
+    # Concurrent crawls write the same records in a different order each time
+    hashes = sorted(hashlib.sha256(json.dumps(without_volatile(r), sort_keys=True).encode('utf-8')).digest()
+                    for r in records)
+    return hashlib.sha256(b''.join(hashes)).hexdigest()
+
+
+def sqlite_digest(path):
+    """Digest of every table's rows in a fixed order, without the VOLATILE_FIELDS columns"""
+    digest = hashlib.sha256()
+    conn = sqlite3.connect(f'file:{path}?mode=ro', uri=True)
+    try:
+        tables = [row[0] for row in conn.execute(
+            "SELECT name FROM sqlite_master WHERE type = 'table' AND name NOT LIKE 'sqlite_%' ORDER BY name")]
+        for table in tables:
+            columns = [row[1] for row in conn.execute(f'PRAGMA table_info("{table}")')
+                       if row[1] not in VOLATILE_FIELDS]
+            names = ', '.join(f'"{c}"' for c in columns)
+            digest.update(json.dumps([table, columns]).encode('utf-8'))
+            for row in conn.execute(f'SELECT {names} FROM "{table}" ORDER BY {names}'):
+                digest.update(json.dumps(row).encode('utf-8'))
+    finally:
+        conn.close()
+    return digest.hexdigest()
+
+
+def directory_digest(path):
+    """Digest of a directory's file names and contents (a symlink by its target)"""
+    digest = hashlib.sha256()
+    for root, dirs, files in os.walk(path):
+        dirs.sort()
+        for name in sorted(files):
+            full = os.path.join(root, name)
+            digest.update(os.path.relpath(full, path).encode('utf-8'))
+            # The asset store's links point at objects named by their content hash
+            digest.update((os.readlink(full) if os.path.islink(full) else bytes_digest(full)).encode('utf-8'))
+    return digest.hexdigest()
+
+
+def check_graph(stages):
+    """Reject unknown dependencies and cycles; returns the stages by name"""
+    by_name = {stage.name: stage for stage in stages}
+    for stage in stages:
+        for dep in stage.deps:
+            if dep not in by_name:
+                raise ValueError(f"Stage {stage.name!r} depends on unknown stage {dep!r}")
+
+    visiting, done = set(), set()
+
+    def visit(name, path):
+        if name in done:
+            return
+        if name in visiting:
+            raise ValueError(f"Dependency cycle: {' -> '.join(path + [name])}")
+        visiting.add(name)
+        for dep in by_name[name].deps:
+            visit(dep, path + [name])
+        visiting.discard(name)
+        done.add(name)
+
+    for stage in stages:
+        visit(stage.name, [])
+    return by_name
+
+
+def load_state(path):
+    if not os.path.exists(path):
+        return {}
+    with open(path, 'r') as f:
+        return json.load(f)
+
+
+def save_json(path, data):
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    tmp_path = path + '.tmp'
+    with open(tmp_path, 'w') as f:
+        json.dump(data, f, indent=2)
+    os.replace(tmp_path, path)
+
+
+class Pipeline:
+    """Runs stages in dependency order, independent ones in parallel"""
+
+    def __init__(self, stages, max_parallel=None, force=(), state_path=DEFAULT_STATE_PATH,
+                 report_path=DEFAULT_REPORT_PATH, log_dir=DEFAULT_LOG_DIR):
+        self.stages = stages
+        self.by_name = check_graph(stages)
+        self.max_parallel = max_parallel or len(stages)
+        self.force = set(force)  # stage names, or 'all'
+        self.state_path = os.path.join(SCRIPT_DIR, state_path)
+        self.report_path = os.path.join(SCRIPT_DIR, report_path)
+        self.log_dir = os.path.join(SCRIPT_DIR, log_dir)
+        self.state = load_state(self.state_path)
+        self.results = {}
+        self._print_lock = threading.Lock()
+
+    def say(self, message):
+        with self._print_lock:
+            print(message, flush=True)
+
+    def is_up_to_date(self, stage, fingerprint):
+        if 'all' in self.force or stage.name in self.force:
+            return False
+        # Nothing on disk says whether the live site changed since the last run
+        if not stage.deps and not stage.inputs:
+            return False
+        # Whatever a dependency changed shows up in the digests of this stage's inputs
+        previous = self.state.get(stage.name)
+        return bool(previous) and previous.get('fingerprint') == fingerprint and stage.outputs_exist()
+
+    def run_stage(self, stage):
+        """Run one stage's script. Returns its report entry."""
+        started = time.time()
+        entry = {
+            'stage': stage.name,
+            'description': stage.description,
+            'command': [stage.script] + stage.args,
+            'started_at': time.strftime('%Y-%m-%d %H:%M:%S', time.localtime(started)),
+        }
+
+        fingerprint = stage.fingerprint()
+        if self.is_up_to_date(stage, fingerprint):
+            self.say(f"⏭️  {stage.description}: up to date, skipped")
+            entry.update(status='skipped', duration_s=0.0, finished_at=entry['started_at'])
+            return entry
+
+        self.say(f"▶️  {stage.description}: {' '.join(entry['command'])}")
+        command = [sys.executable, stage.script] + stage.args
+        if self.max_parallel == 1:
+            # One stage at a time: stream its output straight to the terminal
+            result = subprocess.run(command, cwd=SCRIPT_DIR)
+        else:
+            # Parallel stages would interleave their output, so each gets a log file
+            os.makedirs(self.log_dir, exist_ok=True)
+            log_path = os.path.join(self.log_dir, f'{stage.name}.log')
+            entry['log'] = os.path.relpath(log_path, SCRIPT_DIR)
+            with open(log_path, 'w') as log:
+                result = subprocess.run(command, cwd=SCRIPT_DIR, stdout=log, stderr=subprocess.STDOUT)
+
+        finished = time.time()
+        entry.update(
+            status='success' if result.returncode == 0 else 'failed',
+            returncode=result.returncode,
+            finished_at=time.strftime('%Y-%m-%d %H:%M:%S', time.localtime(finished)),
+            duration_s=round(finished - started, 3),
+        )
+        if result.returncode == 0:
+            # Taken again after the run: a stage may update one of its own inputs (derivatives adds
+            # variants to images-catalog.json), and its dependencies finished before it started
+            self.state[stage.name] = {'fingerprint': stage.fingerprint(), 'finished_at': entry['finished_at']}
+            self.say(f"✅ {stage.description} completed in {entry['duration_s']:.1f} seconds")
+        else:
+            # Whatever it produced before may now be half-rewritten
+            self.state.pop(stage.name, None)
+            where = f" (see {entry['log']})" if 'log' in entry else ''
+            self.say(f"❌ {stage.description} failed after {entry['duration_s']:.1f} seconds{where}")
+        return entry
+
+    def run(self):
+        """Run the whole graph; returns the run report"""
+        run_started = time.time()
+        pending = {stage.name for stage in self.stages}
+        running = {}
+
+        with ThreadPoolExecutor(max_workers=self.max_parallel) as executor:
+            while pending or running:
+                # A stage whose dependency failed or was blocked cannot run
+                for name in sorted(pending):
+                    blocked_by = [d for d in self.by_name[name].deps
+                                  if self.results.get(d, {}).get('status') in ('failed', 'blocked')]
+                    if blocked_by:
+                        pending.discard(name)
+                        self.results[name] = {'stage': name, 'description': self.by_name[name].description,
+                                              'status': 'blocked', 'blocked_by': blocked_by}
+                        self.say(f"⛔ {self.by_name[name].description}: not run, {', '.join(blocked_by)} failed")
+
+                # Start everything whose dependencies are done, in declaration order
+                for stage in self.stages:
+                    if stage.name in pending and all(
+                            self.results.get(d, {}).get('status') in ('success', 'skipped') for d in stage.deps):
+                        pending.discard(stage.name)
+                        running[executor.submit(self.run_stage, stage)] = stage.name
+
+                if not running:
+                    continue
+                done, _ = wait(running, return_when=FIRST_COMPLETED)
+                for future in done:
+                    name = running.pop(future)
+                    self.results[name] = future.result()
+                save_json(self.state_path, self.state)
+
+        report = {
+            'started_at': time.strftime('%Y-%m-%d %H:%M:%S', time.localtime(run_started)),
+            'finished_at': time.strftime('%Y-%m-%d %H:%M:%S'),
+            'duration_s': round(time.time() - run_started, 3),
+            'max_parallel': self.max_parallel,
+            'stages': [self.results[stage.name] for stage in self.stages],
+        }
+        save_json(self.report_path, report)
+        return report
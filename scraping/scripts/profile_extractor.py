@@ -0,0 +1,294 @@
+#!/usr/bin/env python3
+"""
+EEMB Profile Extractor
+Single-pass, rule-driven field extraction for faculty profile pages.
+
+FacultyScraper used to search the whole parsed page once per field: a
+find_all() for office, another for title, for bio headings, research
+headings, lab links, images and tags, plus a full get_text() for the
+phone regex. Here the DOM is walked exactly once. Each rule sees every
+element as the walk enters it and records candidates; text-based rules
+("first <p>/<div>/<span> whose text mentions 'office'") are resolved
+afterwards against the page text collected during the same walk, using
+the character range each element covers instead of re-reading its
+subtree.
+
+extract_profile() returns the same fields, with the same values, as the
+old per-field searches.
+"""
+
+import bisect
+import re
+from abc import ABC, abstractmethod
+from urllib.parse import urljoin
+
+from bs4 import CData, NavigableString, Tag
+
+# Only these string types count towards get_text() of ordinary tags;
+# <script>, <style>, <template> and comment strings are excluded
+TEXT_TYPES = (NavigableString, CData)
+
+PHONE_PATTERN = re.compile(r'\(?\d{3}\)?[-.\s]?\d{3}[-.\s]?\d{4}')
+
+OFFICE_PATTERNS = ['office', 'location', 'room', 'building']
+TITLE_PATTERNS = ['professor', 'lecturer', 'instructor', 'researcher']
+BIO_HEADINGS = ['bio', 'about', 'biography', 'background', 'overview']
+RESEARCH_HEADINGS = ['research', 'research interests', 'research areas']
+LAB_PATTERNS = ['lab', 'website', 'personal', 'homepage']
+IMG_CLASSES = ['profile', 'headshot', 'photo', 'avatar', 'faculty']
+SKIP_IMAGES = ['logo', 'icon', 'button']
+TAG_CLASSES = ['tag', 'category', 'keyword']
+SECTION_HEADINGS = ('h2', 'h3', 'h4')
+
+# Tags whose own get_text() reads their special string type (script source,
+# stylesheet, template, ruby annotations) rather than ordinary text
+OWN_STRING_TAGS = {'script', 'style', 'template', 'rt', 'rp'}
+
+
+def class_matches(tag, words):
+    """BeautifulSoup class_=lambda x: x and any(w in x.lower() ...) semantics"""
+    classes = tag.get('class')
+    if not classes:
+        return False
+    if isinstance(classes, str):
+        classes = [classes]
+    return any(word in c.lower() for c in classes for word in words)
+
+
+class PageText:
+    """Text of the whole page, with the character range of every element"""
+
+    def __init__(self):
+        self.chunks = []        # every text string, in document order
+        self.length = 0
+        self.spans = {}         # id(tag) -> (first_chunk, end_chunk, start_char, end_char)
+        self._text = None
+        self._lower = None
+        self._occurrences = {}
+
+    def add(self, string):
+        self.chunks.append(string)
+        self.length += len(string)
+
+    @property
+    def text(self):
+        if self._text is None:
+            self._text = ''.join(self.chunks)
+        return self._text
+
+    @property
+    def lower(self):
+        if self._lower is None:
+            self._lower = self.text.lower()
+        return self._lower
+
+    def of(self, tag):
+        """tag.get_text()"""
+        first, end, _, _ = self.spans[id(tag)]
+        return ''.join(self.chunks[first:end])
+
+    def stripped(self, tag, separator=''):
+        """tag.get_text(separator, strip=True)"""
+        first, end, _, _ = self.spans[id(tag)]
+        return separator.join(s for s in (c.strip() for c in self.chunks[first:end]) if s)
+
+    def contains_any(self, tag, patterns):
+        """Whether tag.text.lower() contains any of the patterns"""
+        _, _, start, end = self.spans[id(tag)]
+        if len(self.lower) != len(self.text):
+            # Lowercasing changed the length (rare Unicode cases), offsets no longer line up
+            segment = self.text[start:end].lower()
+            return any(p in segment for p in patterns)
+        for pattern in patterns:
+            positions = self._positions(pattern)
+            i = bisect.bisect_left(positions, start)
+            if i < len(positions) and positions[i] + len(pattern) <= end:
+                return True
+        return False
+
+    def _positions(self, pattern):
+        """Start offsets of every (possibly overlapping) occurrence of pattern"""
+        if pattern not in self._occurrences:
+            found = []
+            i = self.lower.find(pattern)
+            while i != -1:
+                found.append(i)
+                i = self.lower.find(pattern, i + 1)
+            self._occurrences[pattern] = found
+        return self._occurrences[pattern]
+
+
+class Rule(ABC):
+    """A field matcher fed every element of the single DOM walk"""
+
+    tags = ()  # Tag names this rule wants to see
+
+    @abstractmethod
+    def visit(self, tag):
+        """Record `tag` if it is a candidate for this rule's field"""
+
+
+class FirstTag(Rule):
+    """First element (in document order) with one of `tags` satisfying `test`"""
+
+    def __init__(self, tags, test=None):
+        self.tags = set(tags)
+        self.test = test
+        self.found = None
+
+    def visit(self, tag):
+        if self.found is None and (self.test is None or self.test(tag)):
+            self.found = tag
+
+
+class AllTags(Rule):
+    """Every element with one of `tags` satisfying `test`, in document order"""
+
+    def __init__(self, tags, test=None):
+        self.tags = set(tags)
+        self.test = test
+        self.found = []
+
+    def visit(self, tag):
+        if self.test is None or self.test(tag):
+            self.found.append(tag)
+
+
+class FirstTextMatch(AllTags):
+    """First element with one of `tags` whose text contains any of `patterns`
+
+    Candidates are collected during the walk and checked once the page
+    text is complete.
+    """
+
+    def __init__(self, tags, patterns, test=None):
+        super().__init__(tags, test)
+        self.patterns = patterns
+
+    def match(self, page):
+        for tag in self.found:
+            if page.contains_any(tag, self.patterns):
+                return tag
+        return None
+
+
+class SectionText(FirstTextMatch):
+    """Text of the siblings following the first matching heading, up to the next heading"""
+
+    def section(self, page):
+        heading = self.match(page)
+        if heading is None:
+            return ''
+        parts = []
+        for sibling in heading.next_siblings:
+            if not isinstance(sibling, Tag):
+                continue
+            if sibling.name in SECTION_HEADINGS:
+                break
+            if sibling.name in OWN_STRING_TAGS:
+                parts.append(sibling.get_text(strip=True))
+            else:
+                parts.append(page.stripped(sibling))
+        return ' '.join(parts)
+
+
+def walk(root, rules):
+    """Visit every element of the tree once, feeding the rules and recording text spans"""
+    page = PageText()
+    by_name = {}
+    for rule in rules:
+        for name in rule.tags:
+            by_name.setdefault(name, []).append(rule)
+
+    spans = page.spans
+    stack = [(root, iter(root.contents), 0, 0)]
+    while stack:
+        tag, children, first_chunk, start_char = stack[-1]
+        for node in children:
+            if isinstance(node, Tag):
+                for rule in by_name.get(node.name, ()):
+                    rule.visit(node)
+                stack.append((node, iter(node.contents), len(page.chunks), page.length))
+                break
+            if type(node) in TEXT_TYPES:
+                page.add(node)
+        else:
+            stack.pop()
+            spans[id(tag)] = (first_chunk, len(page.chunks), start_char, page.length)
+    return page
+
+
+def extract_profile(soup, profile_url):
+    """Extract the profile fields of a parsed faculty page in one DOM walk"""
+    title_tag = FirstTag(['title'])
+    h1 = FirstTag(['h1'])
+    h2_name = FirstTag(['h2'], lambda t: class_matches(t, ['name']))
+    mailto = FirstTag(['a'], lambda t: 'mailto:' in (t.get('href') or ''))
+    tel = FirstTag(['a'], lambda t: 'tel:' in (t.get('href') or ''))
+    office = FirstTextMatch(['p', 'div', 'span'], OFFICE_PATTERNS)
+    title = FirstTextMatch(['p', 'div', 'span', 'h2', 'h3'], TITLE_PATTERNS)
+    bio = SectionText(SECTION_HEADINGS, BIO_HEADINGS)
+    research = SectionText(SECTION_HEADINGS, RESEARCH_HEADINGS)
+    main = FirstTag(['main'])
+    article = FirstTag(['article'])
+    content_div = FirstTag(['div'], lambda t: class_matches(t, ['content']))
+    lab = FirstTextMatch(['a'], LAB_PATTERNS, lambda t: t.has_attr('href'))
+    images = AllTags(['img'])
+    tags = AllTags(['span', 'a'], lambda t: class_matches(t, TAG_CLASSES))
+
+    page = walk(soup, [
+        title_tag, h1, h2_name, mailto, tel, office, title, bio, research,
+        main, article, content_div, lab, images, tags,
+    ])
+    fields = {}
+
+    fields['page_title'] = page.of(title_tag.found).strip() if title_tag.found else ''
+
+    name_tag = h1.found or h2_name.found
+    fields['name'] = page.of(name_tag).strip() if name_tag else ''
+
+    fields['email'] = mailto.found['href'].replace('mailto:', '').strip() if mailto.found else ''
+
+    if tel.found:
+        fields['phone'] = page.of(tel.found).strip()
+    else:
+        phone_match = PHONE_PATTERN.search(page.text)
+        fields['phone'] = phone_match.group(0) if phone_match else ''
+
+    office_tag = office.match(page)
+    fields['office'] = page.of(office_tag).strip() if office_tag is not None else ''
+
+    title_match = title.match(page)
+    fields['title'] = page.of(title_match).strip() if title_match is not None else ''
+
+    fields['bio'] = bio.section(page)
+    if not fields['bio']:
+        main_content = main.found or article.found or content_div.found
+        if main_content:
+            fields['bio'] = page.stripped(main_content, ' ')[:1000]  # Limit length
+
+    fields['research'] = research.section(page)
+
+    lab_link = lab.match(page)
+    fields['lab_url'] = urljoin(profile_url, lab_link['href']) if lab_link is not None else ''
+
+    fields['photo_url'] = ''
+    for img in images.found:
+        img_class = ' '.join(img.get('class', [])).lower()
+        img_alt = img.get('alt', '').lower()
+        if any(pattern in img_class or pattern in img_alt for pattern in IMG_CLASSES):
+            fields['photo_url'] = urljoin(profile_url, img['src'])
+            break
+
+    # If no specific profile image, get first substantial image
+    if not fields['photo_url']:
+        for img in images.found:
+            src = img.get('src', '')
+            if src and not any(skip in src.lower() for skip in SKIP_IMAGES):
+                fields['photo_url'] = urljoin(profile_url, src)
+                break
+
+    fields['research_areas'] = [page.of(tag).strip() for tag in tags.found]
+    fields['research_areas_str'] = ', '.join(fields['research_areas'])
+
+    return fields
@@ -0,0 +1,198 @@
+#!/usr/bin/env python3
+"""
+EEMB Record Sink
+Append-only JSONL files for scraper records, written as they are produced.
+
+The crawler, faculty scraper, link validator and media downloader append
+every record to a JSONL file as soon as it exists, instead of holding the
+whole run in a list until the end. Lines are fsynced in batches, so a crash
+loses at most the last batch. The CSV, JSON and Parquet outputs are built
+from the file afterwards, streaming, so memory use does not grow with the
+size of the site.
+
+A RecordSink behaves like the list it replaces for the scripts: append(),
+len() and iteration (read back from disk).
+
+Scripts that can process only part of the site (--changed-only) open
+their sink with keep_previous=True. The previous run's file is set aside
+and carry_over() copies back the records the partial run did not
+replace, so the outputs still cover the whole site.
+
+The records of an interrupted run are still on disk, and their outputs
+can be built from them:
+
+    python record_sink.py ../data/site-map.jsonl --catalog site_map
+"""
+
+import argparse
+import csv
+import json
+import os
+from itertools import islice
+
+from catalogs import SCHEMAS, write_parquet
+from json_stream import read_jsonl as read_records
+
+# Records between fsyncs; a crash loses at most this many
+DEFAULT_FSYNC_EVERY = 100
+
+# Records held in memory at a time while building the outputs
+BATCH_SIZE = 5000
+
+
+def batches(records, size=BATCH_SIZE):
+    records = iter(records)
+    while True:
+        batch = list(islice(records, size))
+        if not batch:
+            return
+        yield batch
+
+
+def columns_of(records):
+    """Every key of the records, in the order they first appear (the columns pandas would make)"""
+    if isinstance(records, RecordSink):
+        return list(records.columns)
+    columns = {}
+    for record in records:
+        columns.update(dict.fromkeys(record))
+    return list(columns)
+
+
+class RecordSink:
+    """JSONL file of records, appended to as they are produced
+
+    With resume=True an existing file is kept and appended to (a torn
+    last line is cut off first); otherwise the file starts empty. With
+    keep_previous=True the existing file is first moved to
+    `path + '.previous'` for carry_over(); it is deleted on close().
+    """
+
+    def __init__(self, path, fsync_every=DEFAULT_FSYNC_EVERY, resume=False, keep_previous=False):
+        self.path = path
+        self.fsync_every = fsync_every
+        self.pending = 0
+        self.count = 0
+        self.columns = {}  # Keys seen so far, in order (dict as an ordered set)
+        self.previous_path = path + '.previous' if keep_previous else None
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        if resume and os.path.exists(path):
+            self.recover()
+            self.file = open(path, 'a', encoding='utf-8')
+        else:
+            # A .previous left by a crashed run is the last complete one; keep it over the partial file
+            if self.previous_path and os.path.exists(path) and not os.path.exists(self.previous_path):
+                os.replace(path, self.previous_path)
+            self.file = open(path, 'w', encoding='utf-8')
+
+    def recover(self):
+        """Count the records of an existing file and drop a torn last line"""
+        good_bytes = 0
+        with open(self.path, 'rb') as f:
+            for line in f:
+                try:
+                    record = json.loads(line)
+                except json.JSONDecodeError:
+                    break
+                if not line.endswith(b'\n'):
+                    break
+                good_bytes += len(line)
+                self.count += 1
+                self.columns.update(dict.fromkeys(record))
+        os.truncate(self.path, good_bytes)
+
+    def append(self, record):
+        self.file.write(json.dumps(record, ensure_ascii=False) + '\n')
+        self.count += 1
+        self.columns.update(dict.fromkeys(record))
+        self.pending += 1
+        if self.pending >= self.fsync_every:
+            self.sync()
+
+    def carry_over(self, keep):
+        """Append the previous run's records that keep(record) accepts; returns how many"""
+        kept = 0
+        if self.previous_path and os.path.exists(self.previous_path):
+            for record in read_records(self.previous_path):
+                if keep(record):
+                    self.append(record)
+                    kept += 1
+        return kept
+
+    def sync(self):
+        """Make every appended record durable"""
+        self.file.flush()
+        os.fsync(self.file.fileno())
+        self.pending = 0
+
+    def __len__(self):
+        return self.count
+
+    def __iter__(self):
+        if not self.file.closed:
+            self.file.flush()
+        return read_records(self.path)
+
+    def close(self):
+        if not self.file.closed:
+            self.sync()
+            self.file.close()
+            if self.previous_path and os.path.exists(self.previous_path):
+                os.remove(self.previous_path)
+
+
+def write_csv(records, path, columns):
+    tmp_path = path + '.tmp'
+    with open(tmp_path, 'w', newline='', encoding='utf-8') as f:
+        writer = csv.DictWriter(f, fieldnames=columns)
+        writer.writeheader()
+        for batch in batches(records):
+            writer.writerows(batch)
+    os.replace(tmp_path, path)
+
+
+def write_json(records, path, ensure_ascii=True):
+    """Same file as json.dump(list(records), f, indent=2), one record at a time"""
+    tmp_path = path + '.tmp'
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        first = True
+        for record in records:
+            f.write('[\n  ' if first else ',\n  ')
+            f.write(json.dumps(record, indent=2, ensure_ascii=ensure_ascii).replace('\n', '\n  '))
+            first = False
+        f.write(']' if first else '\n]')
+    os.replace(tmp_path, path)
+
+
+def materialize(records, base_path, catalog=None, ensure_ascii=True):
+    """Write base_path.csv, .json and (for a known catalog) .parquet from records
+
+    `records` is a RecordSink or a list. Returns the paths written.
+    """
+    columns = columns_of(records)
+    paths = [base_path + '.csv', base_path + '.json']
+    write_csv(records, paths[0], columns)
+    write_json(records, paths[1], ensure_ascii)
+    if catalog is not None:
+        parquet_path = write_parquet(records, catalog, base_path + '.parquet', columns)
+        if parquet_path:
+            paths.append(parquet_path)
+    return paths
+
+
+def main():
+    """Build the CSV/JSON/Parquet outputs of a records file, e.g. after an interrupted run"""
+    parser = argparse.ArgumentParser(description='Write the CSV, JSON and Parquet outputs of a JSONL records file')
+    parser.add_argument('records', help='JSONL file written by one of the scrapers')
+    parser.add_argument('--catalog', choices=sorted(SCHEMAS), help='Parquet schema (default: no Parquet output)')
+    parser.add_argument('--output', help='Output path without extension (default: next to the records file)')
+    args = parser.parse_args()
+
+    sink = RecordSink(args.records, resume=True)
+    sink.close()
+    print(f"📄 {len(sink)} records in {args.records}")
+    for path in materialize(sink, args.output or os.path.splitext(args.records)[0], args.catalog):
+        print(f"✅ Saved {path}")
+
+if __name__ == "__main__":
+    main()
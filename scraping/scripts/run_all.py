@@ -1,53 +1,50 @@
 #!/usr/bin/env python3
 """
 EEMB Complete Scraping Pipeline
-Runs all scraping tasks in the correct order.
+Runs all scraping tasks as a dependency graph (see pipeline.py).
 """
 
+import argparse
 import os
 import sys
 import time
-import subprocess
 from datetime import datetime
 
+from pipeline import DEFAULT_REPORT_PATH, Pipeline, Stage
+
 def print_header(text):
     """Print a nice header"""
     print("\n" + "="*80)
     print(f"  {text}")
     print("="*80 + "\n")
 
-def run_script(script_name, description):
-    """Run a Python script and handle errors"""
-    print_header(description)
-    print(f"Running: {script_name}")
-    print(f"Started: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}\n")
-
-    start_time = time.time()
-
-    try:
-        result = subprocess.run(
-            [sys.executable, script_name],
-            cwd=os.path.dirname(os.path.abspath(__file__)),
-            capture_output=False,
-            text=True,
-            check=True
-        )
-
-        elapsed = time.time() - start_time
-        print(f"\n✅ {description} completed in {elapsed:.1f} seconds")
-        return True
-
-    except subprocess.CalledProcessError as e:
-        elapsed = time.time() - start_time
-        print(f"\n❌ {description} failed after {elapsed:.1f} seconds")
-        print(f"Error: {e}")
-        return False
-
-    except Exception as e:
-        elapsed = time.time() - start_time
-        print(f"\n❌ {description} failed after {elapsed:.1f} seconds")
-        print(f"Unexpected error: {e}")
-        return False
+def build_stages(incremental=False):
+    """The pipeline's stages and the files that connect them
+
+    The crawl and the faculty scrape read only the live site, so they can
+    run side by side. Media download needs both the crawl and the faculty
+    photos list. Link validation needs only the crawl. Image derivatives
+    are rebuilt when the downloaded images or their catalog changed.
+    """
+    # Incremental runs recrawl what is due and hand the changed-pages delta to later stages
+    crawl_args = ['--incremental'] if incremental else []
+    delta_args = ['--changed-only'] if incremental else []
+    delta_inputs = ['../data/changed-pages.json'] if incremental else []
+    crawl_outputs = ['../data/site-map.json', '../data/page-store.db']
+    return [
+        Stage('crawl', 'crawl_site.py', 'Step 1: Site Structure Crawler', args=crawl_args,
+              outputs=crawl_outputs + ['../data/changed-pages.json']),
+        Stage('faculty', 'scrape_faculty.py', 'Step 2: Faculty Directory Scraper',
+              outputs=['../data/faculty-scraped.json']),
+        Stage('media', 'download_images.py', 'Step 3: Image & Document Downloader', args=delta_args,
+              deps=['crawl', 'faculty'], inputs=crawl_outputs + ['../data/faculty-scraped.json'] + delta_inputs),
+        Stage('links', 'validate_links.py', 'Step 4: Link Validator', args=delta_args,
+              deps=['crawl'], inputs=crawl_outputs + delta_inputs),
+        Stage('derivatives', 'image_derivatives.py', 'Step 5: Responsive Image Variants',
+              deps=['media'],
+              inputs=['../assets/images', '../../backend/public/uploads/faculty', '../data/images-catalog.json'],
+              outputs=['../data/image-derivatives.json']),
+    ]
 
 def check_dependencies():
     """Check if all required packages are installed"""
@@ -122,7 +119,36 @@ def main():
     ╚════════════════════════════════════════════════════════════════════╝
     """)
 
+    parser = argparse.ArgumentParser(description='Run the complete EEMB scraping pipeline')
+    cache_group = parser.add_mutually_exclusive_group()
+    cache_group.add_argument('--offline', action='store_true',
+                             help='Replay pages from the HTTP cache without touching the network')
+    cache_group.add_argument('--no-cache', action='store_true',
+                             help='Bypass the shared HTTP cache entirely')
+    parser.add_argument('--incremental', action='store_true',
+                        help='Recrawl only pages that are due, then process only the pages that changed')
+    parser.add_argument('--jobs', type=int, default=None,
+                        help='Stages run at the same time (default: every stage that is ready; 1 = sequential)')
+    parser.add_argument('--force', action='append', default=[], metavar='STAGE',
+                        choices=['all', 'crawl', 'faculty', 'media', 'links', 'derivatives'],
+                        help='Rerun STAGE even if its inputs are unchanged (repeatable, or "all")')
+    parser.add_argument('--parser', choices=['html.parser', 'lxml', 'lxml-xpath'],
+                        help='HTML parser backend for every stage (default: html.parser)')
+    args = parser.parse_args()
+
+    # Every stage builds its session through http_cache.create_session,
+    # which reads the mode from the environment
+    if args.offline:
+        os.environ['EEMB_HTTP_CACHE_MODE'] = 'offline'
+    elif args.no_cache:
+        os.environ['EEMB_HTTP_CACHE_MODE'] = 'off'
+    # Likewise parsing.parse_html / parse_page read the backend from the environment
+    if args.parser:
+        os.environ['EEMB_HTML_PARSER'] = args.parser
+
     print(f"Started: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
+    print(f"HTTP cache mode: {os.environ.get('EEMB_HTTP_CACHE_MODE', 'revalidate')}")
+    print(f"HTML parser: {os.environ.get('EEMB_HTML_PARSER', 'html.parser')}")
 
     overall_start = time.time()
 
@@ -136,40 +162,32 @@ def main():
         print("\n❌ Failed to create output directories.")
         sys.exit(1)
 
-    # Step 3: Run scrapers in order
-    tasks = [
-        ('crawl_site.py', 'Step 1: Site Structure Crawler'),
-        ('scrape_faculty.py', 'Step 2: Faculty Directory Scraper'),
-        ('download_images.py', 'Step 3: Image & Document Downloader'),
-        ('validate_links.py', 'Step 4: Link Validator'),
-    ]
-
-    results = {}
-    for script, description in tasks:
-        success = run_script(script, description)
-        results[description] = success
-
-        if not success:
-            print(f"\n⚠️  {description} failed, but continuing with next task...")
-            print("  (You can fix errors and re-run individual scripts later)")
-
-        # Small pause between tasks
-        time.sleep(2)
+    # Step 3: Run the scrapers as a dependency graph
+    stages = build_stages(args.incremental)
+    print_header("Running Pipeline")
+    report = Pipeline(stages, max_parallel=args.jobs, force=set(args.force)).run()
 
     # Final summary
     overall_elapsed = time.time() - overall_start
 
     print_header("SCRAPING PIPELINE COMPLETE")
 
+    labels = {
+        'success': "✅ SUCCESS",
+        'skipped': "⏭️  UP TO DATE",
+        'failed': "❌ FAILED",
+        'blocked': "⛔ NOT RUN",
+    }
     print("📊 Task Summary:")
-    for task, success in results.items():
-        status = "✅ SUCCESS" if success else "❌ FAILED"
-        print(f"  {status} - {task}")
+    for entry in report['stages']:
+        timing = f" ({entry['duration_s']:.1f}s)" if entry.get('duration_s') else ''
+        print(f"  {labels[entry['status']]} - {entry['description']}{timing}")
 
     print(f"\n⏱️  Total time: {overall_elapsed:.1f} seconds ({overall_elapsed/60:.1f} minutes)")
 
-    successful_tasks = sum(1 for s in results.values() if s)
-    print(f"\n✅ {successful_tasks}/{len(tasks)} tasks completed successfully")
+    successful_tasks = sum(1 for e in report['stages'] if e['status'] in ('success', 'skipped'))
+    print(f"\n✅ {successful_tasks}/{len(stages)} tasks completed successfully")
+    print(f"📄 Run report: {DEFAULT_REPORT_PATH}")
 
     print("\n📁 Output Files:")
     print("  Data Files:")
@@ -183,6 +201,7 @@ def main():
     print("    - ../assets/images/ - All images")
     print("    - ../assets/images/faculty/ - Faculty photos")
     print("    - ../assets/documents/ - All documents")
+    print("    - ../assets/derivatives/ - Responsive WebP/AVIF image variants")
 
     print("\n🎉 Content preservation complete!")
     print("\nNext Steps:")
@@ -194,7 +213,7 @@ def main():
     print(f"\nFinished: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
 
     # Exit with error code if any task failed
-    if successful_tasks < len(tasks):
+    if successful_tasks < len(stages):
         sys.exit(1)
 
 if __name__ == "__main__":
@@ -0,0 +1,146 @@
+#!/usr/bin/env python3
+"""
+EEMB Request Throttling
+Per-host concurrency and requests-per-second budgets shared by the scrapers.
+"""
+
+import asyncio
+import threading
+import time
+from urllib.parse import urlparse
+
+
+class AsyncHostThrottle:
+    """Limit in-flight requests and request rate per host for asyncio crawls
+
+    Usage:
+        throttle = AsyncHostThrottle(per_host=4, rps=5)
+        async with throttle.slot(url):
+            ...  # make the request
+    """
+
+    def __init__(self, per_host=4, rps=None):
+        self.per_host = per_host
+        self.rps = rps
+        self.semaphores = {}
+        self.next_allowed = {}
+        self.locks = {}
+
+    def _host(self, url):
+        return urlparse(url).netloc
+
+    def _semaphore(self, host):
+        if host not in self.semaphores:
+            self.semaphores[host] = asyncio.Semaphore(self.per_host)
+            self.locks[host] = asyncio.Lock()
+            self.next_allowed[host] = 0.0
+        return self.semaphores[host]
+
+    async def _wait_for_rate(self, host):
+        """Space request starts on a host at least 1/rps seconds apart"""
+        if not self.rps:
+            return
+        interval = 1.0 / self.rps
+        async with self.locks[host]:
+            now = time.monotonic()
+            wait = self.next_allowed[host] - now
+            self.next_allowed[host] = max(now, self.next_allowed[host]) + interval
+        if wait > 0:
+            await asyncio.sleep(wait)
+
+    def slot(self, url):
+        """Async context manager that holds a request slot for url's host"""
+        return _HostSlot(self, self._host(url))
+
+
+class HostThrottle:
+    """Limit in-flight requests and request rate per host for thread pools
+
+    Each host gets a semaphore of `per_host` slots and a token bucket that
+    refills at `rps` tokens per second up to `burst`, so a quiet host can
+    take a short burst but a busy one settles at `rps`.
+
+    Usage:
+        throttle = HostThrottle(per_host=2, rps=5)
+        with throttle.slot(url):
+            ...  # make the request
+    """
+
+    def __init__(self, per_host=4, rps=None, burst=None):
+        self.per_host = per_host
+        self.rps = rps
+        self.burst = burst or per_host
+        self.semaphores = {}
+        self.buckets = {}  # host -> [tokens, last refill]
+        self.lock = threading.Lock()
+
+    def _host(self, url):
+        return urlparse(url).netloc
+
+    def _semaphore(self, host):
+        with self.lock:
+            if host not in self.semaphores:
+                self.semaphores[host] = threading.Semaphore(self.per_host)
+                self.buckets[host] = [float(self.burst), time.monotonic()]
+            return self.semaphores[host]
+
+    def _take_token(self, host):
+        """Seconds to wait before a token is free; the token is reserved either way"""
+        with self.lock:
+            bucket = self.buckets[host]
+            now = time.monotonic()
+            bucket[0] = min(self.burst, bucket[0] + (now - bucket[1]) * self.rps)
+            bucket[1] = now
+            bucket[0] -= 1
+            return -bucket[0] / self.rps if bucket[0] < 0 else 0
+
+    def _wait_for_rate(self, host):
+        if not self.rps:
+            return
+        wait = self._take_token(host)
+        if wait > 0:
+            time.sleep(wait)
+
+    def slot(self, url):
+        """Context manager that holds a request slot for url's host"""
+        return _ThreadHostSlot(self, self._host(url))
+
+
+class _ThreadHostSlot:
+    def __init__(self, throttle, host):
+        self.throttle = throttle
+        self.host = host
+        self.semaphore = throttle._semaphore(host)
+
+    def __enter__(self):
+        self.semaphore.acquire()
+        try:
+            self.throttle._wait_for_rate(self.host)
+        except BaseException:
+            self.semaphore.release()
+            raise
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.semaphore.release()
+        return False
+
+
+class _HostSlot:
+    def __init__(self, throttle, host):
+        self.throttle = throttle
+        self.host = host
+        self.semaphore = throttle._semaphore(host)
+
+    async def __aenter__(self):
+        await self.semaphore.acquire()
+        try:
+            await self.throttle._wait_for_rate(self.host)
+        except BaseException:
+            self.semaphore.release()
+            raise
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb):
+        self.semaphore.release()
+        return False
@@ -3,46 +3,86 @@
 EEMB Link Validator
 Validates all internal and external links found during scraping.
 Identifies broken links, redirects, and slow responses.
+
+Each unique target URL is checked once, however many pages link to it,
+and its result is copied to every page that links to it. Requests go
+through a per-host throttle (a concurrency cap plus a token bucket), so
+external hosts such as doi.org are not hammered by the thread pool.
+
+Links are checked with HEAD. Servers that refuse HEAD (405, 403, ...) are
+asked again with a one-byte ranged GET. Results are kept in
+data/link-status.db (see link_status.py), and later runs only recheck
+links whose cached result has expired.
+
+--engine async swaps the thread pool for an asyncio engine with
+per-host keep-alive pools (async_validator.py, needs aiohttp).
 """
 
+import argparse
 import requests
-import pandas as pd
-import json
 import os
 from urllib.parse import urlparse
 from tqdm import tqdm
 import time
+from collections import Counter, defaultdict, deque
 from concurrent.futures import ThreadPoolExecutor, as_completed
+from requests.adapters import HTTPAdapter
+
+from crawl_state import DEFAULT_CHANGES_PATH, load_changed_pages
+from http_cache import create_session
+from json_stream import iter_records
+from link_status import DEFAULT_LINK_STATUS, LinkStatusCache
+from page_store import DEFAULT_PAGE_STORE, PageStore
+from parsing import parse_page
+from record_sink import RecordSink, columns_of, materialize, write_csv
+from throttle import HostThrottle
+
+DEFAULT_RECORDS = '../data/link-validation.jsonl'
+
+# HEAD answers that usually mean "HEAD not supported" rather than a broken link
+HEAD_REFUSED = {400, 403, 405, 501}
 
 class LinkValidator:
-    def __init__(self, timeout=10, max_workers=5):
+    def __init__(self, timeout=10, max_workers=5, per_host=2, rps=5, status_cache_path=DEFAULT_LINK_STATUS,
+                 records_path=DEFAULT_RECORDS):
         self.timeout = timeout
         self.max_workers = max_workers
-        self.session = requests.Session()
-        self.session.headers.update({
-            'User-Agent': 'EEMB-Scraper/1.0 (Link validation for website redesign)'
-        })
-        self.results = []
+        # HEAD checks bypass the cache; only the page re-fetches are cached
+        self.session = create_session('EEMB-Scraper/1.0 (Link validation for website redesign)')
+        adapter = HTTPAdapter(pool_connections=max_workers, pool_maxsize=max_workers)
+        self.session.mount('http://', adapter)
+        self.session.mount('https://', adapter)
+        self.throttle = HostThrottle(per_host=per_host, rps=rps)
+        # None disables the cache and checks every link
+        self.status_cache = LinkStatusCache(status_cache_path) if status_cache_path else None
+        # Result rows go to disk as they are made (None keeps them in a list)
+        # A --changed-only run carries the unchanged pages' rows over from the previous run
+        self.results = RecordSink(records_path, keep_previous=True) if records_path else []
+        self.unchanged_pages = None  # Pages whose previous rows still hold, in a --changed-only run
+
+    def request_status(self, url):
+        """HEAD the URL, falling back to a ranged GET if the server refuses HEAD
+
+        Returns (response, method). The GET streams and is closed without
+        reading the body, so servers that ignore Range cost no download.
+        """
+        response = self.session.head(url, timeout=self.timeout, allow_redirects=True)
+        if response.status_code not in HEAD_REFUSED:
+            return response, 'HEAD'
+        response = self.session.get(url, timeout=self.timeout, allow_redirects=True, stream=True,
+                                    headers={'Range': 'bytes=0-0'})
+        response.close()
+        return response, 'GET'
 
     def validate_url(self, url, source_page=''):
         """Validate a single URL"""
         try:
             start_time = time.time()
-            response = self.session.head(url, timeout=self.timeout, allow_redirects=True)
+            response, method = self.request_status(url)
             response_time = time.time() - start_time
 
-            result = {
-                'url': url,
-                'source_page': source_page,
-                'status_code': response.status_code,
-                'status': self.categorize_status(response.status_code),
-                'response_time_ms': round(response_time * 1000, 2),
-                'final_url': response.url,
-                'is_redirect': response.url != url,
-                'content_type': response.headers.get('Content-Type', ''),
-                'error': None,
-                'checked_at': time.strftime('%Y-%m-%d %H:%M:%S')
-            }
+            result = self.response_result(url, response.status_code, response_time, method,
+                                          response.url, response.headers.get('Content-Type', ''), source_page)
 
         except requests.exceptions.Timeout:
             result = {
@@ -77,10 +117,27 @@ class LinkValidator:
 
         return result
 
+    def response_result(self, url, status_code, response_time, method, final_url, content_type, source_page=''):
+        """Result row for a URL that answered"""
+        return {
+            'url': url,
+            'source_page': source_page,
+            'status_code': status_code,
+            'status': self.categorize_status(status_code),
+            'response_time_ms': round(response_time * 1000, 2),
+            'method': method,
+            'final_url': final_url,
+            'is_redirect': final_url != url,
+            'content_type': content_type,
+            'error': None,
+            'checked_at': time.strftime('%Y-%m-%d %H:%M:%S')
+        }
+
     def categorize_status(self, status_code):
         """Categorize HTTP status code"""
         if isinstance(status_code, int):
-            if status_code == 200:
+            # 206 is the answer to the ranged GET fallback
+            if status_code in (200, 206):
                 return 'ok'
             elif 200 <= status_code < 300:
                 return 'ok_other'
@@ -94,8 +151,18 @@ class LinkValidator:
                 return 'server_error'
         return 'unknown'
 
-    def extract_links_from_site_map(self, site_map_path='../data/site-map.json'):
-        """Extract all unique links from site map"""
+    def should_check(self, href):
+        """Skip anchors, javascript, mailto, tel"""
+        return not (href.startswith('#') or href.startswith('javascript:') or
+                    href.startswith('mailto:') or href.startswith('tel:'))
+
+    def extract_links_from_site_map(self, site_map_path='../data/site-map.json', page_store_path=DEFAULT_PAGE_STORE,
+                                    changes_path=None):
+        """Extract all unique links from site map
+
+        With `changes_path` only the pages in that crawl delta
+        (changed-pages.json) are considered.
+        """
         print("🔗 Extracting links from site map")
 
         if not os.path.exists(site_map_path):
@@ -103,10 +170,53 @@ class LinkValidator:
             print("  Run crawl_site.py first!")
             return []
 
-        # Load site map
-        with open(site_map_path, 'r') as f:
-            site_map = json.load(f)
+        changed, gone = None, set()
+        if changes_path:
+            changed = load_changed_pages(changes_path)
+            if changed is None:
+                print(f"  No crawl delta at {changes_path}, checking every page")
+            else:
+                # Pages that now fail lose their links along with the changed pages
+                gone = load_changed_pages(changes_path, kinds=('gone',))
+                self.unchanged_pages = set()
+
+        # Load site map, one page at a time
+        selected = 0
+
+        def site_map():
+            nonlocal selected
+            for page in iter_records(site_map_path):
+                if changed is None or page.get('url') in changed:
+                    selected += 1
+                    yield page
+                elif page.get('url') not in gone:
+                    self.unchanged_pages.add(page.get('url'))
+
+        store = PageStore.open_existing(page_store_path)
+        if store is not None:
+            print(f"  Reading link edges from page store {page_store_path}")
+            links_to_check = self.links_from_store(store, site_map())
+            store.close()
+        else:
+            print("  No page store found, re-fetching pages")
+            links_to_check = self.links_from_pages(site_map())
+
+        if changed is not None:
+            print(f"  Only the {selected} new or changed pages from {changes_path}")
+        print(f"  Found {len(links_to_check)} unique links to validate")
+        return list(links_to_check)
 
+    def links_from_store(self, store, site_map):
+        """(url, source page) pairs of the site map's pages, read from the crawler's page store"""
+        page_urls = {page.get('url', '') for page in site_map}
+        return {
+            (full_url, page_url)
+            for page_url, href, full_url, _ in store.iter_edges('link', page_urls)
+            if self.should_check(href)
+        }
+
+    def links_from_pages(self, site_map):
+        """(url, source page) pairs of the site map's pages, found by re-fetching each page"""
         links_to_check = set()
 
         # Extract all URLs from site map pages
@@ -115,16 +225,12 @@ class LinkValidator:
 
             # Re-fetch page to extract links
             try:
-                from bs4 import BeautifulSoup
                 response = self.session.get(page_url, timeout=10)
-                soup = BeautifulSoup(response.content, 'html.parser')
+                page = parse_page(response.content)
 
-                for link in soup.find_all('a', href=True):
-                    href = link['href']
+                for href, _ in page.links():
 
-                    # Skip anchors, javascript, mailto, tel
-                    if href.startswith('#') or href.startswith('javascript:') or \
-                       href.startswith('mailto:') or href.startswith('tel:'):
+                    if not self.should_check(href):
                         continue
 
                     # Make absolute URL
@@ -137,88 +243,181 @@ class LinkValidator:
                 print(f"  Error extracting links from {page_url}: {e}")
                 continue
 
-        print(f"  Found {len(links_to_check)} unique links to validate")
-        return list(links_to_check)
-
-    def validate_all_links(self, site_map_path='../data/site-map.json'):
-        """Validate all links in parallel"""
+        return links_to_check
+
+    def group_by_target(self, links_to_check):
+        """(url, source page) pairs -> {url: sorted source pages}"""
+        sources = defaultdict(set)
+        for url, source in links_to_check:
+            sources[url].add(source)
+        return {url: sorted(pages) for url, pages in sources.items()}
+
+    def interleave_hosts(self, urls):
+        """Order URLs round-robin across hosts
+
+        Workers then spread over many hosts instead of queueing behind one
+        host's concurrency cap.
+        """
+        by_host = defaultdict(deque)
+        for url in urls:
+            by_host[urlparse(url).netloc].append(url)
+        queues = deque(by_host.values())
+        ordered = []
+        while queues:
+            queue = queues.popleft()
+            ordered.append(queue.popleft())
+            if queue:
+                queues.append(queue)
+        return ordered
+
+    def validate_target(self, url):
+        """Validate one unique URL inside its host's throttle slot"""
+        with self.throttle.slot(url):
+            return self.validate_url(url)
+
+    def check_urls(self, urls, handle):
+        """Validate urls in parallel, calling handle(result) on this thread as each finishes"""
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            futures = [executor.submit(self.validate_target, url) for url in urls]
+            for future in as_completed(futures):
+                handle(future.result())
+
+    def add_result(self, result, source_pages):
+        """One result row per page that links to the URL"""
+        for source in source_pages:
+            self.results.append(dict(result, source_page=source))
+
+    def validate_all_links(self, site_map_path='../data/site-map.json', page_store_path=DEFAULT_PAGE_STORE,
+                           changes_path=None, recheck=False):
+        """Validate all links in parallel
+
+        Links with an unexpired result in the status cache are not
+        requested again unless `recheck` is set.
+        """
         print("🔍 Starting link validation")
 
         # Extract links
-        links_to_check = self.extract_links_from_site_map(site_map_path)
+        links_to_check = self.extract_links_from_site_map(site_map_path, page_store_path, changes_path)
+
+        if self.unchanged_pages is not None and isinstance(self.results, RecordSink):
+            kept = self.results.carry_over(lambda r: r.get('source_page') in self.unchanged_pages)
+            print(f"  Kept {kept} results of the {len(self.unchanged_pages)} unchanged pages from the last run")
 
         if not links_to_check:
             print("⚠️  No links to validate")
             return
 
-        print(f"\n📋 Validating {len(links_to_check)} links with {self.max_workers} workers")
+        # A link in the site-wide navigation appears on every page but is checked once
+        sources = self.group_by_target(links_to_check)
+        hosts = {urlparse(url).netloc for url in sources}
+        print(f"\n📋 {len(sources)} unique URLs on {len(hosts)} hosts ({len(links_to_check)} links)")
 
-        # Validate in parallel
-        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
-            # Submit all tasks
-            future_to_url = {
-                executor.submit(self.validate_url, url, source): (url, source)
-                for url, source in links_to_check
-            }
+        to_check = []
+        for url in sources:
+            cached = self.status_cache.get(url) if self.status_cache and not recheck else None
+            if cached is None:
+                to_check.append(url)
+            else:
+                self.add_result(dict(cached, from_cache=True), sources[url])
+        if self.status_cache:
+            print(f"  {self.status_cache.summary()}")
+        print(f"  Checking {len(to_check)} URLs with {self.max_workers} workers")
+
+        pbar = tqdm(total=len(to_check), desc="Validating")
+
+        def handle(result):
+            if self.status_cache:
+                self.status_cache.put(result)
+            self.add_result(dict(result, from_cache=False), sources[result['url']])
+            pbar.update(1)
 
-            # Process results as they complete
-            for future in tqdm(as_completed(future_to_url), total=len(links_to_check), desc="Validating"):
-                result = future.result()
-                self.results.append(result)
+        self.check_urls(self.interleave_hosts(to_check), handle)
+        pbar.close()
+
+        if self.status_cache:
+            self.status_cache.close()
 
         print(f"\n✅ Link validation complete!")
 
     def save_results(self, output_dir='../data'):
-        """Save validation results to CSV and JSON"""
+        """Save validation results to CSV, JSON and Parquet"""
         os.makedirs(output_dir, exist_ok=True)
 
         if not self.results:
             print("⚠️  No results to save")
             return
 
-        # Save as CSV
-        df = pd.DataFrame(self.results)
-        csv_path = os.path.join(output_dir, 'link-validation.csv')
-        df.to_csv(csv_path, index=False)
-        print(f"✅ Link validation results saved to {csv_path}")
+        # CSV, JSON and Parquet (typed, for analysis), streamed from the result rows
+        for path in materialize(self.results, os.path.join(output_dir, 'link-validation'), 'link_validation'):
+            print(f"✅ Link validation results saved to {path}")
 
-        # Save as JSON
-        json_path = os.path.join(output_dir, 'link-validation.json')
-        with open(json_path, 'w') as f:
-            json.dump(self.results, f, indent=2)
+        # One pass over the rows for the summary
+        statuses = Counter()
+        slow_links = []
+        for r in self.results:
+            statuses[r.get('status')] += 1
+            if (r.get('response_time_ms') or 0) > 3000:
+                slow_links.append(r)
 
         # Save broken links separately
-        broken_links = [r for r in self.results if r.get('status') not in ['ok', 'ok_other', 'redirect']]
-        if broken_links:
-            broken_df = pd.DataFrame(broken_links)
+        ok = ['ok', 'ok_other', 'redirect']
+        if sum(statuses.values()) > sum(statuses[s] for s in ok):
             broken_csv = os.path.join(output_dir, 'broken-links.csv')
-            broken_df.to_csv(broken_csv, index=False)
+            write_csv((r for r in self.results if r.get('status') not in ok), broken_csv, columns_of(self.results))
             print(f"✅ Broken links saved to {broken_csv}")
 
         # Print summary statistics
         print("\n📊 Link Validation Statistics:")
         print(f"  Total links checked: {len(self.results)}")
-        print(f"  OK (200): {len([r for r in self.results if r.get('status') == 'ok'])}")
-        print(f"  Redirects: {len([r for r in self.results if r.get('status') == 'redirect'])}")
-        print(f"  Not Found (404): {len([r for r in self.results if r.get('status') == 'not_found'])}")
-        print(f"  Client Errors (4xx): {len([r for r in self.results if r.get('status') == 'client_error'])}")
-        print(f"  Server Errors (5xx): {len([r for r in self.results if r.get('status') == 'server_error'])}")
-        print(f"  Timeouts: {len([r for r in self.results if r.get('status') == 'timeout'])}")
-        print(f"  Other Errors: {len([r for r in self.results if r.get('status') == 'error'])}")
+        print(f"  OK (200): {statuses['ok']}")
+        print(f"  Redirects: {statuses['redirect']}")
+        print(f"  Not Found (404): {statuses['not_found']}")
+        print(f"  Client Errors (4xx): {statuses['client_error']}")
+        print(f"  Server Errors (5xx): {statuses['server_error']}")
+        print(f"  Timeouts: {statuses['timeout']}")
+        print(f"  Other Errors: {statuses['error']}")
+        print(f"  {self.session.cache_summary()}")
 
         # Slow links
-        slow_links = [r for r in self.results if r.get('response_time_ms', 0) > 3000]
         if slow_links:
             print(f"\n⚠️  {len(slow_links)} slow links (>3s):")
             for link in slow_links[:5]:  # Show first 5
                 print(f"    {link.get('url')} - {link.get('response_time_ms')}ms")
 
+    def close(self):
+        if isinstance(self.results, RecordSink):
+            self.results.close()
+
 def main():
     """Run the link validator"""
-    validator = LinkValidator(timeout=10, max_workers=10)
-
-    validator.validate_all_links()
+    parser = argparse.ArgumentParser(description='Validate the links of every crawled page')
+    parser.add_argument('--changed-only', action='store_true',
+                        help='Only check links on pages the latest crawl found new or changed')
+    parser.add_argument('--engine', choices=['threads', 'async'], default='threads',
+                        help='Thread pool over requests, or asyncio over aiohttp (needs aiohttp)')
+    parser.add_argument('--workers', type=int, default=None,
+                        help='Requests in flight across all hosts (default: 10 threads, 50 async)')
+    parser.add_argument('--per-host', type=int, default=2, help='Requests in flight per host')
+    parser.add_argument('--rps', type=float, default=5, help='Requests per second per host')
+    parser.add_argument('--recheck', action='store_true',
+                        help='Check every link again, even if its cached status has not expired')
+    parser.add_argument('--no-status-cache', action='store_true',
+                        help=f'Neither read nor write {DEFAULT_LINK_STATUS}')
+    args = parser.parse_args()
+
+    if args.engine == 'async':
+        from async_validator import AsyncLinkValidator as validator_class
+        workers = args.workers or 50
+    else:
+        validator_class = LinkValidator
+        workers = args.workers or 10
+    validator = validator_class(timeout=10, max_workers=workers, per_host=args.per_host, rps=args.rps,
+                                status_cache_path=None if args.no_status_cache else DEFAULT_LINK_STATUS)
+
+    validator.validate_all_links(changes_path=DEFAULT_CHANGES_PATH if args.changed_only else None,
+                                 recheck=args.recheck)
     validator.save_results()
+    validator.close()
 
     print("\n🎉 Done! Check ../data/link-validation.csv and ../data/broken-links.csv")
 
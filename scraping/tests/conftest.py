@@ -0,0 +1,15 @@
+"""Shared fixtures for the scraping tests: scripts/ on the import path, a throwaway HTTP cache"""
+
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'scripts'))
+
+
+@pytest.fixture(autouse=True)
+def http_cache_dir(tmp_path, monkeypatch):
+    """Keep every test's HTTP cache out of data/"""
+    monkeypatch.setenv('EEMB_HTTP_CACHE_DIR', str(tmp_path / 'http-cache'))
+    monkeypatch.setenv('EEMB_HTTP_CACHE_MODE', 'off')
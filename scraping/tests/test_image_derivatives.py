@@ -0,0 +1,21 @@
+"""The manifest records a source's own size, not the size the JPEG decoder was drafted down to"""
+
+from PIL import Image
+
+from image_derivatives import make_derivatives
+
+
+def test_recorded_size_is_the_upright_source_size(tmp_path):
+    img = Image.new('RGB', (4000, 3000), 'red')
+    exif = img.getexif()
+    exif[0x0112] = 6  # stored sideways, shown as 3000x4000
+    source = tmp_path / 'photo.jpg'
+    img.save(source, exif=exif)
+
+    entry = make_derivatives(str(source), 'ab' * 32, str(tmp_path / 'out'), [320, 1280], ['jpeg'])
+
+    assert (entry['width'], entry['height']) == (3000, 4000)
+    assert [(v['width'], v['height']) for v in entry['variants']] == [(320, 427), (1280, 1707)]
+    for variant in entry['variants']:
+        with Image.open(variant['path']) as out:
+            assert out.size == (variant['width'], variant['height'])
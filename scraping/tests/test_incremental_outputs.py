@@ -0,0 +1,138 @@
+"""A --changed-only run must keep the unchanged pages' rows in the link and media catalogs"""
+
+import io
+import json
+import random
+import threading
+from contextlib import contextmanager, redirect_stdout
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+from PIL import Image
+
+from download_images import MediaDownloader
+from page_store import PageStore
+from validate_links import LinkValidator
+
+
+def noise_png(path):
+    """A small PNG that no other path shares (or is a near-duplicate of)"""
+    rng = random.Random(path)
+    img = Image.new('L', (32, 32))
+    img.putdata([rng.randrange(256) for _ in range(32 * 32)])
+    out = io.BytesIO()
+    img.save(out, 'PNG')
+    return out.getvalue()
+
+
+class Handler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+
+    def log_message(self, format, *args):
+        pass
+
+    def do_GET(self):
+        if self.path.endswith('.png'):
+            body, content_type = noise_png(self.path), 'image/png'
+        elif self.path.endswith('.pdf'):
+            body, content_type = b'%PDF-1.4 ' + self.path.encode() + b'\n%%EOF\n', 'application/pdf'
+        else:
+            body, content_type = b'<html><title>ok</title></html>', 'text/html'
+        self.send_response(200)
+        self.send_header('Content-Type', content_type)
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        if self.command != 'HEAD':
+            self.wfile.write(body)
+
+    do_HEAD = do_GET
+
+
+@contextmanager
+def serve():
+    server = ThreadingHTTPServer(('127.0.0.1', 0), Handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    try:
+        yield f'http://127.0.0.1:{server.server_address[1]}'
+    finally:
+        server.shutdown()
+        server.server_close()
+
+
+@pytest.fixture
+def site(tmp_path):
+    """Three crawled pages, each with its own links, images and a PDF"""
+    with serve() as base:
+        pages = {f'{base}/{name}': name for name in ('about', 'people', 'news')}
+
+        def edges(name, version):
+            return ([('link', f'/{name}/link-{i}', f'{base}/{name}/link-{i}{version}', '') for i in range(3)]
+                    + [('image', f'/{name}.png', f'{base}/files/{name}{version}.png', '')]
+                    + [('document', f'/{name}.pdf', f'{base}/files/{name}{version}.pdf', '')])
+
+        def crawl(versions, changes=()):
+            store = PageStore(str(tmp_path / 'page-store.db'))
+            for url, name in pages.items():
+                store.save_page(url, url, 200, 'text/html', '<html></html>', edges(name, versions.get(name, '')))
+            store.close()
+            with open(tmp_path / 'site-map.json', 'w') as f:
+                json.dump([{'url': url, 'status_code': 200} for url in pages], f)
+            with open(tmp_path / 'changed-pages.json', 'w') as f:
+                json.dump({'changes': [{'url': f'{base}/{name}', 'change': kind} for name, kind in changes]}, f)
+
+        yield base, crawl
+
+
+def paths(tmp_path):
+    return {'site_map_path': str(tmp_path / 'site-map.json'), 'page_store_path': str(tmp_path / 'page-store.db')}
+
+
+def validate(tmp_path, changes_path=None):
+    validator = LinkValidator(status_cache_path=None, records_path=str(tmp_path / 'link-validation.jsonl'))
+    with redirect_stdout(io.StringIO()):
+        validator.validate_all_links(changes_path=changes_path, **paths(tmp_path))
+        validator.save_results(str(tmp_path))
+    validator.close()
+    with open(tmp_path / 'link-validation.json') as f:
+        return {(row['source_page'].rsplit('/', 1)[1], row['url'].rsplit('/', 1)[1]) for row in json.load(f)}
+
+
+def download(tmp_path, changes_path=None):
+    downloader = MediaDownloader(asset_dir=str(tmp_path / 'assets'), index_path=str(tmp_path / 'asset-index.db'),
+                                 image_records_path=str(tmp_path / 'images-downloaded.jsonl'),
+                                 document_records_path=str(tmp_path / 'documents-catalog.jsonl'))
+    with redirect_stdout(io.StringIO()):
+        downloader.download_from_site_map(changes_path=changes_path, **paths(tmp_path))
+        downloader.save_catalog(str(tmp_path))
+    downloader.close()
+    urls = set()
+    for catalog in ('images-catalog.json', 'documents-catalog.json'):
+        with open(tmp_path / catalog) as f:
+            urls.update(row['original_url'].rsplit('/', 1)[1] for row in json.load(f))
+    return urls
+
+
+def test_changed_only_link_validation_keeps_unchanged_pages(tmp_path, site):
+    base, crawl = site
+    crawl({})
+    full = validate(tmp_path)
+    assert len(full) == 9
+
+    # people changed its links, news now fails
+    crawl({'people': '-v2'}, changes=[('people', 'changed'), ('news', 'gone')])
+    delta = validate(tmp_path, str(tmp_path / 'changed-pages.json'))
+
+    assert {row for row in delta if row[0] == 'about'} == {row for row in full if row[0] == 'about'}
+    assert {row for row in delta if row[0] == 'people'} == {('people', f'link-{i}-v2') for i in range(3)}
+    assert not any(row[0] == 'news' for row in delta)
+    assert not (tmp_path / 'link-validation.jsonl.previous').exists()
+
+
+def test_changed_only_media_download_keeps_unchanged_pages(tmp_path, site):
+    base, crawl = site
+    crawl({})
+    assert download(tmp_path) == {'about.png', 'people.png', 'news.png', 'about.pdf', 'people.pdf', 'news.pdf'}
+
+    crawl({'people': '-v2'}, changes=[('people', 'changed'), ('news', 'gone')])
+    assert download(tmp_path, str(tmp_path / 'changed-pages.json')) == {
+        'about.png', 'people-v2.png', 'about.pdf', 'people-v2.pdf'}
@@ -0,0 +1,83 @@
+"""Every parser backend must extract what html.parser extracts, also from malformed markup"""
+
+import os
+
+import pytest
+
+from parsing import BACKENDS, default_backend, parse_html, parse_page, resolve_backend
+from profile_extractor import extract_profile
+
+FIXTURES = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'fixtures', 'malformed')
+
+# Pages lxml repairs differently from html.parser, the reason html.parser stays the default.
+# html.parser keeps an unclosed <a> open across the next link and reads an unclosed comment as
+# text; in a profile, an unclosed bio <p> swallows the sections after it.
+PAGE_DIFFERENCES = {'unclosed-a.html', 'unclosed-comment.html'}
+PROFILE_DIFFERENCES = {'faculty-profile-unclosed-bio.html'}
+
+
+def fixture_pages(prefix=''):
+    return sorted(name for name in os.listdir(FIXTURES) if name.startswith(prefix) and name.endswith('.html'))
+
+
+def read(name):
+    with open(os.path.join(FIXTURES, name), 'rb') as f:
+        return f.read()
+
+
+def available(backend):
+    try:
+        return resolve_backend(backend)
+    except ValueError as e:
+        pytest.skip(str(e))
+
+
+def page_fields(markup, backend):
+    """What the crawler, link validator and downloader read from a page"""
+    page = parse_page(markup, backend)
+    return {
+        'title': page.title(),
+        'description': page.meta_content('description'),
+        'text': page.text(separator=' ', strip=True),
+        'links': page.links(),
+        'images': page.images(),
+    }
+
+
+def params(names, known_differences):
+    for backend in BACKENDS[1:]:
+        for name in names:
+            marks = [pytest.mark.xfail(strict=True)] if name in known_differences else []
+            yield pytest.param(backend, name, marks=marks, id=f'{backend}-{name}')
+
+
+@pytest.mark.parametrize('backend, name', list(params(fixture_pages(), PAGE_DIFFERENCES)))
+def test_page_fields_match_html_parser(backend, name):
+    available(backend)
+    markup = read(name)
+    assert page_fields(markup, backend) == page_fields(markup, 'html.parser')
+
+
+@pytest.mark.parametrize('backend, name', list(params(fixture_pages('faculty-profile'), PROFILE_DIFFERENCES)))
+def test_profile_fields_match_html_parser(backend, name):
+    available(backend)
+    markup = read(name)
+    url = 'https://eemb.ucsb.edu/people/faculty/example'
+    expected = extract_profile(parse_html(markup, 'html.parser'), url)
+    assert expected['email'] == 'alex@ucsb.edu'
+    assert extract_profile(parse_html(markup, backend), url) == expected
+
+
+def test_html_parser_is_the_default(monkeypatch):
+    monkeypatch.delenv('EEMB_HTML_PARSER', raising=False)
+    assert default_backend() == 'html.parser'
+    assert resolve_backend(None) == 'html.parser'
+
+
+def test_lxml_is_opt_in(monkeypatch):
+    available('lxml-xpath')
+    monkeypatch.setenv('EEMB_HTML_PARSER', 'lxml-xpath')
+    assert resolve_backend(None) == 'lxml-xpath'
+    monkeypatch.setenv('EEMB_HTML_PARSER', 'soup')
+    with pytest.raises(ValueError):
+        default_backend()
@@ -0,0 +1,82 @@
+"""A stage is skipped when its inputs hold the same content, even if the stage before it ran"""
+
+import io
+import json
+import textwrap
+from contextlib import redirect_stdout
+
+from pipeline import Pipeline, Stage
+
+# Recrawls the "site" in pages.txt: same records in a random order, with a fresh crawled_at and stored_at
+CRAWL = """
+import json, random, sqlite3, sys, time
+pages = open('pages.txt').read().split()
+random.shuffle(pages)
+with open('site-map.json', 'w') as f:
+    json.dump([{'url': url, 'status_code': 200, 'crawled_at': time.time()} for url in pages], f)
+conn = sqlite3.connect('page-store.db')
+conn.execute('CREATE TABLE IF NOT EXISTS pages (url TEXT PRIMARY KEY, html TEXT, stored_at TEXT)')
+conn.execute('DELETE FROM pages')
+conn.executemany('INSERT INTO pages VALUES (?, ?, ?)', [(url, '<html></html>', time.time()) for url in pages])
+conn.commit()
+with open('changed-pages.json', 'w') as f:
+    json.dump({'generated_at': time.time(), 'changes': []}, f)
+"""
+
+# Counts its runs and writes a catalog
+MEDIA = """
+import json
+open('media-runs.txt', 'a').write('run\\n')
+with open('catalog.json', 'w') as f:
+    json.dump([{'url': url} for url in json.load(open('site-map.json'))], f)
+"""
+
+# Counts its runs and, like image_derivatives.py, adds to the catalog it reads
+DERIVATIVES = """
+import json
+open('derivative-runs.txt', 'a').write('run\\n')
+rows = json.load(open('catalog.json'))
+with open('catalog.json', 'w') as f:
+    json.dump([dict(row, variants=[]) for row in rows], f)
+open('derivatives.json', 'w').write('{}')
+"""
+
+
+def run_pipeline():
+    stages = [
+        Stage('crawl', 'crawl.py', 'crawl', outputs=['site-map.json', 'page-store.db']),
+        Stage('media', 'media.py', 'media', deps=['crawl'],
+              inputs=['site-map.json', 'page-store.db', 'changed-pages.json'], outputs=['catalog.json']),
+        Stage('derivatives', 'derivatives.py', 'derivatives', deps=['media'],
+              inputs=['catalog.json'], outputs=['derivatives.json']),
+    ]
+    pipeline = Pipeline(stages, max_parallel=2, state_path='state.json', report_path='report.json', log_dir='logs')
+    with redirect_stdout(io.StringIO()):
+        report = pipeline.run()
+    return {entry['stage']: entry['status'] for entry in report['stages']}
+
+
+def runs(tmp_path, name):
+    return len((tmp_path / name).read_text().splitlines())
+
+
+def test_unchanged_inputs_skip_downstream_stages(tmp_path, monkeypatch):
+    # Stage scripts and paths are relative to SCRIPT_DIR
+    monkeypatch.setattr('pipeline.SCRIPT_DIR', str(tmp_path))
+    for name, source in (('crawl.py', CRAWL), ('media.py', MEDIA), ('derivatives.py', DERIVATIVES)):
+        (tmp_path / name).write_text(textwrap.dedent(source))
+    (tmp_path / 'pages.txt').write_text('\n'.join(f'https://example.edu/page-{i}' for i in range(20)))
+
+    assert run_pipeline() == {'crawl': 'success', 'media': 'success', 'derivatives': 'success'}
+
+    # The crawl ran again and rewrote its outputs, but found the same pages
+    assert run_pipeline() == {'crawl': 'success', 'media': 'skipped', 'derivatives': 'skipped'}
+    assert runs(tmp_path, 'media-runs.txt') == 1
+    assert runs(tmp_path, 'derivative-runs.txt') == 1
+
+    # A new page reaches every stage downstream of the crawl
+    with open(tmp_path / 'pages.txt', 'a') as f:
+        f.write('\nhttps://example.edu/page-new')
+    assert run_pipeline() == {'crawl': 'success', 'media': 'success', 'derivatives': 'success'}
+    assert runs(tmp_path, 'media-runs.txt') == 2
+    assert runs(tmp_path, 'derivative-runs.txt') == 2
@@ -10,6 +10,8 @@ import os
 from datetime import datetime
 from pathlib import Path
 
+from name_matching import NameIndex, name_before_title
+
 # Map of faculty names to their photo files
 FACULTY_PHOTOS = {
     "Cherie Briggs": "CherieBriggs_photo2024_small.jpg",
@@ -30,41 +32,26 @@ FACULTY_PHOTOS = {
 
 # Load the scraped faculty data to get photo URLs from EEMB website
 def load_scraped_photos():
+    """Photo URLs from the scraped faculty data, by the name that starts each page title"""
     scraped_file = '/Users/adrianstiermbp2023/eemb-website-redesign-2025-2026/scraping/data/faculty-scraped.json'
 
-    photo_map = {}
+    photos = NameIndex()
 
     try:
         with open(scraped_file, 'r') as f:
             scraped_data = json.load(f)
 
         for record in scraped_data:
-            # Try to extract name and photo URL
-            if 'title' in record:
-                # Extract name from title (usually format: "Name Title")
-                title_parts = record['title'].strip().split('\n')[0] if '\n' in record['title'] else record['title']
-
-                # Look for photo URL in the record
-                if 'photo_url' in record and record['photo_url']:
-                    # Extract name (first part before title keywords)
-                    name_parts = title_parts.split()
-                    if len(name_parts) >= 2:
-                        # Try to find where the title starts (Professor, Lecturer, etc.)
-                        title_keywords = ['Professor', 'Lecturer', 'Research', 'Emeritus', 'Assistant', 'Associate', 'Senior']
-                        name_end_idx = len(name_parts)
-                        for i, part in enumerate(name_parts):
-                            if part in title_keywords:
-                                name_end_idx = i
-                                break
-
-                        if name_end_idx >= 2:
-                            name = ' '.join(name_parts[:name_end_idx])
-                            photo_map[name] = record['photo_url']
+            if record.get('title') and record.get('photo_url'):
+                # Title is usually "Name Title" or "Name | EEMB"
+                name = name_before_title(record['title'])
+                if name:
+                    photos.add(name, record['photo_url'])
 
     except Exception as e:
         print(f"Error loading scraped photos: {e}")
 
-    return photo_map
+    return photos
 
 def update_faculty_photos():
     """Update the database with faculty photo URLs"""
@@ -95,24 +82,31 @@ def update_faculty_photos():
     cursor.execute("SELECT id, full_name FROM faculties")
     faculty_records = cursor.fetchall()
 
+    # Names match whatever their accents, initials or punctuation (Débora / Debora)
+    local_photos = NameIndex(FACULTY_PHOTOS)
+    faculty_ids = NameIndex((full_name, faculty_id) for faculty_id, full_name in faculty_records)
+
     updated_count = 0
 
     for faculty_id, full_name in faculty_records:
         photo_url = None
 
         # First check if we have a local image file
-        if full_name in FACULTY_PHOTOS:
-            local_file = f"/Users/adrianstiermbp2023/eemb-website-redesign-2025-2026/scraping/assets/images/{FACULTY_PHOTOS[full_name]}"
+        photo_file = local_photos.lookup(full_name)
+        if photo_file:
+            local_file = os.path.join(
+                '/Users/adrianstiermbp2023/eemb-website-redesign-2025-2026/scraping/assets/images', photo_file)
             if os.path.exists(local_file):
                 # Copy to backend public folder
-                dest_file = f"{backend_public}/{FACULTY_PHOTOS[full_name]}"
+                dest_file = f"{backend_public}/{photo_file}"
                 shutil.copy2(local_file, dest_file)
-                photo_url = f"/uploads/faculty/{FACULTY_PHOTOS[full_name]}"
+                photo_url = f"/uploads/faculty/{photo_file}"
                 print(f"  📷 Added local photo for {full_name}")
 
         # If no local photo, check scraped URLs
-        if not photo_url and full_name in scraped_photos:
-            photo_url = scraped_photos[full_name]
+        scraped_url = scraped_photos.lookup(full_name)
+        if not photo_url and scraped_url:
+            photo_url = scraped_url
             print(f"  🌐 Using scraped URL for {full_name}")
 
         # Update database if we have a photo
@@ -153,12 +147,9 @@ def update_faculty_photos():
         src_path = os.path.join(images_dir, img_file)
         if os.path.exists(src_path):
             # Check if this faculty exists
-            cursor.execute("SELECT id FROM faculties WHERE full_name = ?", (faculty_name,))
-            result = cursor.fetchone()
-
-            if result:
-                faculty_id = result[0]
+            faculty_id = faculty_ids.lookup(faculty_name)
 
+            if faculty_id:
                 # Copy image to backend
                 dest_file = f"{backend_public}/{img_file}"
                 shutil.copy2(src_path, dest_file)
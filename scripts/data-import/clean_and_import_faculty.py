@@ -2,8 +2,15 @@
 """
 Clean and Import Faculty Data from Scraped JSON to Strapi
 This script processes the scraped faculty data and imports clean records into Strapi
+
+By default the import is a bulk upsert (strapi_bulk.py): existing slugs
+come from one paginated query, new faculty are created and changed ones
+updated with concurrent, pooled, retrying requests. --serial keeps the
+original one GET + POST per person.
 """
 
+import argparse
+import os
 import requests
 import json
 import sys
@@ -11,27 +18,34 @@ import time
 import re
 from pathlib import Path
 
+from strapi_bulk import StrapiBulkClient
+
+# Share the scraping pipeline's streaming JSON reader (scraping/scripts/)
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', '..', 'scraping', 'scripts'))
+from json_stream import iter_records  # noqa: E402
+
 class FacultyProcessor:
-    def __init__(self, json_path, api_url):
+    def __init__(self, json_path, api_url, api_token=None, workers=8, batch_size=50):
         self.json_path = json_path
         self.api_url = api_url.rstrip('/')
         self.headers = {'Content-Type': 'application/json'}
+        if api_token:
+            self.headers['Authorization'] = f'Bearer {api_token}'
+        self.client = StrapiBulkClient(self.api_url, api_token, workers=workers, batch_size=batch_size)
         self.success_count = 0
         self.error_count = 0
         self.errors = []
 
     def load_faculty_data(self):
-        """Load faculty data from JSON"""
+        """Scraped records from the JSON array or JSONL file, read one at a time"""
         print(f"📂 Loading faculty data from {self.json_path}")
-        try:
-            with open(self.json_path, 'r') as f:
-                data = json.load(f)
-            print(f"✅ Loaded {len(data)} records")
-            return data
-        except FileNotFoundError:
+        if not os.path.exists(self.json_path):
             print(f"❌ File not found: {self.json_path}")
             sys.exit(1)
-        except Exception as e:
+        try:
+            for record in iter_records(self.json_path):
+                yield record
+        except ValueError as e:
             print(f"❌ Error loading JSON: {e}")
             sys.exit(1)
 
@@ -207,20 +221,42 @@ class FacultyProcessor:
             self.error_count += 1
             return False
 
-    def import_all(self):
-        """Process and import all faculty members"""
-        # Load data
-        raw_data = self.load_faculty_data()
+    def bulk_import(self, faculty_list, update=True, dry_run=False):
+        """Create new and update changed faculty with batched concurrent requests"""
+        names = {faculty['slug']: faculty['fullName'] for faculty in faculty_list}
 
-        # Extract faculty records
+        def on_result(slug, ok, error):
+            if ok:
+                self.success_count += 1
+            else:
+                print(f"  ❌ Failed: {names[slug]} - {error}")
+                self.errors.append((names[slug], error))
+                self.error_count += 1
+
+        start = time.time()
+        summary = self.client.upsert('faculties', faculty_list, update=update, dry_run=dry_run, on_result=on_result)
+        elapsed = time.time() - start
+
+        print(f"  {summary['existing']} already in Strapi: {summary['create']} to create, "
+              f"{summary['update']} to update, {summary['unchanged']} unchanged")
+        if not dry_run:
+            print(f"  Done in {elapsed:.1f}s ({self.client.stats['requests']} requests, "
+                  f"{self.client.stats['retries']} retries)")
+        return summary
+
+    def import_all(self, serial=False, update=True, dry_run=False):
+        """Process and import all faculty members"""
+        # Extract faculty records as they are read; only the cleaned ones are kept
         print("\n🔍 Processing faculty records...")
         faculty_list = []
-        for record in raw_data:
+        record_count = 0
+        for record in self.load_faculty_data():
+            record_count += 1
             faculty_info = self.extract_faculty_info(record)
             if faculty_info:
                 faculty_list.append(faculty_info)
 
-        print(f"✅ Extracted {len(faculty_list)} faculty members from {len(raw_data)} records")
+        print(f"✅ Extracted {len(faculty_list)} faculty members from {record_count} records")
 
         # Test API connection
         print("\n🔌 Testing Strapi API connection...")
@@ -237,11 +273,19 @@ class FacultyProcessor:
 
         print("\n📥 Importing faculty members to Strapi...")
 
-        # Import each faculty member
-        for i, faculty in enumerate(faculty_list, 1):
-            print(f"\n[{i}/{len(faculty_list)}] Processing {faculty['fullName']}")
-            self.create_faculty(faculty)
-            time.sleep(0.3)  # Rate limiting
+        if serial:
+            # Import each faculty member
+            for i, faculty in enumerate(faculty_list, 1):
+                print(f"\n[{i}/{len(faculty_list)}] Processing {faculty['fullName']}")
+                if dry_run:
+                    continue
+                self.create_faculty(faculty)
+                time.sleep(0.3)  # Rate limiting
+        else:
+            self.bulk_import(faculty_list, update=update, dry_run=dry_run)
+        if dry_run:
+            print("\n🔍 Dry run: nothing was sent to Strapi")
+            return
 
         # Print summary
         print("\n" + "="*50)
@@ -267,8 +311,18 @@ class FacultyProcessor:
         print(f"\n📝 Processed faculty data saved to {output_file}")
 
 def main():
-    json_path = '../../scraping/data/faculty-scraped.json'
-    api_url = 'http://localhost:1337'
+    parser = argparse.ArgumentParser(description='Clean scraped faculty data and import it into Strapi')
+    parser.add_argument('--json', default='../../scraping/data/faculty-scraped.json', help='Scraped faculty JSON')
+    parser.add_argument('--api-url', default='http://localhost:1337', help='Strapi base URL')
+    parser.add_argument('--token', help='Strapi API token')
+    parser.add_argument('--serial', action='store_true',
+                        help='One existence check and POST per person, as before (no updates)')
+    parser.add_argument('--skip-existing', action='store_true', help='Only create, never update (bulk mode)')
+    parser.add_argument('--dry-run', action='store_true', help='Print what would change without sending it')
+    parser.add_argument('--workers', type=int, default=8, help='Requests in flight (bulk mode)')
+    parser.add_argument('--batch-size', type=int, default=50, help='Requests per batch (bulk mode)')
+    args = parser.parse_args()
+    json_path = args.json
 
     # Check if JSON exists
     if not Path(json_path).exists():
@@ -277,10 +331,11 @@ def main():
         sys.exit(1)
 
     # Create processor
-    processor = FacultyProcessor(json_path, api_url)
+    processor = FacultyProcessor(json_path, args.api_url, args.token, workers=args.workers,
+                                 batch_size=args.batch_size)
 
     # Run import
-    processor.import_all()
+    processor.import_all(serial=args.serial, update=not args.skip_existing, dry_run=args.dry_run)
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
@@ -1,73 +1,65 @@
 #!/usr/bin/env python3
 """
 Direct insert faculty data into Strapi database
+
+Faculty already in the table (same slug) are updated in place when
+their processed data changed; everyone else in the table is left alone.
+All writes happen in one transaction (sqlite_upsert.py).
 """
 
-import sqlite3
+import argparse
 import json
-from datetime import datetime
-from pathlib import Path
 
-def insert_faculty_data():
+from sqlite_upsert import DEFAULT_DB_PATH, sync_table
+
+def faculty_row(faculty):
+    """faculties table row for one processed_faculty.json entry"""
+    return {
+        'first_name': faculty['firstName'],
+        # Use firstName if lastName is empty
+        'last_name': faculty['lastName'] if faculty['lastName'] else faculty['firstName'],
+        'full_name': faculty['fullName'],
+        'slug': faculty['slug'],
+        'title': faculty['title'],
+        'email': faculty['email'],
+        'phone': faculty['phone'],
+        'office': faculty['office'],
+        'bio': faculty['bio'],
+        'short_bio': faculty['shortBio'],
+        'research_interests': faculty['researchInterests'] or [],
+        'active': bool(faculty['active']),
+        'department': faculty['department'],
+    }
+
+def insert_faculty_data(json_path='processed_faculty.json', db_path=DEFAULT_DB_PATH, dry_run=False):
     # Load processed faculty data
-    with open('processed_faculty.json', 'r') as f:
+    with open(json_path, 'r') as f:
         faculty_list = json.load(f)
 
-    # Connect to database
-    db_path = '/Users/adrianstiermbp2023/eemb-website-redesign-2025-2026/backend/.tmp/data.db'
-    conn = sqlite3.connect(db_path)
-    cursor = conn.cursor()
-
     print(f"📥 Inserting {len(faculty_list)} faculty members directly into database...")
 
-    success_count = 0
+    # The first entry of a slug wins, as when the table's unique index rejected the rest
+    rows = {}
     for faculty in faculty_list:
-        try:
-            # Prepare the data
-            now = datetime.now().isoformat()
+        if faculty['slug'] in rows:
+            print(f"  ⏭️  Skipping {faculty['fullName']} - duplicate slug {faculty['slug']}")
+            continue
+        rows[faculty['slug']] = faculty_row(faculty)
 
-            # Insert into faculties table
-            cursor.execute("""
-                INSERT INTO faculties (
-                    first_name, last_name, full_name, slug, title,
-                    email, phone, office, bio, short_bio,
-                    research_interests, active, department,
-                    created_at, updated_at, published_at
-                ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-            """, (
-                faculty['firstName'],
-                faculty['lastName'] if faculty['lastName'] else faculty['firstName'],  # Use firstName if lastName is empty
-                faculty['fullName'],
-                faculty['slug'],
-                faculty['title'],
-                faculty['email'],
-                faculty['phone'],
-                faculty['office'],
-                faculty['bio'],
-                faculty['shortBio'],
-                json.dumps(faculty['researchInterests']) if faculty['researchInterests'] else '[]',
-                1 if faculty['active'] else 0,
-                faculty['department'],
-                now, now, now
-            ))
+    changes = sync_table(db_path, 'faculties', list(rows.values()), delete_missing=False, dry_run=dry_run)
+    if dry_run:
+        return
 
-            success_count += 1
-            print(f"  ✅ Inserted: {faculty['fullName']}")
-
-        except sqlite3.IntegrityError as e:
-            if 'UNIQUE constraint failed' in str(e):
-                print(f"  ⏭️  Skipping {faculty['fullName']} - already exists")
-            else:
-                print(f"  ❌ Failed: {faculty['fullName']} - {e}")
-        except Exception as e:
-            print(f"  ❌ Error: {faculty['fullName']} - {e}")
-
-    # Commit changes
-    conn.commit()
-    conn.close()
-
-    print(f"\n✅ Successfully inserted {success_count} faculty members!")
+    print(f"\n✅ Successfully inserted {len(changes.inserts)} and updated {len(changes.updates)} faculty members!")
     print(f"🌐 Faculty data is now available at: http://localhost:1337/api/faculties")
 
+def main():
+    parser = argparse.ArgumentParser(description='Insert processed faculty into the Strapi SQLite database')
+    parser.add_argument('--json', default='processed_faculty.json', help='Output of clean_and_import_faculty.py')
+    parser.add_argument('--db', default=DEFAULT_DB_PATH, help='Strapi SQLite database')
+    parser.add_argument('--dry-run', action='store_true', help='Print the change report without applying it')
+    args = parser.parse_args()
+    insert_faculty_data(args.json, args.db, args.dry_run)
+
 if __name__ == "__main__":
-    insert_faculty_data()
\ No newline at end of file
+    main()
@@ -13,6 +13,8 @@ from pathlib import Path
 import argparse
 import time
 
+from name_matching import slugify
+
 class FacultyImporter:
     def __init__(self, csv_path, api_url, api_token=None):
         self.csv_path = csv_path
@@ -45,10 +47,7 @@ class FacultyImporter:
 
     def create_slug(self, first_name, last_name):
         """Create URL-friendly slug from name"""
-        name = f"{first_name} {last_name}".lower()
-        # Replace spaces and special characters
-        slug = name.replace(' ', '-').replace('.', '').replace("'", '')
-        return slug
+        return slugify(f"{first_name} {last_name}")
 
     def prepare_faculty_data(self, row):
         """Prepare faculty data for Strapi API"""
@@ -0,0 +1,252 @@
+#!/usr/bin/env python3
+"""
+Name Matching for Faculty Records
+One way to compare, key and look up people's names across the photo and import scripts.
+
+The database, the old site's directory and the scraped profiles write the
+same person differently: accents (Débora / Debora), punctuation
+(D'Antonio / DAntonio), hyphens, middle initials (Susan J. Mazer),
+titles (Dr., Professor), "Last, First" order and short first names
+(Doug / Douglas). name_tokens() folds all of that away, so two spellings
+of a name give the same name_key(); slugify() builds URL slugs from the
+same folding.
+
+NameIndex looks names up in two steps:
+    - exact: the folded key in a dict, O(1)
+    - fuzzy: only entries sharing the surname are scored (the block),
+      never the whole directory; if none fits, the block widens to
+      surnames one typo away (Rodriquez / Rodriguez), found through an
+      index of every token with one letter deleted. A candidate's score is
+      the share of token weight the two names have in common, rare tokens
+      weighing more than common ones. Two full names whose first names
+      appear nowhere in the other are different people. The best
+      candidate wins if it scores at least MIN_SCORE and is clearly ahead
+      of the runner-up.
+
+Used by scrape_faculty_photos.py, scrape_faculty_photos_v2.py,
+add_faculty_photos.py and the faculty import scripts.
+"""
+
+import math
+import re
+import unicodedata
+from collections import defaultdict, namedtuple
+
+# Words that are part of a heading or title, not of a name
+TITLE_WORDS = {
+    'dr', 'prof', 'professor', 'associate', 'assistant', 'adjunct', 'distinguished', 'emeritus', 'emerita',
+    'lecturer', 'senior', 'teaching', 'research', 'phd', 'jr', 'sr', 'ii', 'iii',
+}
+
+# Shortest token that counts as the start of a longer one (Doug / Douglas)
+MIN_PREFIX_LENGTH = 3
+
+# Shortest token whose typos are matched; shorter ones are too alike
+MIN_TYPO_LENGTH = 5
+
+# Lowest score a fuzzy match may have
+MIN_SCORE = 0.6
+
+# A fuzzy match must beat the runner-up (with another value) by this much
+MIN_MARGIN = 0.1
+
+# Credit for a first name that is the start of the other (Doug / Douglas)
+PREFIX_CREDIT = 0.8
+
+# Credit for a token one typo away from the other (Rodriquez / Rodriguez)
+TYPO_CREDIT = 0.8
+
+Match = namedtuple('Match', ['name', 'value', 'score'])
+
+
+def fold(text):
+    """Lowercase text without accents or apostrophes"""
+    text = unicodedata.normalize('NFKD', text)
+    text = ''.join(c for c in text if not unicodedata.combining(c))
+    return re.sub(r"['’`.]", '', text.casefold())
+
+
+def name_tokens(name):
+    """Folded words of a name, in first-last order, without titles or middle initials"""
+    if ',' in name:
+        last, _, first = name.partition(',')
+        name = f"{first} {last}"
+    tokens = [t for t in re.findall(r'[a-z0-9]+', fold(name)) if t not in TITLE_WORDS]
+    # Drop initials, unless the name is nothing but initials
+    return [t for t in tokens if len(t) > 1] or tokens
+
+
+def name_key(name):
+    """Exact-match key: names that differ only in accents, punctuation, titles or initials share it"""
+    return ' '.join(name_tokens(name))
+
+
+def slugify(name):
+    """URL slug of a name (Jesús Martínez-Gómez -> jesus-martinez-gomez, Susan J. Mazer -> susan-j-mazer)"""
+    return '-'.join(re.findall(r'[a-z0-9]+', fold(name)))
+
+
+def name_before_title(text):
+    """The name at the start of a heading such as "Cherie Briggs Professor" or "Cherie Briggs | EEMB"
+
+    Returns None when fewer than two words come before the title.
+    """
+    words = re.split(r'[|\n]', text, maxsplit=1)[0].split()
+    for i, word in enumerate(words):
+        if fold(word) in TITLE_WORDS:
+            words = words[:i]
+            break
+    return ' '.join(words) if len(words) >= 2 else None
+
+
+def one_edit_apart(a, b):
+    """Whether b is a with one letter changed, added or dropped, or two neighbouring letters swapped"""
+    if len(a) > len(b):
+        a, b = b, a
+    if len(b) - len(a) > 1:
+        return False
+    i = 0
+    while i < len(a) and a[i] == b[i]:
+        i += 1
+    if len(a) < len(b):
+        return a[i:] == b[i + 1:]
+    return a[i + 1:] == b[i + 1:] or (a[i:i + 2] == b[i + 1:i + 2] + b[i:i + 1] and a[i + 2:] == b[i + 2:])
+
+
+def deletions(token):
+    """The token with each one of its letters left out"""
+    return {token[:i] + token[i + 1:] for i in range(len(token))}
+
+
+def token_similarity(a, b, prefixes=True):
+    """1 for the same token, PREFIX_CREDIT if one starts the other, TYPO_CREDIT if one typo apart, else 0"""
+    if a == b:
+        return 1.0
+    if prefixes and min(len(a), len(b)) >= MIN_PREFIX_LENGTH and (a.startswith(b) or b.startswith(a)):
+        return PREFIX_CREDIT
+    if min(len(a), len(b)) >= MIN_TYPO_LENGTH and one_edit_apart(a, b):
+        return TYPO_CREDIT
+    return 0.0
+
+
+class NameIndex:
+    """Names mapped to values (URLs, photo paths, row ids), looked up by spelling-insensitive name
+
+    Built from (name, value) pairs or a dict. As with a dict, a later
+    entry with the same key replaces an earlier one.
+    """
+
+    def __init__(self, entries=(), min_score=MIN_SCORE):
+        self.min_score = min_score
+        self.names = []
+        self.values = []
+        self.tokens = []
+        self.exact = {}                    # name key -> entry
+        self.postings = defaultdict(set)   # token -> entries
+        self.typos = defaultdict(set)      # token or token minus a letter -> tokens
+        if isinstance(entries, dict):
+            entries = entries.items()
+        for name, value in entries:
+            self.add(name, value)
+
+    def __len__(self):
+        return len(self.exact)
+
+    def add(self, name, value):
+        tokens = name_tokens(name)
+        if not tokens:
+            return
+        entry = len(self.names)
+        self.names.append(name)
+        self.values.append(value)
+        self.tokens.append(tokens)
+        previous = self.exact.get(' '.join(tokens))
+        if previous is not None:
+            self.unindex(previous)
+        self.exact[' '.join(tokens)] = entry
+        for token in set(tokens):
+            self.postings[token].add(entry)
+            if len(token) >= MIN_TYPO_LENGTH:
+                for variant in deletions(token) | {token}:
+                    self.typos[variant].add(token)
+
+    def unindex(self, entry):
+        for token in set(self.tokens[entry]):
+            self.postings[token].discard(entry)
+
+    def weight(self, token):
+        """Rarer tokens say more about who a name belongs to"""
+        return math.log(1 + len(self.exact) / (1 + len(self.postings.get(token, ()))))
+
+    def score(self, query, candidate):
+        """Share of the two names' token weight that they have in common (0 to 1)"""
+        matched = query_weight = 0.0
+        for token in query:
+            similarity, other = max((token_similarity(token, other), other) for other in candidate)
+            # A short or misspelt token weighs what the token it stands for weighs
+            weight = self.weight(other if similarity else token)
+            matched += similarity * weight
+            query_weight += weight
+        total = query_weight + sum(self.weight(t) for t in candidate)
+        return 2 * matched / total if total else 0.0
+
+    def candidates(self, surname, widen=False):
+        """Entries with the surname among their tokens, or (widen) a token one typo away from it"""
+        if not widen:
+            return self.postings.get(surname, set())
+        if len(surname) < MIN_TYPO_LENGTH:
+            return set()
+        # Tokens one typo apart share the token itself or one of its deletions
+        near = set()
+        for variant in deletions(surname) | {surname}:
+            near.update(self.typos.get(variant, ()))
+        entries = set()
+        for token in near:
+            if token != surname and one_edit_apart(token, surname):
+                entries.update(self.postings.get(token, ()))
+        return entries
+
+    def best(self, tokens, entries):
+        """(score, entry) of each entry that could be the same person, best first"""
+        surname = tokens[-1]
+        scored = []
+        for entry in entries:
+            candidate = self.tokens[entry]
+            # Different first names (Ana Bernal / Elena Bernal) are different people
+            if len(tokens) > 1 and len(candidate) > 1 and tokens[0] not in candidate and candidate[0] not in tokens \
+                    and not token_similarity(tokens[0], candidate[0]):
+                continue
+            # The surname has to be there, give or take a typo; a shared first name alone is not a match
+            if not any(token_similarity(surname, other, prefixes=False) for other in candidate):
+                continue
+            scored.append((self.score(tokens, candidate), entry))
+        scored.sort(reverse=True)
+        return scored
+
+    def match(self, name):
+        """Best Match for a name, or None if nothing scores high enough or two people tie"""
+        tokens = name_tokens(name)
+        if not tokens:
+            return None
+        entry = self.exact.get(' '.join(tokens))
+        if entry is not None:
+            return Match(self.names[entry], self.values[entry], 1.0)
+
+        scored = self.best(tokens, self.candidates(tokens[-1]))
+        if not scored or scored[0][0] < self.min_score:
+            # Surname spelt differently: widen the block
+            scored = self.best(tokens, self.candidates(tokens[-1], widen=True))
+        if not scored or scored[0][0] < self.min_score:
+            return None
+        best_score, best = scored[0]
+        for score, entry in scored[1:]:
+            if best_score - score >= MIN_MARGIN:
+                break
+            if self.values[entry] != self.values[best]:
+                return None  # Ambiguous: two people fit about as well
+        return Match(self.names[best], self.values[best], best_score)
+
+    def lookup(self, name, default=None):
+        """Value for a name, exact or fuzzy, or default"""
+        found = self.match(name)
+        return found.value if found else default
@@ -12,29 +12,23 @@ from pathlib import Path
 from datetime import datetime
 from urllib.parse import urljoin
 
+from name_matching import slugify
+
 # Base URL for faculty pages
 BASE_URL = "https://www.eemb.ucsb.edu/people/faculty/"
 
+# Profiles whose URL is not the slug of the full name
+SPECIAL_CASES = {
+    'debora-iglesias-rodriguez': 'iglesias-rodriguez',
+    'jesus-martinez-gomez': 'martinez-gomez',
+    'susan-j-mazer': 'mazer',
+    'samuel-sweet': 'sweet',
+}
+
 def create_slug(name):
     """Create URL slug from faculty name"""
-    # Handle special characters
-    slug = name.lower()
-    slug = slug.replace('á', 'a').replace('é', 'e').replace('í', 'i')
-    slug = slug.replace('ó', 'o').replace('ú', 'u').replace('ü', 'u')
-    slug = slug.replace(' ', '-').replace('.', '').replace("'", '')
-
-    # Special cases
-    special_cases = {
-        'débora-iglesias-rodriguez': 'iglesias-rodriguez',
-        'jesús-martínez-gómez': 'martinez-gomez',
-        'susan-j-mazer': 'mazer',
-        'samuel-sweet': 'sweet',
-    }
-
-    if slug in special_cases:
-        return special_cases[slug]
-
-    return slug
+    slug = slugify(name)
+    return SPECIAL_CASES.get(slug, slug)
 
 def download_faculty_photo(faculty_name, slug):
     """Download photo from faculty profile page"""
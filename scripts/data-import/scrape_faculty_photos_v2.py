@@ -2,31 +2,80 @@
 """
 Scrape individual faculty profile pages to get their photos
 Version 2: Extract actual URLs from faculty directory page
+
+Faculty go through a pipeline of stages (stage_pipeline.py) instead of
+one at a time:
+    fetch  - profile pages, a small thread pool on one keep-alive session,
+             throttled per host (instead of sleeping a second per person)
+    parse  - finds the photo on each page
+    image  - streams each photo to disk through a temporary file
+    db     - the only thread touching the database; commits the photo
+             UPDATEs in batches
+Queues between the stages are bounded, so a slow stage holds the ones
+before it back. A timing table at the end shows where the time went.
+--serial runs the stages one person at a time with the old one-second
+pause and a commit per person.
 """
 
+import argparse
 import requests
-from bs4 import BeautifulSoup
 import sqlite3
 import os
+import sys
+import tempfile
+import threading
 import time
-from pathlib import Path
+from collections import Counter
 from datetime import datetime
 from urllib.parse import urljoin
 
+from requests.adapters import HTTPAdapter
+
+from name_matching import NameIndex
+from sqlite_upsert import DEFAULT_DB_PATH
+from stage_pipeline import Pipeline, Stage
+
+# Share the scraping pipeline's HTTP session, throttle and HTML parser (scraping/scripts/)
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', '..', 'scraping', 'scripts'))
+from http_cache import create_session  # noqa: E402
+from parsing import parse_html  # noqa: E402
+from throttle import HostThrottle  # noqa: E402
+
 # Base URL
 BASE_URL = "https://www.eemb.ucsb.edu"
 FACULTY_DIR_URL = "https://www.eemb.ucsb.edu/people/faculty"
 
-def get_faculty_urls():
+# Saved photos are served by Strapi from /uploads/faculty/
+PHOTO_DIR = '/Users/adrianstiermbp2023/eemb-website-redesign-2025-2026/backend/public/uploads/faculty'
+
+# Photo UPDATEs per commit
+DEFAULT_BATCH_SIZE = 20
+
+# Bytes read from an image response at a time
+CHUNK_SIZE = 64 * 1024
+
+# Selectors tried in order for the profile photo
+PHOTO_SELECTORS = [
+    'img.field-content',
+    'img[typeof="foaf:Image"]',
+    '.field-name-field-person-photo img',
+    '.person-photo img',
+    'article img',
+    '.node-person img',
+    '.view-people img',
+    '.views-field-field-person-photo img'
+]
+
+def get_faculty_urls(session, directory_url=FACULTY_DIR_URL):
     """Get actual faculty profile URLs from the directory page"""
 
     print("🔍 Fetching faculty directory to get profile URLs...")
 
     try:
-        response = requests.get(FACULTY_DIR_URL, timeout=10)
+        response = session.get(directory_url, timeout=10)
         response.raise_for_status()
 
-        soup = BeautifulSoup(response.content, 'html.parser')
+        soup = parse_html(response.content)
 
         faculty_urls = {}
 
@@ -38,10 +87,7 @@ def get_faculty_urls():
             href = link.get('href')
             if href and '/people/faculty/' in href:
                 # Get full URL
-                full_url = urljoin(BASE_URL, href)
-
-                # Extract name from link text or nearby text
-                name_elem = link.find_parent('div') or link
+                full_url = urljoin(directory_url, href)
 
                 # Try to get the faculty name
                 # Look for name in various places
@@ -77,217 +123,265 @@ def get_faculty_urls():
         print(f"  ❌ Error fetching faculty directory: {e}")
         return {}
 
-def download_faculty_photo(faculty_name, url):
-    """Download photo from faculty profile page"""
+def find_photo_url(html, page_url):
+    """Absolute URL of the faculty photo on a profile page, or (None, reason)"""
 
-    print(f"  🔍 Checking {faculty_name} at {url}")
+    soup = parse_html(html)
 
-    try:
-        # Fetch the page
-        response = requests.get(url, timeout=10)
+    # Look for faculty photo - try multiple selectors
+    photo_url = None
 
-        if response.status_code == 404:
-            print(f"    ⚠️  Page not found (404)")
-            return None
+    for selector in PHOTO_SELECTORS:
+        img = soup.select_one(selector)
+        if img and img.get('src'):
+            photo_url = img.get('src')
+            break
 
-        response.raise_for_status()
+    # If no photo found with selectors, try finding first reasonable image
+    if not photo_url:
+        # Look for images in the main content area
+        content_areas = soup.find_all(['article', 'div'], class_=lambda x: x and ('content' in x or 'person' in x))
 
-        # Parse HTML
-        soup = BeautifulSoup(response.content, 'html.parser')
-
-        # Look for faculty photo - try multiple selectors
-        photo_url = None
-
-        # Try different common image selectors
-        selectors = [
-            'img.field-content',
-            'img[typeof="foaf:Image"]',
-            '.field-name-field-person-photo img',
-            '.person-photo img',
-            'article img',
-            '.node-person img',
-            '.view-people img',
-            '.views-field-field-person-photo img'
-        ]
-
-        for selector in selectors:
-            img = soup.select_one(selector)
-            if img and img.get('src'):
-                photo_url = img.get('src')
-                break
-
-        # If no photo found with selectors, try finding first reasonable image
-        if not photo_url:
-            # Look for images in the main content area
-            content_areas = soup.find_all(['article', 'div'], class_=lambda x: x and ('content' in x or 'person' in x))
-
-            for area in content_areas:
-                imgs = area.find_all('img')
-                for img in imgs:
-                    src = img.get('src', '')
-                    # Skip icons and small images
-                    if src and 'icon' not in src.lower() and 'logo' not in src.lower():
-                        photo_url = src
-                        break
-                if photo_url:
+        for area in content_areas:
+            imgs = area.find_all('img')
+            for img in imgs:
+                src = img.get('src', '')
+                # Skip icons and small images
+                if src and 'icon' not in src.lower() and 'logo' not in src.lower():
+                    photo_url = src
                     break
+            if photo_url:
+                break
 
-        if not photo_url:
-            print(f"    ⚠️  No photo found on page")
-            return None
-
-        # Make URL absolute
-        photo_url = urljoin(url, photo_url)
-
-        # Skip placeholder/generic images (but not /sites/default/files which is actual content)
-        if 'placeholder' in photo_url.lower() or 'avatar' in photo_url.lower():
-            print(f"    ⚠️  Skipping placeholder image")
-            return None
-
-        # Skip if it's the generic faculty portrait default
-        if 'faculty-portrait-default' in photo_url.lower() or 'generic' in photo_url.lower():
-            print(f"    ⚠️  Skipping default faculty portrait")
-            return None
-
-        print(f"    ✅ Found photo: {photo_url}")
-
-        # Download the image
-        img_response = requests.get(photo_url, timeout=10)
-        img_response.raise_for_status()
-
-        # Get file extension
-        ext = '.jpg'
-        if '.' in photo_url:
-            url_parts = photo_url.split('.')
-            ext_part = url_parts[-1].split('?')[0]
-            if ext_part in ['jpg', 'jpeg', 'png', 'gif', 'webp']:
-                ext = '.' + ext_part
-
-        # Save to backend public folder
-        backend_dir = '/Users/adrianstiermbp2023/eemb-website-redesign-2025-2026/backend/public/uploads/faculty'
-        os.makedirs(backend_dir, exist_ok=True)
-
+    if not photo_url:
+        return None, "No photo found on page"
+
+    # Make URL absolute
+    photo_url = urljoin(page_url, photo_url)
+
+    # Skip placeholder/generic images (but not /sites/default/files which is actual content)
+    if 'placeholder' in photo_url.lower() or 'avatar' in photo_url.lower():
+        return None, "Skipping placeholder image"
+
+    # Skip if it's the generic faculty portrait default
+    if 'faculty-portrait-default' in photo_url.lower() or 'generic' in photo_url.lower():
+        return None, "Skipping default faculty portrait"
+
+    return photo_url, None
+
+def photo_extension(photo_url):
+    """File extension for a photo URL, .jpg unless the URL says otherwise"""
+    ext = '.jpg'
+    if '.' in photo_url:
+        url_parts = photo_url.split('.')
+        ext_part = url_parts[-1].split('?')[0]
+        if ext_part in ['jpg', 'jpeg', 'png', 'gif', 'webp']:
+            ext = '.' + ext_part
+    return ext
+
+class PhotoUpdateWriter:
+    """The one owner of the database connection: collects photo UPDATEs and commits them in batches"""
+
+    def __init__(self, db_path, batch_size=DEFAULT_BATCH_SIZE):
+        # Opened here, used by the db stage's thread, closed here after it has stopped
+        self.conn = sqlite3.connect(db_path, check_same_thread=False)
+        self.batch_size = batch_size
+        self.pending = []
+        self.written = 0
+        self.commits = 0
+
+    def add(self, update):
+        faculty_id, photo_url = update
+        self.pending.append((photo_url, datetime.now().isoformat(), faculty_id))
+        if len(self.pending) >= self.batch_size:
+            self.flush()
+
+    def flush(self):
+        if not self.pending:
+            return
+        with self.conn:
+            self.conn.executemany("""
+                UPDATE faculties
+                SET photo_url = ?, updated_at = ?
+                WHERE id = ?
+            """, self.pending)
+        self.written += len(self.pending)
+        self.commits += 1
+        self.pending = []
+
+    def close(self):
+        self.flush()
+        self.conn.close()
+
+class PhotoHarvester:
+    """Stage functions of the photo pipeline: fetch a profile, find its photo, save the photo"""
+
+    def __init__(self, photo_dir=PHOTO_DIR, workers=4, per_host=4, rps=4):
+        self.photo_dir = photo_dir
+        os.makedirs(photo_dir, exist_ok=True)
+        self.session = create_session('EEMB-Scraper/1.0 (Content preservation for website redesign)')
+        # Keep-alive connections for every fetch and image worker
+        adapter = HTTPAdapter(pool_connections=workers, pool_maxsize=workers)
+        self.session.mount('http://', adapter)
+        self.session.mount('https://', adapter)
+        self.throttle = HostThrottle(per_host=per_host, rps=rps)
+        self.failures = Counter()
+        self.lock = threading.Lock()
+
+    def fail(self, full_name, reason):
+        with self.lock:
+            self.failures[reason] += 1
+        print(f"  ⚠️  {full_name} - {reason}")
+
+    def fetch(self, job):
+        """(faculty_id, full_name, profile URL) -> (faculty_id, full_name, profile URL, HTML)"""
+        faculty_id, full_name, url = job
+        try:
+            with self.throttle.slot(url):
+                response = self.session.get(url, timeout=10)
+            if response.status_code == 404:
+                self.fail(full_name, "Page not found (404)")
+                return
+            response.raise_for_status()
+        except requests.exceptions.RequestException as e:
+            self.fail(full_name, f"Error: {e}")
+            return
+        yield faculty_id, full_name, url, response.content
+
+    def parse(self, page):
+        """(faculty_id, full_name, profile URL, HTML) -> (faculty_id, full_name, photo URL)"""
+        faculty_id, full_name, url, html = page
+        photo_url, reason = find_photo_url(html, url)
+        if photo_url is None:
+            self.fail(full_name, reason)
+            return
+        yield faculty_id, full_name, photo_url
+
+    def download(self, photo):
+        """(faculty_id, full_name, photo URL) -> (faculty_id, /uploads path), the file streamed to disk"""
+        faculty_id, full_name, photo_url = photo
         # Create safe filename from faculty name
-        safe_name = faculty_name.lower().replace(' ', '-').replace('.', '').replace("'", '')
-        filename = f"{safe_name}{ext}"
-        filepath = os.path.join(backend_dir, filename)
-
-        with open(filepath, 'wb') as f:
-            f.write(img_response.content)
-
-        print(f"    💾 Saved as {filename}")
-
-        return f"/uploads/faculty/{filename}"
-
-    except requests.exceptions.RequestException as e:
-        print(f"    ❌ Error: {e}")
-        return None
-    except Exception as e:
-        print(f"    ❌ Unexpected error: {e}")
-        return None
-
-def fuzzy_match_name(db_name, url_names):
-    """Try to match database name with URL names"""
-
-    # Exact match
-    if db_name in url_names:
-        return url_names[db_name]
-
-    # Try last name only
-    last_name = db_name.split()[-1]
-    for url_name, url in url_names.items():
-        if last_name in url_name or url_name in last_name:
-            return url
+        safe_name = full_name.lower().replace(' ', '-').replace('.', '').replace("'", '')
+        filename = f"{safe_name}{photo_extension(photo_url)}"
+        try:
+            with self.throttle.slot(photo_url):
+                response = self.session.get(photo_url, timeout=10, stream=True)
+            with response:
+                response.raise_for_status()
+                self.save_stream(response, os.path.join(self.photo_dir, filename))
+        except (requests.exceptions.RequestException, OSError) as e:
+            self.fail(full_name, f"Error downloading {photo_url}: {e}")
+            return
+        print(f"  ✅ {full_name} - saved {filename}")
+        yield faculty_id, f"/uploads/faculty/{filename}"
+
+    def save_stream(self, response, path):
+        """Write a streamed body through a temporary file, so a failed download leaves no partial photo"""
+        fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path), prefix='.download-', suffix='.part')
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                for chunk in response.iter_content(chunk_size=CHUNK_SIZE):
+                    f.write(chunk)
+            os.replace(tmp_path, path)
+        except BaseException:
+            os.remove(tmp_path)
+            raise
+
+def pending_jobs(faculty, directory, harvester):
+    """(faculty_id, full_name, profile URL) for everyone without a photo who is in the directory"""
+    for faculty_id, full_name, current_photo in faculty:
+        # Skip if already has a photo
+        if current_photo:
+            print(f"  ⏭️  {full_name} - Already has photo")
+            continue
 
-    # Try first + last
-    parts = db_name.split()
-    if len(parts) >= 2:
-        first_last = f"{parts[0]} {parts[-1]}"
-        for url_name, url in url_names.items():
-            if first_last in url_name or url_name in first_last:
-                return url
+        # Find matching URL (accents, initials and short first names don't matter)
+        url = directory.lookup(full_name)
+        if not url:
+            harvester.fail(full_name, "No matching profile URL found")
+            continue
 
-    return None
+        yield faculty_id, full_name, url
 
-def update_faculty_photos():
-    """Update all faculty photos from their profile pages"""
+def harvest_serial(jobs, harvester, writer, pause=1.0):
+    """One person at a time: fetch, parse, download, UPDATE and commit, then pause"""
+    for job in jobs:
+        for page in harvester.fetch(job):
+            for photo in harvester.parse(page):
+                for update in harvester.download(photo):
+                    writer.add(update)
+                    writer.flush()
+        # Be nice to the server
+        time.sleep(pause)
+
+def harvest_pipeline(jobs, harvester, writer, fetch_workers=4, image_workers=2, queue_size=8):
+    """Run the jobs through the fetch, parse, image and db stages; returns the Pipeline"""
+    pipeline = Pipeline(
+        Stage('fetch', harvester.fetch, workers=fetch_workers, queue_size=queue_size),
+        Stage('parse', harvester.parse, queue_size=queue_size),
+        Stage('image', harvester.download, workers=image_workers, queue_size=queue_size),
+        Stage('db', writer.add, queue_size=queue_size, on_close=writer.flush),
+    )
+    pipeline.run(jobs)
+    return pipeline
+
+def update_faculty_photos(db_path=DEFAULT_DB_PATH, photo_dir=PHOTO_DIR, directory_url=FACULTY_DIR_URL,
+                          serial=False, fetch_workers=4, image_workers=2, per_host=4, rps=4,
+                          batch_size=DEFAULT_BATCH_SIZE, pause=1.0):
+    """Update all faculty photos from their profile pages; returns the summary counts"""
+
+    harvester = PhotoHarvester(photo_dir, workers=fetch_workers + image_workers, per_host=per_host, rps=rps)
 
     # Get faculty URLs from directory
-    faculty_urls = get_faculty_urls()
+    faculty_urls = get_faculty_urls(harvester.session, directory_url)
 
     if not faculty_urls:
         print("❌ Could not fetch faculty URLs from directory")
         return
 
-    print()
+    # Directory names indexed once; each lookup only scores people sharing the surname
+    directory = NameIndex(faculty_urls)
 
-    # Connect to database
-    db_path = '/Users/adrianstiermbp2023/eemb-website-redesign-2025-2026/backend/.tmp/data.db'
-    conn = sqlite3.connect(db_path)
-    cursor = conn.cursor()
+    print()
 
     # Get all faculty
-    cursor.execute("SELECT id, full_name, photo_url FROM faculties ORDER BY full_name")
-    faculty = cursor.fetchall()
+    conn = sqlite3.connect(db_path)
+    faculty = conn.execute("SELECT id, full_name, photo_url FROM faculties ORDER BY full_name").fetchall()
+    conn.close()
 
     print(f"📥 Scraping photos for {len(faculty)} faculty members...")
     print()
 
-    updated_count = 0
-    skipped_count = 0
-    failed_count = 0
-
-    for faculty_id, full_name, current_photo in faculty:
-
-        # Skip if already has a photo
-        if current_photo:
-            print(f"  ⏭️  {full_name} - Already has photo")
-            skipped_count += 1
-            continue
-
-        # Find matching URL
-        url = fuzzy_match_name(full_name, faculty_urls)
-
-        if not url:
-            print(f"  ⚠️  {full_name} - No matching profile URL found")
-            failed_count += 1
-            print()
-            continue
-
-        # Download photo
-        photo_url = download_faculty_photo(full_name, url)
-
-        if photo_url:
-            # Update database
-            cursor.execute("""
-                UPDATE faculties
-                SET photo_url = ?, updated_at = ?
-                WHERE id = ?
-            """, (photo_url, datetime.now().isoformat(), faculty_id))
-
-            updated_count += 1
+    skipped_count = sum(1 for _, _, current_photo in faculty if current_photo)
+    jobs = pending_jobs(faculty, directory, harvester)
+    writer = PhotoUpdateWriter(db_path, batch_size=1 if serial else batch_size)
+    try:
+        if serial:
+            harvest_serial(jobs, harvester, writer, pause)
+            errors = 0
         else:
-            failed_count += 1
-
-        # Be nice to the server
-        time.sleep(1)
+            pipeline = harvest_pipeline(jobs, harvester, writer, fetch_workers, image_workers)
+            errors = sum(stage.stats.errors for stage in pipeline.stages)
+    finally:
+        writer.close()
 
-        print()
-
-    # Commit changes
-    conn.commit()
+    updated_count = writer.written
+    failed_count = sum(harvester.failures.values()) + errors
 
     # Summary
     print("\n" + "="*60)
-    print(f"✅ Successfully downloaded {updated_count} new photos")
+    print(f"✅ Successfully downloaded {updated_count} new photos ({writer.commits} commits)")
     print(f"⏭️  Skipped {skipped_count} faculty (already had photos)")
     print(f"❌ Failed to find photos for {failed_count} faculty")
     print(f"📊 Total faculty with photos: {updated_count + skipped_count}")
     print("="*60)
+    if not serial:
+        pipeline.report()
 
     # Show faculty still missing photos
-    cursor.execute("SELECT full_name FROM faculties WHERE photo_url IS NULL OR photo_url = ''")
-    missing = cursor.fetchall()
+    conn = sqlite3.connect(db_path)
+    missing = conn.execute("SELECT full_name FROM faculties WHERE photo_url IS NULL OR photo_url = ''").fetchall()
+    conn.close()
 
     if missing:
         print(f"\n⚠️  Faculty still missing photos ({len(missing)}):")
@@ -296,7 +390,24 @@ def update_faculty_photos():
     else:
         print("\n🎉 All faculty now have photos!")
 
-    conn.close()
+    return {'updated': updated_count, 'skipped': skipped_count, 'failed': failed_count, 'commits': writer.commits}
+
+def main():
+    parser = argparse.ArgumentParser(description='Download faculty photos from their profile pages')
+    parser.add_argument('--db', default=DEFAULT_DB_PATH, help='Strapi SQLite database')
+    parser.add_argument('--photo-dir', default=PHOTO_DIR, help='Where photos are saved')
+    parser.add_argument('--directory-url', default=FACULTY_DIR_URL, help='Faculty directory page')
+    parser.add_argument('--serial', action='store_true',
+                        help='One person at a time with a 1s pause, as before')
+    parser.add_argument('--fetch-workers', type=int, default=4, help='Profile pages fetched in parallel')
+    parser.add_argument('--image-workers', type=int, default=2, help='Photos downloaded in parallel')
+    parser.add_argument('--per-host', type=int, default=4, help='Requests in flight per host')
+    parser.add_argument('--rps', type=float, default=4, help='Requests per second per host')
+    parser.add_argument('--batch-size', type=int, default=DEFAULT_BATCH_SIZE, help='Photo UPDATEs per commit')
+    args = parser.parse_args()
+    update_faculty_photos(args.db, args.photo_dir, args.directory_url, serial=args.serial,
+                          fetch_workers=args.fetch_workers, image_workers=args.image_workers,
+                          per_host=args.per_host, rps=args.rps, batch_size=args.batch_size)
 
 if __name__ == "__main__":
-    update_faculty_photos()
+    main()
@@ -0,0 +1,146 @@
+#!/usr/bin/env python3
+"""
+Keyed Diff-and-Upsert for the Strapi SQLite Database
+Brings a table in line with a list of rows by changing only what differs.
+
+Instead of DELETE FROM faculties followed by one INSERT per row, the
+loader reads the current rows, diffs them against the new ones by key
+(slug), and applies only the inserts, updates and deletes:
+    - inserts and updates: one executemany of INSERT ... ON CONFLICT(slug) DO UPDATE
+    - deletes: one executemany of DELETE ... WHERE slug = ?
+all inside a single transaction. Unchanged rows keep their id and
+updated_at, so anything cached or linked by id stays valid. A change
+report is printed first; dry_run stops there.
+
+Used by update_faculty_exact.py, update_exact_faculty_list.py and
+direct_insert_faculty.py.
+"""
+
+import json
+import sqlite3
+from datetime import datetime
+
+DEFAULT_DB_PATH = '/Users/adrianstiermbp2023/eemb-website-redesign-2025-2026/backend/.tmp/data.db'
+
+# Set when a row is first inserted, never by an update
+INSERT_ONLY_COLUMNS = ('created_at', 'published_at')
+
+
+class ChangeSet:
+    """Rows to insert, update (with the columns that differ) and delete"""
+
+    def __init__(self):
+        self.inserts = []
+        self.updates = []   # (row, {column: (old, new)})
+        self.deletes = []   # keys
+        self.unchanged = 0
+
+    def __len__(self):
+        return len(self.inserts) + len(self.updates) + len(self.deletes)
+
+
+def stored_value(value):
+    """A Python value as SQLite stores it (lists and dicts are JSON columns)"""
+    if isinstance(value, (list, dict)):
+        return json.dumps(value)
+    if isinstance(value, bool):
+        return int(value)
+    return value
+
+
+def unique_key_index(conn, table, key):
+    """Name of a unique index on exactly `key`, which ON CONFLICT(key) needs"""
+    for index in conn.execute(f"PRAGMA index_list({table})").fetchall():
+        if index[2] and [c[2] for c in conn.execute(f"PRAGMA index_info({index[1]})")] == [key]:
+            return index[1]
+    return None
+
+
+def diff_rows(conn, table, rows, key='slug', delete_missing=True):
+    """Compare rows with the table's current contents, by key"""
+    columns = [c for c in dict.fromkeys(k for row in rows for k in row) if c not in INSERT_ONLY_COLUMNS]
+    conn.row_factory = sqlite3.Row
+    current = {r[key]: r for r in conn.execute(f"SELECT {key}, {', '.join(columns)} FROM {table}")}
+
+    changes = ChangeSet()
+    seen = set()
+    for row in rows:
+        if row[key] in seen:
+            raise ValueError(f"Duplicate {key} in the new rows: {row[key]}")
+        seen.add(row[key])
+        old = current.get(row[key])
+        if old is None:
+            changes.inserts.append(row)
+            continue
+        changed = {c: (old[c], stored_value(row[c])) for c in columns
+                   if c in row and c != 'updated_at' and old[c] != stored_value(row[c])}
+        if changed:
+            changes.updates.append((row, changed))
+        else:
+            changes.unchanged += 1
+    if delete_missing:
+        changes.deletes = [k for k in current if k not in seen]
+    return changes
+
+
+def print_report(changes, key='slug', limit=20):
+    """Print what apply_changes would do"""
+    print(f"📋 Change report: {len(changes.inserts)} to insert, {len(changes.updates)} to update, "
+          f"{len(changes.deletes)} to delete, {changes.unchanged} unchanged")
+    for row in changes.inserts[:limit]:
+        print(f"  + {row[key]}")
+    for row, changed in changes.updates[:limit]:
+        print(f"  ~ {row[key]}: {', '.join(sorted(changed))}")
+    for k in changes.deletes[:limit]:
+        print(f"  - {k}")
+    hidden = sum(max(0, len(group) - limit) for group in (changes.inserts, changes.updates, changes.deletes))
+    if hidden:
+        print(f"  ... and {hidden} more")
+
+
+def apply_changes(conn, table, changes, key='slug'):
+    """Apply a ChangeSet in one transaction (all or nothing)
+
+    Rows are expected to share the same columns; a column missing from
+    a row is written as NULL (timestamps default to now).
+    """
+    upserts = changes.inserts + [row for row, _ in changes.updates]
+    timestamps = ('updated_at',) + INSERT_ONLY_COLUMNS
+    now = datetime.now().isoformat()
+    if changes.deletes:
+        # Cascade to the relation tables (faculties_*_links) that reference the deleted ids;
+        # SQLite ignores this pragma inside a transaction
+        conn.execute("PRAGMA foreign_keys = ON")
+    with conn:
+        if upserts:
+            columns = list(dict.fromkeys(k for row in upserts for k in row))
+            columns += [c for c in timestamps if c not in columns]
+            assignments = ', '.join(f"{c} = excluded.{c}" for c in columns
+                                    if c != key and c not in INSERT_ONLY_COLUMNS)
+            conn.executemany(
+                f"INSERT INTO {table} ({', '.join(columns)}) VALUES ({', '.join('?' * len(columns))}) "
+                f"ON CONFLICT({key}) DO UPDATE SET {assignments}",
+                [[stored_value(row.get(c, now if c in timestamps else None)) for c in columns] for row in upserts]
+            )
+        if changes.deletes:
+            conn.executemany(f"DELETE FROM {table} WHERE {key} = ?", [(k,) for k in changes.deletes])
+
+
+def sync_table(db_path, table, rows, key='slug', delete_missing=True, dry_run=False):
+    """Diff rows against the table, print the report and apply it; returns the ChangeSet"""
+    conn = sqlite3.connect(db_path)
+    try:
+        if unique_key_index(conn, table, key) is None:
+            raise ValueError(f"{table}.{key} has no unique index, so rows cannot be upserted by {key}")
+        changes = diff_rows(conn, table, rows, key, delete_missing)
+        print_report(changes, key)
+        if dry_run:
+            print("🔍 Dry run: database not modified")
+        elif changes:
+            apply_changes(conn, table, changes, key)
+            print(f"✅ Applied {len(changes)} changes to {table} in one transaction")
+        else:
+            print(f"✅ {table} already up to date")
+        return changes
+    finally:
+        conn.close()
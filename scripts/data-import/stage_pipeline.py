@@ -0,0 +1,152 @@
+#!/usr/bin/env python3
+"""
+Threaded Stage Pipeline
+Producer/consumer stages connected by bounded queues, with per-stage timing.
+
+Each Stage is a small pool of threads that takes items from its input
+queue, calls its function, and puts whatever the function yields on the
+next stage's queue. Queues are bounded, so a slow stage makes the stages
+before it wait (backpressure) instead of piling work up in memory.
+
+Every stage counts the items it took and passed on, its errors, and how
+long its workers spent working, waiting for input (the stage before is
+the bottleneck) and waiting for room downstream (the stage after is).
+Pipeline.report() prints them.
+
+Used by scrape_faculty_photos_v2.py.
+"""
+
+import queue
+import threading
+import time
+
+# Items a stage's input queue holds before the stage feeding it has to wait
+DEFAULT_QUEUE_SIZE = 16
+
+# Tells a worker there is nothing more to come
+DONE = object()
+
+
+class StageStats:
+    """Counters and timings of one stage, summed over its workers"""
+
+    def __init__(self, name, workers):
+        self.name = name
+        self.workers = workers
+        self.items = 0
+        self.emitted = 0
+        self.errors = 0
+        self.busy = 0.0      # Working on items
+        self.idle = 0.0      # Waiting for input
+        self.blocked = 0.0   # Waiting for room in the next queue
+        self.lock = threading.Lock()
+
+    def add(self, **counts):
+        with self.lock:
+            for name, value in counts.items():
+                setattr(self, name, getattr(self, name) + value)
+
+
+class Stage:
+    """One step of a Pipeline: `workers` threads calling func on each item
+
+    func returns an iterable of results for the next stage (a generator,
+    a list, or None for nothing). An exception is counted and printed,
+    and the item dropped. on_close runs once, after the stage's last
+    worker has finished (to flush a batch or close a connection).
+    """
+
+    def __init__(self, name, func, workers=1, queue_size=DEFAULT_QUEUE_SIZE, on_close=None):
+        self.name = name
+        self.func = func
+        self.workers = workers
+        self.on_close = on_close
+        self.inbox = queue.Queue(maxsize=queue_size)
+        self.outbox = None
+        self.stats = StageStats(name, workers)
+
+    def work(self):
+        while True:
+            start = time.perf_counter()
+            item = self.inbox.get()
+            idle = time.perf_counter() - start
+            if item is DONE:
+                self.stats.add(idle=idle)
+                return
+
+            emitted = errors = 0
+            blocked = 0.0
+            start = time.perf_counter()
+            try:
+                for result in self.func(item) or ():
+                    if self.outbox is not None:
+                        put_start = time.perf_counter()
+                        self.outbox.put(result)
+                        blocked += time.perf_counter() - put_start
+                    emitted += 1
+            except Exception as e:
+                errors = 1
+                print(f"  ❌ {self.name}: {e}")
+            busy = time.perf_counter() - start - blocked
+            self.stats.add(items=1, emitted=emitted, errors=errors, busy=busy, idle=idle, blocked=blocked)
+
+
+class Pipeline:
+    """Stages run concurrently, each feeding the next
+
+    Usage:
+        pipeline = Pipeline(Stage('fetch', fetch, workers=4), Stage('parse', parse), Stage('write', write))
+        pipeline.run(items)
+        pipeline.report()
+    """
+
+    def __init__(self, *stages):
+        self.stages = stages
+        for stage, following in zip(stages, stages[1:]):
+            stage.outbox = following.inbox
+        self.source = StageStats('source', 1)
+        self.elapsed = 0.0
+
+    def run(self, items):
+        """Feed items to the first stage and wait until every stage has finished"""
+        start = time.perf_counter()
+        pools = []
+        for stage in self.stages:
+            threads = [threading.Thread(target=stage.work, name=f"{stage.name}-{i}", daemon=True)
+                       for i in range(stage.workers)]
+            for thread in threads:
+                thread.start()
+            pools.append(threads)
+
+        first = self.stages[0].inbox
+        try:
+            items = iter(items)
+            while True:
+                produce_start = time.perf_counter()
+                item = next(items, DONE)
+                busy = time.perf_counter() - produce_start
+                if item is DONE:
+                    self.source.add(busy=busy)
+                    break
+                put_start = time.perf_counter()
+                first.put(item)
+                self.source.add(items=1, emitted=1, busy=busy, blocked=time.perf_counter() - put_start)
+        finally:
+            # Shut down in order: a stage stops once everything before it has stopped
+            for stage, threads in zip(self.stages, pools):
+                for _ in threads:
+                    stage.inbox.put(DONE)
+                for thread in threads:
+                    thread.join()
+                if stage.on_close:
+                    stage.on_close()
+            self.elapsed = time.perf_counter() - start
+
+    def report(self):
+        """Print each stage's counts and where its time went"""
+        print(f"\n⏱️  Stage timings ({self.elapsed:.1f}s total)")
+        print(f"  {'stage':10} {'workers':>7} {'in':>6} {'out':>6} {'errors':>6} "
+              f"{'busy':>8} {'wait in':>8} {'wait out':>8}")
+        for stats in [self.source] + [stage.stats for stage in self.stages]:
+            print(f"  {stats.name:10} {stats.workers:7} {stats.items:6} {stats.emitted:6} {stats.errors:6} "
+                  f"{stats.busy:7.1f}s {stats.idle:7.1f}s {stats.blocked:7.1f}s")
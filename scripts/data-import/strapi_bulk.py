@@ -0,0 +1,240 @@
+#!/usr/bin/env python3
+"""
+Bulk Upsert for Strapi Collections
+Creates and updates many Strapi entries at once instead of one GET + POST per record.
+
+Strapi's REST API has no bulk endpoint, so a bulk upsert is:
+    1. one paginated scan of the collection's existing entries (pages fetched concurrently)
+    2. a local diff by key (slug): new records, changed records, unchanged ones
+    3. POSTs and PUTs sent in batches over a pooled keep-alive session,
+       several in flight at a time, retried with exponential backoff on
+       429, 5xx and connection errors (Retry-After is honoured)
+
+A POST is not idempotent: if its answer is lost, resending it may create
+the entry twice. It is resent at once only when the server cannot have
+acted on it (the connection was never made, or a 429 or a 503 with
+Retry-After). After a timeout, a dropped connection or another 5xx, the
+slug is looked up first, and the POST is resent only if it is not there.
+
+Used by clean_and_import_faculty.py (the default import mode). Test
+against the local mock server instead of a real Strapi:
+    python ../../scraping/benchmarks/mock_strapi.py
+"""
+
+import random
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.exceptions import ConnectTimeoutError, NewConnectionError
+
+# Strapi's api.rest.maxLimit (backend/config/api.js)
+MAX_PAGE_SIZE = 100
+
+# Answers worth retrying: rate limiting and a server that is restarting or overloaded
+RETRY_STATUSES = {429, 502, 503, 504}
+
+# Methods that leave the same state however often they are repeated, so they can be resent blindly
+IDEMPOTENT_METHODS = {'GET', 'HEAD', 'PUT', 'DELETE'}
+
+
+def never_sent(error):
+    """True if a request failed while connecting, before the server could see it"""
+    if isinstance(error, requests.exceptions.ConnectTimeout):
+        return True
+    reason = getattr(error.args[0], 'reason', None) if error.args else None
+    return isinstance(reason, (NewConnectionError, ConnectTimeoutError))
+
+
+def turned_away(response):
+    """True for answers that say the request was refused without being processed"""
+    return response.status_code == 429 or (response.status_code == 503 and 'Retry-After' in response.headers)
+
+
+class StrapiBulkClient:
+    """Pooled, concurrent, retrying client for one Strapi instance"""
+
+    def __init__(self, api_url, api_token=None, workers=8, batch_size=50, retries=4, backoff=0.5, timeout=10):
+        self.api_url = api_url.rstrip('/')
+        self.workers = workers
+        self.batch_size = batch_size
+        self.retries = retries
+        self.backoff = backoff
+        self.timeout = timeout
+        self.session = requests.Session()
+        self.session.headers['Content-Type'] = 'application/json'
+        if api_token:
+            self.session.headers['Authorization'] = f'Bearer {api_token}'
+        # One keep-alive connection per worker
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=workers)
+        self.session.mount('http://', adapter)
+        self.session.mount('https://', adapter)
+        self.stats = {'requests': 0, 'retries': 0}
+
+    def request(self, method, path, **kwargs):
+        """Send a request, retrying with exponential backoff and jitter
+
+        Idempotent methods are retried on RETRY_STATUSES, timeouts and
+        connection errors. Other methods (POST) only when never_sent() or
+        turned_away(); any other failure is returned or raised at once,
+        see create().
+
+        Returns the last response; raises the last connection error if
+        every attempt failed to connect.
+        """
+        idempotent = method.upper() in IDEMPOTENT_METHODS
+        for attempt in range(self.retries + 1):
+            self.stats['requests'] += 1
+            try:
+                response = self.session.request(method, self.api_url + path, timeout=self.timeout, **kwargs)
+            except (requests.exceptions.ConnectionError, requests.exceptions.Timeout) as e:
+                if attempt == self.retries or not (idempotent or never_sent(e)):
+                    raise
+                response = None
+            if response is not None:
+                retry = response.status_code in RETRY_STATUSES if idempotent else turned_away(response)
+                if not retry or attempt == self.retries:
+                    return response
+            self.wait(attempt, response)
+
+    def wait(self, attempt, response=None):
+        """Back off before retry number attempt + 1"""
+        self.stats['retries'] += 1
+        delay = self.backoff * 2 ** attempt * (0.5 + random.random())
+        retry_after = response.headers.get('Retry-After', '') if response is not None else ''
+        if retry_after.isdigit():
+            delay = max(delay, int(retry_after))
+        time.sleep(delay)
+
+    def fetch_all(self, collection, page_size=MAX_PAGE_SIZE):
+        """Every entry of a collection as {'id': ..., **attributes}, paging concurrently"""
+        def page(n):
+            response = self.request('GET', f'/api/{collection}', params={
+                'pagination[page]': n,
+                'pagination[pageSize]': page_size,
+                'publicationState': 'preview',  # Drafts too, or they would be created again
+            })
+            response.raise_for_status()
+            return response.json()
+
+        first = page(1)
+        pages = [first]
+        page_count = first.get('meta', {}).get('pagination', {}).get('pageCount', 1)
+        if page_count > 1:
+            with ThreadPoolExecutor(max_workers=self.workers) as executor:
+                pages.extend(executor.map(page, range(2, page_count + 1)))
+
+        return [{'id': entry['id'], **entry.get('attributes', {})} for p in pages for entry in p.get('data', [])]
+
+    def diff(self, records, existing, key='slug'):
+        """Split records into (creates, updates, unchanged) against the existing entries
+
+        An update carries the entry id and only the fields whose value
+        differs from what Strapi has.
+        """
+        by_key = {entry.get(key): entry for entry in existing}
+        creates, updates, unchanged = [], [], []
+        for record in records:
+            entry = by_key.get(record[key])
+            if entry is None:
+                creates.append(record)
+                continue
+            changed = {field: value for field, value in record.items() if entry.get(field) != value}
+            if changed:
+                updates.append((entry['id'], record, changed))
+            else:
+                unchanged.append(record)
+        return creates, updates, unchanged
+
+    def exists(self, path, key, value):
+        """True if the collection at `path` has an entry whose `key` equals value (drafts included)"""
+        response = self.request('GET', path, params={
+            f'filters[{key}][$eq]': value,
+            'pagination[pageSize]': 1,
+            'publicationState': 'preview',
+        })
+        response.raise_for_status()
+        return bool(response.json().get('data'))
+
+    def create(self, path, data, key='slug'):
+        """POST one entry, resending after an unclear failure only if data[key] is not stored yet
+
+        Returns (ok, error message) like send().
+        """
+        for attempt in range(self.retries + 1):
+            try:
+                response = self.request('POST', path, json={'data': data})
+            except requests.exceptions.RequestException as e:
+                response, error = None, str(e)
+            else:
+                if response.status_code in (200, 201):
+                    return True, None
+                error = f"Status {response.status_code}: {response.text[:100]}"
+                if response.status_code not in RETRY_STATUSES or turned_away(response):
+                    return False, error  # Rejected, or already retried by request()
+            if attempt == self.retries:
+                return False, error
+
+            # Timed out, dropped or a gateway error: the entry may have been stored anyway
+            self.wait(attempt, response)
+            try:
+                if self.exists(path, key, data[key]):
+                    return True, None
+            except (requests.exceptions.RequestException, ValueError) as e:
+                return False, f"{error}; could not check whether {key} {data[key]!r} was stored: {e}"
+
+    def send(self, method, path, data, key='slug'):
+        """One create/update; returns (ok, error message)"""
+        if method == 'POST':
+            return self.create(path, data, key)
+        try:
+            response = self.request(method, path, json={'data': data})
+        except requests.exceptions.RequestException as e:
+            return False, str(e)
+        if response.status_code in (200, 201):
+            return True, None
+        return False, f"Status {response.status_code}: {response.text[:100]}"
+
+    def run_batches(self, jobs, on_result=None, key='slug'):
+        """Run (method, path, data, label) jobs concurrently, batch_size at a time
+
+        `key` is the field that identifies a POSTed record (see create()).
+        Returns a list of (label, ok, error) in job order.
+        """
+        results = []
+        with ThreadPoolExecutor(max_workers=self.workers) as executor:
+            for start in range(0, len(jobs), self.batch_size):
+                batch = jobs[start:start + self.batch_size]
+                outcomes = executor.map(lambda job: self.send(*job[:3], key=key), batch)
+                for job, (ok, error) in zip(batch, outcomes):
+                    results.append((job[3], ok, error))
+                    if on_result:
+                        on_result(job[3], ok, error)
+        return results
+
+    def upsert(self, collection, records, key='slug', update=True, dry_run=False, on_result=None):
+        """Create new records and (if `update`) patch changed ones
+
+        Returns a summary dict with the diff counts and the failures.
+        """
+        existing = self.fetch_all(collection)
+        creates, updates, unchanged = self.diff(records, existing, key)
+        summary = {
+            'existing': len(existing),
+            'create': len(creates),
+            'update': len(updates) if update else 0,
+            'unchanged': len(unchanged) + (0 if update else len(updates)),
+            'failed': [],
+        }
+        if dry_run:
+            return summary
+
+        jobs = [('POST', f'/api/{collection}', record, record[key]) for record in creates]
+        if update:
+            jobs.extend(('PUT', f'/api/{collection}/{entry_id}', changed, record[key])
+                        for entry_id, record, changed in updates)
+        for label, ok, error in self.run_batches(jobs, on_result, key):
+            if not ok:
+                summary['failed'].append((label, error))
+        return summary
@@ -2,12 +2,17 @@
 """
 Update faculty database with EXACT list from EEMB faculty page
 Only these faculty should be in the database - no others
+
+Only rows that differ are written (sqlite_upsert.py): new faculty are
+inserted, changed ones updated in place, and everyone else deleted, all
+in one transaction.
 """
 
+import argparse
 import sqlite3
-import json
-from datetime import datetime
-from pathlib import Path
+
+from name_matching import slugify
+from sqlite_upsert import DEFAULT_DB_PATH, sync_table
 
 # EXACT faculty list from https://www.eemb.ucsb.edu/people/faculty
 FACULTY_DATA = [
@@ -267,7 +272,7 @@ FACULTY_DATA = [
 
 def create_slug(name):
     """Create a URL-friendly slug from name"""
-    return name.lower().replace(' ', '-').replace('.', '').replace('á', 'a').replace('é', 'e')
+    return slugify(name)
 
 def split_name(full_name):
     """Split full name into first and last name"""
@@ -280,76 +285,51 @@ def split_name(full_name):
         # Handle middle names/initials
         return parts[0], ' '.join(parts[1:])
 
-def update_faculty_database():
-    """Update the database with exact faculty list from EEMB website"""
-
-    # Connect to database
-    db_path = '/Users/adrianstiermbp2023/eemb-website-redesign-2025-2026/backend/.tmp/data.db'
-    conn = sqlite3.connect(db_path)
-    cursor = conn.cursor()
-
-    print("📥 Updating faculty database with EXACT EEMB website faculty list...")
-    print(f"Processing {len(FACULTY_DATA)} faculty members...")
+def faculty_row(faculty):
+    """faculties table row for one FACULTY_DATA entry"""
+    first_name, last_name = split_name(faculty['name'])
+    slug = create_slug(faculty['name'])
 
-    # Clear existing faculty
-    cursor.execute("DELETE FROM faculties")
-    print("✨ Cleared existing faculty data")
+    # Set photo URL if available
+    photo_url = None
+    if faculty.get('photo'):
+        photo_url = f"/uploads/faculty/{faculty['photo']}"
 
-    # Backend public folder for photos
-    backend_public = '/Users/adrianstiermbp2023/eemb-website-redesign-2025-2026/backend/public/uploads/faculty'
+    # Create short bio
+    short_bio = f"{faculty['title']}."
+    if faculty['research']:
+        short_bio += f" Research focuses on {faculty['research'][0]}."
 
-    success_count = 0
-    for faculty in FACULTY_DATA:
-        try:
-            first_name, last_name = split_name(faculty['name'])
-            slug = create_slug(faculty['name'])
-            now = datetime.now().isoformat()
+    return {
+        'first_name': first_name,
+        'last_name': last_name,
+        'full_name': faculty['name'],
+        'slug': slug,
+        'title': faculty['title'],
+        'email': f"{slug}@ucsb.edu",
+        'phone': "",
+        'office': faculty['office'],
+        'bio': "",
+        'short_bio': short_bio,
+        'research_interests': faculty['research'] or [],
+        'active': True,
+        'department': "Ecology, Evolution, and Marine Biology",
+        'photo_url': photo_url,
+    }
 
-            # Set photo URL if available
-            photo_url = None
-            if faculty.get('photo'):
-                photo_url = f"/uploads/faculty/{faculty['photo']}"
-
-            # Create short bio
-            short_bio = f"{faculty['title']}."
-            if faculty['research']:
-                short_bio += f" Research focuses on {faculty['research'][0]}."
-
-            # Insert into database
-            cursor.execute("""
-                INSERT INTO faculties (
-                    first_name, last_name, full_name, slug, title,
-                    email, phone, office, bio, short_bio,
-                    research_interests, active, department, photo_url,
-                    created_at, updated_at, published_at
-                ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-            """, (
-                first_name,
-                last_name,
-                faculty['name'],
-                slug,
-                faculty['title'],
-                f"{slug}@ucsb.edu",
-                "",
-                faculty['office'],
-                "",
-                short_bio,
-                json.dumps(faculty['research']) if faculty['research'] else '[]',
-                1,
-                "Ecology, Evolution, and Marine Biology",
-                photo_url,
-                now, now, now
-            ))
+def update_faculty_database(db_path=DEFAULT_DB_PATH, dry_run=False):
+    """Update the database with exact faculty list from EEMB website"""
 
-            success_count += 1
-            photo_indicator = "📷" if photo_url else "  "
-            print(f"  {photo_indicator} Added: {faculty['name']} - {faculty['title']}")
+    print("📥 Updating faculty database with EXACT EEMB website faculty list...")
+    print(f"Processing {len(FACULTY_DATA)} faculty members...")
 
-        except Exception as e:
-            print(f"  ❌ Error adding {faculty['name']}: {e}")
+    # Insert new, update changed and delete unlisted faculty in one transaction
+    changes = sync_table(db_path, 'faculties', [faculty_row(f) for f in FACULTY_DATA], dry_run=dry_run)
+    if dry_run:
+        return
 
-    # Commit all changes
-    conn.commit()
+    conn = sqlite3.connect(db_path)
+    cursor = conn.cursor()
 
     # Show summary
     cursor.execute("SELECT COUNT(*) FROM faculties")
@@ -358,12 +338,20 @@ def update_faculty_database():
     cursor.execute("SELECT COUNT(*) FROM faculties WHERE photo_url IS NOT NULL AND photo_url != ''")
     photo_count = cursor.fetchone()[0]
 
-    print(f"\n✅ Successfully updated database with {success_count} faculty members!")
+    print(f"\n✅ Successfully updated database: {len(changes.inserts)} added, {len(changes.updates)} updated, "
+          f"{len(changes.deletes)} removed")
     print(f"📊 Database now contains {total_count} total faculty")
     print(f"📷 {photo_count} faculty have photos")
     print(f"🌐 Faculty data is available at: http://localhost:1337/api/faculties")
 
     conn.close()
 
+def main():
+    parser = argparse.ArgumentParser(description='Sync the faculties table with the exact EEMB faculty list')
+    parser.add_argument('--db', default=DEFAULT_DB_PATH, help='Strapi SQLite database')
+    parser.add_argument('--dry-run', action='store_true', help='Print the change report without applying it')
+    args = parser.parse_args()
+    update_faculty_database(args.db, args.dry_run)
+
 if __name__ == "__main__":
-    update_faculty_database()
\ No newline at end of file
+    main()
\ No newline at end of file
@@ -1,12 +1,17 @@
 #!/usr/bin/env python3
 """
 Update faculty database with exact content from EEMB website
+
+Only rows that differ are written (sqlite_upsert.py): new faculty are
+inserted, changed ones updated in place, and faculty no longer on the
+list deleted, all in one transaction.
 """
 
+import argparse
 import sqlite3
-import json
-from datetime import datetime
-from pathlib import Path
+
+from name_matching import slugify
+from sqlite_upsert import DEFAULT_DB_PATH, sync_table
 
 # Exact faculty data from EEMB website
 FACULTY_DATA = [
@@ -236,7 +241,7 @@ FACULTY_DATA = [
 
 def create_slug(name):
     """Create a URL-friendly slug from name"""
-    return name.lower().replace(' ', '-').replace('.', '')
+    return slugify(name)
 
 def split_name(full_name):
     """Split full name into first and last name"""
@@ -249,77 +254,56 @@ def split_name(full_name):
         # Handle middle names/initials
         return parts[0], ' '.join(parts[1:])
 
-def update_faculty_database():
-    """Update the database with exact faculty information"""
-
-    # Connect to database
-    db_path = '/Users/adrianstiermbp2023/eemb-website-redesign-2025-2026/backend/.tmp/data.db'
-    conn = sqlite3.connect(db_path)
-    cursor = conn.cursor()
-
-    print("📥 Updating faculty database with exact EEMB website content...")
-    print(f"Processing {len(FACULTY_DATA)} faculty members...")
-
-    # First, clear existing faculty to ensure exact match
-    cursor.execute("DELETE FROM faculties")
-    print("✨ Cleared existing faculty data")
+def faculty_row(faculty):
+    """faculties table row for one FACULTY_DATA entry"""
+    first_name, last_name = split_name(faculty['name'])
+    slug = create_slug(faculty['name'])
 
-    success_count = 0
-    for faculty in FACULTY_DATA:
-        try:
-            first_name, last_name = split_name(faculty['name'])
-            slug = create_slug(faculty['name'])
-            now = datetime.now().isoformat()
+    # Determine if active (not emeritus or memoriam)
+    active = not any(word in faculty['title'].lower() for word in ['emeritus', 'memoriam', 'adjunct'])
 
-            # Determine if active (not emeritus or memoriam)
-            active = not any(word in faculty['title'].lower() for word in ['emeritus', 'memoriam', 'adjunct'])
+    # Determine department
+    if 'Bren' in faculty['office'] or 'Bren School' in faculty['title']:
+        department = 'Bren School'
+    elif 'Marine Science' in faculty['office']:
+        department = 'Marine Science Institute'
+    else:
+        department = 'Ecology, Evolution, and Marine Biology'
 
-            # Determine department
-            if 'Bren' in faculty['office'] or 'Bren School' in faculty['title']:
-                department = 'Bren School'
-            elif 'Marine Science' in faculty['office']:
-                department = 'Marine Science Institute'
-            else:
-                department = 'Ecology, Evolution, and Marine Biology'
+    # Create short bio from title and primary research area
+    short_bio = f"{faculty['title']}. "
+    if faculty['research']:
+        short_bio += f"Research focuses on {faculty['research'][0]}."
 
-            # Create short bio from title and primary research area
-            short_bio = f"{faculty['title']}. "
-            if faculty['research']:
-                short_bio += f"Research focuses on {faculty['research'][0]}."
+    return {
+        'first_name': first_name,
+        'last_name': last_name,
+        'full_name': faculty['name'],
+        'slug': slug,
+        'title': faculty['title'],
+        'email': f"{slug}@ucsb.edu",  # Generate email from slug
+        'phone': "",  # Phone will be updated when available
+        'office': faculty['office'],
+        'bio': "",  # Full bio to be added later
+        'short_bio': short_bio,
+        'research_interests': faculty['research'] or [],
+        'active': active,
+        'department': department,
+    }
 
-            # Insert into database
-            cursor.execute("""
-                INSERT INTO faculties (
-                    first_name, last_name, full_name, slug, title,
-                    email, phone, office, bio, short_bio,
-                    research_interests, active, department,
-                    created_at, updated_at, published_at
-                ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-            """, (
-                first_name,
-                last_name,
-                faculty['name'],
-                slug,
-                faculty['title'],
-                f"{slug}@ucsb.edu",  # Generate email from slug
-                "",  # Phone will be updated when available
-                faculty['office'],
-                "",  # Full bio to be added later
-                short_bio,
-                json.dumps(faculty['research']) if faculty['research'] else '[]',
-                1 if active else 0,
-                department,
-                now, now, now
-            ))
+def update_faculty_database(db_path=DEFAULT_DB_PATH, dry_run=False):
+    """Update the database with exact faculty information"""
 
-            success_count += 1
-            print(f"  ✅ Added: {faculty['name']} - {faculty['title']}")
+    print("📥 Updating faculty database with exact EEMB website content...")
+    print(f"Processing {len(FACULTY_DATA)} faculty members...")
 
-        except Exception as e:
-            print(f"  ❌ Error adding {faculty['name']}: {e}")
+    # Insert new, update changed and delete unlisted faculty in one transaction
+    changes = sync_table(db_path, 'faculties', [faculty_row(f) for f in FACULTY_DATA], dry_run=dry_run)
+    if dry_run:
+        return
 
-    # Commit all changes
-    conn.commit()
+    conn = sqlite3.connect(db_path)
+    cursor = conn.cursor()
 
     # Show summary
     cursor.execute("SELECT COUNT(*) FROM faculties")
@@ -328,7 +312,8 @@ def update_faculty_database():
     cursor.execute("SELECT COUNT(*) FROM faculties WHERE active = 1")
     active_count = cursor.fetchone()[0]
 
-    print(f"\n✅ Successfully updated database with {success_count} faculty members!")
+    print(f"\n✅ Successfully updated database: {len(changes.inserts)} added, {len(changes.updates)} updated, "
+          f"{len(changes.deletes)} removed")
     print(f"📊 Database now contains {total_count} total faculty ({active_count} active)")
     print(f"🌐 Faculty data is available at: http://localhost:1337/api/faculties")
 
@@ -362,5 +347,12 @@ def update_faculty_database():
 
     conn.close()
 
+def main():
+    parser = argparse.ArgumentParser(description='Sync the faculties table with the exact EEMB faculty content')
+    parser.add_argument('--db', default=DEFAULT_DB_PATH, help='Strapi SQLite database')
+    parser.add_argument('--dry-run', action='store_true', help='Print the change report without applying it')
+    args = parser.parse_args()
+    update_faculty_database(args.db, args.dry_run)
+
 if __name__ == "__main__":
-    update_faculty_database()
\ No newline at end of file
+    main()
\ No newline at end of file
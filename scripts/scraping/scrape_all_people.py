@@ -4,17 +4,24 @@ Comprehensive scraper for ALL people in EEMB directory
 Scrapes: Faculty, Staff, Students, Research Scientists, Adjunct, Emeriti
 """
 
-import requests
-from bs4 import BeautifulSoup
+import os
+import sys
 import json
 import re
 import time
 from datetime import datetime
 from urllib.parse import urljoin
 
+# Share the scraping pipeline's HTTP cache and HTML parser (scraping/scripts/)
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', '..', 'scraping', 'scripts'))
+from http_cache import create_session  # noqa: E402
+from parsing import parse_html  # noqa: E402
+
 BASE_URL = "https://www.eemb.ucsb.edu"
 PEOPLE_URL = "https://www.eemb.ucsb.edu/people"
 
+session = create_session('EEMB-Scraper/1.0 (Content preservation for website redesign)')
+
 def clean_text(text):
     """Clean and normalize text"""
     if not text:
@@ -27,9 +34,9 @@ def extract_person_details(person_url):
     print(f"    Fetching details from: {person_url}")
 
     try:
-        response = requests.get(person_url, timeout=10)
+        response = session.get(person_url, timeout=10)
         response.raise_for_status()
-        soup = BeautifulSoup(response.content, 'html.parser')
+        soup = parse_html(response.content)
 
         details = {
             'profile_url': person_url,
@@ -100,9 +107,9 @@ def scrape_all_people():
     print("="*80)
 
     try:
-        response = requests.get(PEOPLE_URL, timeout=15)
+        response = session.get(PEOPLE_URL, timeout=15)
         response.raise_for_status()
-        soup = BeautifulSoup(response.content, 'html.parser')
+        soup = parse_html(response.content)
 
         all_people = []
 
@@ -4,13 +4,32 @@ Enhanced scraper that extracts ALL details from individual profile pages
 Based on existing people list, goes through each profile page in detail
 """
 
-import requests
-from bs4 import BeautifulSoup
+import argparse
+import os
+import sys
 import json
 import re
 import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from urllib.parse import urljoin
 
+from requests.adapters import HTTPAdapter
+
+# Share the scraping pipeline's HTTP cache and HTML parser (scraping/scripts/)
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', '..', 'scraping', 'scripts'))
+from http_cache import create_session  # noqa: E402
+from json_stream import iter_records  # noqa: E402
+from parsing import parse_html  # noqa: E402
+from record_sink import write_json  # noqa: E402
+
+session = create_session('EEMB-Scraper/1.0 (Content preservation for website redesign)')
+
+INPUT_FILE = '/Users/adrianstiermbp2023/eemb-website-redesign-2025-2026/scraping/data/all-people-scraped.json'
+# One JSON object per finished profile; read back to resume an interrupted run
+CHECKPOINT_FILE = ('/Users/adrianstiermbp2023/eemb-website-redesign-2025-2026/scraping/data/'
+                   'people-detailed-checkpoint.jsonl')
+OUTPUT_FILE = '/Users/adrianstiermbp2023/eemb-website-redesign-2025-2026/scraping/data/people-detailed-complete.json'
+
 def clean_text(text):
     """Clean and normalize text"""
     if not text:
@@ -24,9 +43,9 @@ def extract_detailed_profile(url, person_name):
     print(f"     URL: {url}")
 
     try:
-        response = requests.get(url, timeout=15)
+        response = session.get(url, timeout=15)
         response.raise_for_status()
-        soup = BeautifulSoup(response.content, 'html.parser')
+        soup = parse_html(response.content)
 
         details = {
             'full_name': person_name,
@@ -193,81 +212,149 @@ def extract_detailed_profile(url, person_name):
             'error': str(e)
         }
 
-def enhance_people_data():
-    """Load existing people list and enhance with detailed profile data"""
+def load_checkpoint(checkpoint_file):
+    """Where each completed profile of an earlier, interrupted run starts in the checkpoint
+
+    Returns {profile_url: byte offset}; read_checkpoint() loads a profile
+    back. Profiles that failed are left out so they are fetched again.
+    """
+    completed = {}
+    if not os.path.exists(checkpoint_file):
+        return completed
+    with open(checkpoint_file, 'rb') as f:
+        offset = 0
+        for line in f:
+            try:
+                record = json.loads(line)
+            except ValueError:
+                # Last line cut short by a crash
+                record = {}
+            if record.get('profile_url') and 'error' not in record:
+                completed[record['profile_url']] = offset
+            offset += len(line)
+    return completed
+
+def read_checkpoint(f, offset):
+    """The profile written at offset of an open (binary) checkpoint file"""
+    f.seek(offset)
+    return json.loads(f.readline())
+
+def checkpoint_ends_line(checkpoint_file):
+    """Whether the checkpoint's last byte is a newline"""
+    with open(checkpoint_file, 'rb') as f:
+        f.seek(-1, os.SEEK_END)
+        return f.read(1) == b'\n'
+
+def fetch_profile(url, name, delay):
+    """Worker: fetch one profile, then pause so each worker stays polite"""
+    detailed = extract_detailed_profile(url, name)
+    time.sleep(delay)
+    return detailed
+
+def enhance_people_data(workers=4, delay=0.5, restart=False):
+    """Load existing people list and enhance with detailed profile data
+
+    Profiles are fetched by a pool of `workers` threads sharing one
+    keep-alive session. Each finished profile is appended to a JSONL
+    checkpoint, and a re-run after a crash skips the profiles already in
+    it (pass restart=True to ignore it). Output keeps the input order.
+
+    The people list (a JSON array or JSONL) is streamed twice, once to
+    collect the profile URLs and once to write the output. Fetched
+    profiles are not kept in memory either: only their offsets in the
+    checkpoint are, and the output reads each profile back from there.
+    Returns the coverage counts.
+    """
 
     print("="*80)
     print("ENHANCED PROFILE SCRAPER")
     print("="*80)
 
-    # Load existing people list
-    input_file = '/Users/adrianstiermbp2023/eemb-website-redesign-2025-2026/scraping/data/all-people-scraped.json'
-
-    with open(input_file, 'r') as f:
-        people = json.load(f)
-
-    print(f"\n📋 Loaded {len(people)} people from existing data")
-    print(f"🔄 Now fetching detailed profiles...\n")
-
-    enhanced_people = []
-
-    for idx, person in enumerate(people, 1):
-        print(f"[{idx}/{len(people)}]", end="")
-
-        name = person.get('full_name', 'Unknown')
+    if restart and os.path.exists(CHECKPOINT_FILE):
+        os.remove(CHECKPOINT_FILE)
+    offsets = load_checkpoint(CHECKPOINT_FILE)
+    if offsets:
+        print(f"♻️  Resuming: {len(offsets)} profiles already in {CHECKPOINT_FILE}")
+
+    # One fetch per profile URL, even if a person is listed more than once
+    to_fetch = {}
+    people_count = 0
+    for person in iter_records(INPUT_FILE):
+        people_count += 1
         url = person.get('profile_url')
-
         if not url:
-            print(f"  ⚠️  {name} - No profile URL")
-            enhanced_people.append(person)
-            continue
-
-        # Extract detailed info
-        detailed = extract_detailed_profile(url, name)
-        enhanced_people.append(detailed)
-
-        # Be nice to the server
-        time.sleep(0.5)
-
-        # Save checkpoint every 20 people
-        if idx % 20 == 0:
-            checkpoint_file = '/Users/adrianstiermbp2023/eemb-website-redesign-2025-2026/scraping/data/people-detailed-checkpoint.json'
-            with open(checkpoint_file, 'w') as f:
-                json.dump(enhanced_people, f, indent=2)
-            print(f"\n  💾 Checkpoint saved at {idx}/{len(people)}\n")
+            print(f"  ⚠️  {person.get('full_name', 'Unknown')} - No profile URL")
+        elif url not in offsets and url not in to_fetch:
+            to_fetch[url] = person.get('full_name', 'Unknown')
+
+    print(f"\n📋 Loaded {people_count} people from existing data")
+    print(f"🔄 Now fetching {len(to_fetch)} detailed profiles with {workers} workers...\n")
+
+    # Keep-alive connections for every worker
+    adapter = HTTPAdapter(pool_connections=workers, pool_maxsize=workers)
+    session.mount('http://', adapter)
+    session.mount('https://', adapter)
+
+    with open(CHECKPOINT_FILE, 'ab') as checkpoint, \
+            ThreadPoolExecutor(max_workers=workers) as executor:
+        if checkpoint.tell() and not checkpoint_ends_line(CHECKPOINT_FILE):
+            # Finish the line a crash cut short, so the next profile starts on its own
+            checkpoint.write(b'\n')
+        futures = {executor.submit(fetch_profile, url, name, delay): url for url, name in to_fetch.items()}
+        for done, future in enumerate(as_completed(futures), 1):
+            detailed = future.result()
+            offsets[futures[future]] = checkpoint.tell()
+            # Append-only: each profile costs one line, whatever the run size
+            checkpoint.write((json.dumps(detailed, ensure_ascii=False) + '\n').encode('utf-8'))
+            checkpoint.flush()
+            if done % 20 == 0:
+                os.fsync(checkpoint.fileno())
+                print(f"\n  💾 Checkpoint: {done}/{len(to_fetch)} fetched\n")
+
+    # Coverage counts, taken while the output is written
+    stat_fields = {'with_email': 'email', 'with_phone': 'phone', 'with_office': 'office', 'with_title': 'title',
+                   'with_bio': 'bio', 'with_research': 'research_interests', 'with_photo': 'photo_url',
+                   'with_scholar': 'google_scholar', 'with_lab': 'lab_website'}
+    stats = dict.fromkeys(['total', *stat_fields], 0)
+
+    def enhanced_people(checkpoint):
+        """People in input order, whatever order the workers finished in"""
+        for person in iter_records(INPUT_FILE):
+            offset = offsets.get(person.get('profile_url'))
+            if offset is not None:
+                # A profile shared by several entries keeps each entry's own name
+                person = dict(read_checkpoint(checkpoint, offset), full_name=person.get('full_name', 'Unknown'))
+            stats['total'] += 1
+            for stat, field in stat_fields.items():
+                if person.get(field):
+                    stats[stat] += 1
+            yield person
 
     # Save final enhanced data
-    output_file = '/Users/adrianstiermbp2023/eemb-website-redesign-2025-2026/scraping/data/people-detailed-complete.json'
-    with open(output_file, 'w') as f:
-        json.dump(enhanced_people, f, indent=2, ensure_ascii=False)
+    with open(CHECKPOINT_FILE, 'rb') as checkpoint:
+        write_json(enhanced_people(checkpoint), OUTPUT_FILE, ensure_ascii=False)
+
+    # The run is complete, so the next one should start fresh
+    os.remove(CHECKPOINT_FILE)
 
     print("\n" + "="*80)
-    print(f"✅ COMPLETE - Enhanced data for {len(enhanced_people)} people")
-    print(f"📁 Saved to: {output_file}")
+    print(f"✅ COMPLETE - Enhanced data for {stats['total']} people")
+    print(f"📁 Saved to: {OUTPUT_FILE}")
     print("="*80)
 
-    # Generate summary statistics
-    stats = {
-        'total': len(enhanced_people),
-        'with_email': sum(1 for p in enhanced_people if p.get('email')),
-        'with_phone': sum(1 for p in enhanced_people if p.get('phone')),
-        'with_office': sum(1 for p in enhanced_people if p.get('office')),
-        'with_title': sum(1 for p in enhanced_people if p.get('title')),
-        'with_bio': sum(1 for p in enhanced_people if p.get('bio')),
-        'with_research': sum(1 for p in enhanced_people if p.get('research_interests')),
-        'with_photo': sum(1 for p in enhanced_people if p.get('photo_url')),
-        'with_scholar': sum(1 for p in enhanced_people if p.get('google_scholar')),
-        'with_lab': sum(1 for p in enhanced_people if p.get('lab_website')),
-    }
-
     print("\n📊 Coverage Summary:")
     print("-"*80)
     for field, count in stats.items():
-        if field != 'total':
+        if field != 'total' and stats['total']:
             pct = (count / stats['total']) * 100
             print(f"  {field:20} {count:3}/{stats['total']} ({pct:5.1f}%)")
 
-    return enhanced_people
+    return stats
 
 if __name__ == "__main__":
-    enhance_people_data()
+    parser = argparse.ArgumentParser(description='Fetch the detailed profile of every scraped person')
+    parser.add_argument('--workers', type=int, default=4, help='Profiles fetched in parallel')
+    parser.add_argument('--delay', type=float, default=0.5, help='Pause after each fetch, per worker (seconds)')
+    parser.add_argument('--restart', action='store_true', help='Ignore the checkpoint of an interrupted run')
+    args = parser.parse_args()
+    enhance_people_data(workers=args.workers, delay=args.delay, restart=args.restart)